@@ -0,0 +1,89 @@
+"""Config loading: inline YAML (pure-Python vs libyaml loader) vs an NDJSON probe file.
+
+Each case runs in a fresh interpreter so its peak RSS is its own.
+
+Run: python -m benchmarks.bench_config [sizes...]
+"""
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from src.common.result import Ok
+from src.infra import config_loader
+
+SCHEDULES = ["*/1 * * * *", "*/5 * * * *", "0 * * * *", "15,45 9-17 * * mon-fri"]
+HEADER = "sink:\n  kafka:\n    topic: probe_outcomes\n"
+
+
+def _probe(i: int) -> dict[str, object]:
+    return {
+        "name": f"service-{i}-health",
+        "url": f"https://service-{i}.example.com/health",
+        "schedule": SCHEDULES[i % len(SCHEDULES)],
+        "checkCert": i % 2 == 0,
+    }
+
+
+def _write_inventories(directory: Path, size: int) -> tuple[Path, Path]:
+    inline = directory / f"inline-{size}.yml"
+    with inline.open("w", encoding="utf-8") as f:
+        f.write(HEADER)
+        yaml.dump({"probes": [_probe(i) for i in range(size)]}, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+
+    (directory / f"probes-{size}.ndjson").write_text(
+        "".join(json.dumps(_probe(i)) + "\n" for i in range(size)), "utf-8")
+    included = directory / f"included-{size}.yml"
+    included.write_text(f"{HEADER}probeFiles: [probes-{size}.ndjson]\n", "utf-8")
+    return inline, included
+
+
+def _load_once(path: str, loader: str) -> None:
+    if loader == "python":
+        config_loader._YAML_LOADER = yaml.SafeLoader  # type: ignore[misc]
+    began = time.perf_counter()
+    loaded = config_loader.get_config(path)
+    elapsed = time.perf_counter() - began
+    assert isinstance(loaded, Ok), loaded
+    print(json.dumps({"seconds": elapsed, "peakMiB": _peak_rss_mib(), "probes": len(loaded.value.probes)}))
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss carries over the parent's peak across fork+exec on Linux; VmHWM does not.
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(label: str, path: Path, loader: str) -> None:
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_config", "--once", str(path), loader],
+                         check=True, capture_output=True, text=True).stdout
+    result = json.loads(out)
+    print(f"{label:<24} {result['probes']:>8} probes {result['seconds'] * 1000:10.1f} ms "
+          f"{result['peakMiB']:8.1f} MiB peak RSS")
+
+
+def main(sizes: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            inline, included = _write_inventories(Path(tmp), size)
+            _measure("inline, SafeLoader", inline, "python")
+            if hasattr(yaml, "CSafeLoader"):
+                _measure("inline, CSafeLoader", inline, "default")
+            _measure("ndjson probe file", included, "default")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--once"]:
+        _load_once(sys.argv[2], sys.argv[3])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
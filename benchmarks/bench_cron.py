@@ -0,0 +1,62 @@
+"""Next-fire computation: croniter per call vs compiled, shared schedules.
+
+Run: python -m benchmarks.bench_cron [probes] [ticks]
+"""
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+
+from croniter import croniter
+
+from src.common.cron import compile_cron, CronSchedule
+from src.common.result import Ok
+
+SCHEDULES = ["*/1 * * * *", "*/5 * * * *", "0 * * * *", "15,45 9-17 * * mon-fri"]
+
+
+def _croniter_tick(schedules: list[str], after: float) -> None:
+    for schedule in schedules:
+        croniter(schedule, datetime.fromtimestamp(after)).get_next(datetime).timestamp()
+
+
+def _compiled_tick(schedules: list[CronSchedule], after: float) -> None:
+    for schedule in schedules:
+        schedule.next_fire(after)
+
+
+def _compiled_uncached_tick(expressions: list[str], after: float) -> None:
+    # Every probe recomputes, as if no two probes shared a schedule
+    for expression in expressions:
+        schedule = compile_cron(expression)
+        assert isinstance(schedule, Ok)
+        schedule.value._memo_minute = -1
+        schedule.value.next_fire(after)
+
+
+def _measure(label: str, tick: Callable[[float], None], probes: int, ticks: int) -> None:
+    start = datetime(2025, 1, 6, 8, 0).timestamp()
+    began = time.perf_counter()
+    for i in range(ticks):
+        tick(start + i * 60)
+    elapsed = time.perf_counter() - began
+    per_call_us = elapsed / (probes * ticks) * 1e6
+    print(f"{label:<28} {elapsed * 1000 / ticks:10.2f} ms/tick {per_call_us:8.3f} us/probe")
+
+
+def main(probes: int = 10_000, ticks: int = 20) -> None:
+    expressions = [SCHEDULES[i % len(SCHEDULES)] for i in range(probes)]
+    compiled = []
+    for expression in expressions:
+        schedule = compile_cron(expression)
+        assert isinstance(schedule, Ok)
+        compiled.append(schedule.value)
+
+    print(f"{probes} probes over {len(SCHEDULES)} distinct schedules, {ticks} ticks")
+    _measure("croniter", lambda after: _croniter_tick(expressions, after), probes, ticks)
+    _measure("compiled, no sharing", lambda after: _compiled_uncached_tick(expressions, after), probes, ticks)
+    _measure("compiled, shared", lambda after: _compiled_tick(compiled, after), probes, ticks)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
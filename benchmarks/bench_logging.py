@@ -0,0 +1,56 @@
+"""Logging cost per probe run, as paid by the event loop.
+
+Each simulated run makes the log calls of a successful probe with a certificate check:
+the scheduler's dispatch line and the four lines of ``ProbeExecutionService``. Output goes
+to /dev/null, so the numbers are the pipeline's own cost. "caller" is the time spent in the
+log calls themselves; "total" also waits for the listener thread to write everything out.
+
+Run: python -m benchmarks.bench_logging [runs]
+"""
+import os
+import sys
+import time
+
+from src.common.logging import LoggingConfig, configure_sampling, get_logger, init_logging, shutdown_logging
+
+CASES = [
+    # label, LOG_LEVEL, queue size, sampled
+    ("sync, unsampled", "info", 0, False),
+    ("queued, unsampled", "info", 1_000_000, False),
+    ("queued, sampled", "info", 1_000_000, True),
+    ("level=warning", "warning", 1_000_000, True),
+]
+
+
+def _measure(label: str, level: str, queue_size: int, sampled: bool, runs: int) -> None:
+    os.environ["LOG_LEVEL"] = level
+    with open(os.devnull, "w") as devnull:
+        init_logging(queue_size=queue_size, stream=devnull)
+        configure_sampling(LoggingConfig() if sampled else LoggingConfig(sample_rates=()))
+        log = get_logger()
+
+        began = time.perf_counter()
+        for i in range(runs):
+            name = f"service-{i % 1000}-health"
+            log.info("Executing periodic job {probe}", probe=name)
+            log.info("Executing probe {probe}", probe=name)
+            log.info("Fetched response for probe {probe}", probe=name)
+            log.info("Fetched cert info for probe {probe}", probe=name)
+            log.info("Published outcomes for probe {probe}", probe=name)
+        caller_s = time.perf_counter() - began
+        shutdown_logging()
+        total_s = time.perf_counter() - began
+
+    per_run = 1e6 / runs
+    print(f"{label:<18} {caller_s * per_run:8.2f} us caller {total_s * per_run:8.2f} us total")
+
+
+def main(runs: int = 20_000) -> None:
+    os.environ.setdefault("ENV", "production")
+    print(f"{runs} probe runs, 5 info lines each, {os.environ['ENV']} renderer")
+    for case in CASES:
+        _measure(*case, runs=runs)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
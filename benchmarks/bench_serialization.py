@@ -0,0 +1,50 @@
+"""Probe outcome encoding: JSON vs the compact binary format.
+
+Run: python -m benchmarks.bench_serialization [outcomes]
+"""
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from src.domain import CertInfo, HttpResult, HttpTimings, ProbeOutcome
+from src.infra.outcome_codec import BinarySerializer, JsonSerializer, OutcomeSerializer
+
+
+def _outcomes(count: int) -> list[ProbeOutcome]:
+    now = datetime.now(timezone.utc)
+    cert = CertInfo("example.com", "Example Issuing CA", now - timedelta(days=30), now + timedelta(days=60))
+    return [
+        ProbeOutcome(
+            probe_name=f"service-{i}-health",
+            result=HttpResult(200, 40 + i % 50, HttpTimings(1.2, 3.4, 10.5 + i % 7, 38.0, 40.0 + i % 50)),
+            cert_info=cert if i % 2 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def _measure(label: str, serializer: OutcomeSerializer, outcomes: Sequence[ProbeOutcome]) -> None:
+    began = time.perf_counter()
+    encoded = [serializer.encode(o) for o in outcomes]
+    encode_s = time.perf_counter() - began
+
+    began = time.perf_counter()
+    for data in encoded:
+        serializer.decode(data)
+    decode_s = time.perf_counter() - began
+
+    size = sum(len(data) for data in encoded) / len(encoded)
+    per_item = 1e6 / len(outcomes)
+    print(f"{label:<8} {size:8.1f} B/msg {encode_s * per_item:8.2f} us encode {decode_s * per_item:8.2f} us decode")
+
+
+def main(count: int = 100_000) -> None:
+    outcomes = _outcomes(count)
+    print(f"{count} outcomes, half with certificate info")
+    _measure("json", JsonSerializer(), outcomes)
+    _measure("binary", BinarySerializer(o.probe_name for o in outcomes), outcomes)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,166 @@
+"""End-to-end probe throughput: scheduler -> service -> HttpRequestor -> publisher, all on localhost.
+
+Probes target a local stand-in server (see ``benchmarks.harness``) and fire every
+``--period`` seconds, spread evenly over the period. Each inventory size runs in a fresh
+interpreter, so the reported CPU and peak RSS belong to that run alone. ``--sink kafka``
+publishes through ``KafkaPublisher`` to librdkafka's in-process mock cluster.
+
+Run: python -m benchmarks.bench_service [sizes...] [--period S] [--duration S] [--sink counting|kafka]
+     [--latency-ms MS] [--error-rate F] [--reset-rate F] [--hosts N] [--http]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import (CountingPublisher, NullLogger, ResourceUsage, ServerConfig, StandInServer,
+                                fixed_period, inventory)
+from src.domain import Probe
+from src.infra.batching_publisher import BatchingPublisher
+from src.infra.kafka_publisher import KafkaPublisher, KafkaPublisherConfig
+from src.infra.publisher_protocol import Publisher
+from src.infra.requestor import HttpRequestor, HttpRequestorConfig
+from src.probe_execution_service import ProbeExecutionService
+from src.scheduler import Scheduler, SchedulerConfig
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_service")
+    parser.add_argument("sizes", nargs="*", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--period", type=float, default=10.0, help="seconds between runs of each probe")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds, after one warm-up period")
+    parser.add_argument("--sink", choices=["counting", "kafka"], default="counting")
+    parser.add_argument("--workers", type=int, default=500, help="scheduler maxWorkers")
+    parser.add_argument("--connections", type=int, default=500, help="http maxConnections")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reset-rate", type=float, default=0.0)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--server-processes", type=int, default=2)
+    parser.add_argument("--http", action="store_true", help="plain HTTP instead of HTTPS")
+    parser.add_argument("--once", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def _publisher(sink: str) -> tuple[Publisher, KafkaPublisher | None, CountingPublisher | None]:
+    if sink == "counting":
+        counting = CountingPublisher()
+        return counting, None, counting
+    kafka = KafkaPublisher(NullLogger(), KafkaPublisherConfig(
+        {"test.mock.num.brokers": "1", "bootstrap.servers": "", "log_level": "0"}, "bench"))
+    return BatchingPublisher(kafka), kafka, None
+
+
+async def _run(size: int, args: argparse.Namespace, server: StandInServer) -> dict[str, object]:
+    publisher, kafka, counting = _publisher(args.sink)
+    requestor = HttpRequestor(HttpRequestorConfig(max_connections=args.connections,
+                                                  max_keepalive_connections=args.connections))
+    service = ProbeExecutionService(publisher, requestor, NullLogger())
+    executed = 0
+
+    async def execute(probe: Probe) -> None:
+        # Counts runs that ended in an error as well as published ones.
+        nonlocal executed
+        await service.execute(probe)
+        executed += 1
+
+    scheduler = Scheduler(execute, NullLogger(), SchedulerConfig(max_workers=args.workers),
+                          next_fire=fixed_period(args.period))
+    # Certificate checks need TLS, so plain HTTP runs skip them.
+    for probe in inventory(size, server.urls, args.period, cert_every=0 if args.http else 2):
+        scheduler.add(probe)
+
+    stop = asyncio.Event()
+    running = asyncio.create_task(scheduler.run(stop))
+    await asyncio.sleep(args.period)
+
+    before, began, executed_before = ResourceUsage.now(), time.perf_counter(), executed
+    worst_p99 = 0.0
+    while time.perf_counter() - began < args.duration:
+        await asyncio.sleep(1)
+        worst_p99 = max(worst_p99, scheduler.stats().lag_p99_ms)
+    after, wall = ResourceUsage.now(), time.perf_counter() - began
+    stats = scheduler.stats()
+    runs = executed - executed_before
+
+    stop.set()
+    await running
+    await requestor.aclose()
+    if isinstance(publisher, BatchingPublisher):
+        await publisher.aclose()
+    if kafka:
+        await kafka.aclose()
+
+    return {
+        "probes": size,
+        "targetPerSecond": size / args.period,
+        "runsPerSecond": runs / wall,
+        "published": counting.published if counting else None,
+        "byStatus": dict(counting.by_status) if counting else None,
+        "skipped": stats.skipped,
+        "lagP50Ms": stats.lag_p50_ms,
+        "lagP99Ms": stats.lag_p99_ms,
+        "lagWorstP99Ms": worst_p99,
+        "lagMaxMs": stats.lag_max_ms,
+        "cpuPercent": (after.cpu_seconds - before.cpu_seconds) / wall * 100,
+        "rssMiB": after.rss_mib,
+        "peakRssMiB": after.peak_rss_mib,
+    }
+
+
+def _run_once(size: int, args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        server = StandInServer(ServerConfig(
+            hosts=args.hosts,
+            processes=args.server_processes,
+            tls=not args.http,
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            reset_rate=args.reset_rate,
+        ), Path(tmp))
+        server.start()
+        try:
+            if server.cert_file:
+                # Both httpx and the certificate check build their trust store from this.
+                os.environ["SSL_CERT_FILE"] = str(server.cert_file)
+            print(json.dumps(asyncio.run(_run(size, args, server))))
+        finally:
+            server.stop()
+
+
+def main(argv: list[str]) -> None:
+    args = _parse_args(argv)
+    if args.once is not None:
+        _run_once(args.once, args)
+        return
+
+    passthrough = [
+        "--period", str(args.period), "--duration", str(args.duration), "--sink", args.sink,
+        "--workers", str(args.workers), "--connections", str(args.connections),
+        "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate),
+        "--reset-rate", str(args.reset_rate), "--hosts", str(args.hosts),
+        "--server-processes", str(args.server_processes), *(["--http"] if args.http else []),
+    ]
+    print(f"sink={args.sink} period={args.period}s duration={args.duration}s "
+          f"{'http' if args.http else 'https'} latency={args.latency_ms}ms errors={args.error_rate} "
+          f"resets={args.reset_rate} hosts={args.hosts}")
+    print(f"{'probes':>8} {'target/s':>9} {'runs/s':>9} {'lag p50':>9} {'lag p99':>9} {'worst p99':>10} "
+          f"{'skipped':>8} {'cpu %':>7} {'rss MiB':>8} {'peak MiB':>9}")
+    for size in args.sizes:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_service", "--once", str(size), *passthrough],
+                             check=True, capture_output=True, text=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{r['probes']:>8} {r['targetPerSecond']:>9.0f} {r['runsPerSecond']:>9.0f} {r['lagP50Ms']:>9.1f} "
+              f"{r['lagP99Ms']:>9.1f} {r['lagWorstP99Ms']:>10.1f} {r['skipped']:>8} {r['cpuPercent']:>7.0f} "
+              f"{r['rssMiB']:>8.1f} {r['peakRssMiB']:>9.1f}")
+        if r["byStatus"]:
+            print(f"{'':>8} published by status: {r['byStatus']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
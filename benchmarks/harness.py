@@ -0,0 +1,240 @@
+"""Building blocks for end-to-end benchmarks that never leave localhost.
+
+- ``StandInServer``: an HTTP/1.1 server with injectable latency, 5xx responses and
+  connection resets, optionally over TLS with a self-signed certificate. It runs in
+  separate processes so its CPU time is not charged to the service being measured.
+- ``CountingPublisher``: an in-memory ``Publisher`` that only counts.
+- ``inventory`` / ``fixed_period``: synthetic probes and a sub-minute schedule for them.
+- ``ResourceUsage``: CPU and RSS of the current process.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import ipaddress
+import multiprocessing
+import random
+import resource
+import socket
+from collections import Counter
+from dataclasses import dataclass
+from multiprocessing.synchronize import Event as EventType
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from src.common.result import Ok, Result
+from src.domain import CertInfo, HttpResult, Probe, ProbeOutcome
+
+
+@dataclass(frozen=True, slots=True)
+class ServerConfig:
+    hosts: int = 1                # listens on 127.0.0.1 .. 127.0.0.<hosts>, one target host each
+    processes: int = 2            # server processes sharing each socket via SO_REUSEPORT
+    tls: bool = True
+    latency_ms: float = 5.0
+    latency_jitter_ms: float = 2.0
+    error_rate: float = 0.0       # fraction answered with 500
+    reset_rate: float = 0.0       # fraction answered by closing the connection
+
+
+class StandInServer:
+    def __init__(self, cfg: ServerConfig, directory: Path) -> None:
+        self._cfg = cfg
+        self._directory = directory
+        self._port = _free_port()
+        self._processes: list[multiprocessing.process.BaseProcess] = []
+        self.cert_file: Path | None = None
+        self.key_file: Path | None = None
+
+    @property
+    def addresses(self) -> list[str]:
+        return [f"127.0.0.{i + 1}" for i in range(self._cfg.hosts)]
+
+    @property
+    def urls(self) -> list[str]:
+        scheme = "https" if self._cfg.tls else "http"
+        return [f"{scheme}://{address}:{self._port}" for address in self.addresses]
+
+    def start(self) -> None:
+        if self._cfg.tls:
+            self.cert_file, self.key_file = write_self_signed_cert(self._directory, self.addresses)
+
+        ctx = multiprocessing.get_context("spawn")
+        for _ in range(self._cfg.processes):
+            ready = ctx.Event()
+            process = ctx.Process(target=_serve, args=(self._cfg, self._port, self.cert_file, self.key_file, ready),
+                                  daemon=True)
+            process.start()
+            if not ready.wait(30):
+                raise RuntimeError("Stand-in server did not start")
+            self._processes.append(process)
+
+    def stop(self) -> None:
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join()
+
+
+def write_self_signed_cert(directory: Path, addresses: Sequence[str]) -> tuple[Path, Path]:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "ping-monkey-bench")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .add_extension(x509.SubjectAlternativeName(
+            [x509.DNSName("localhost"), *(x509.IPAddress(ipaddress.ip_address(a)) for a in addresses)]),
+            critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_file, key_file = directory / "bench-cert.pem", directory / "bench-key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    return cert_file, key_file
+
+
+def _serve(cfg: ServerConfig, port: int, cert_file: Path | None, key_file: Path | None, ready: EventType) -> None:
+    asyncio.run(_serve_async(cfg, port, cert_file, key_file, ready))
+
+
+async def _serve_async(cfg: ServerConfig, port: int, cert_file: Path | None, key_file: Path | None,
+                       ready: EventType) -> None:
+    import ssl
+
+    ssl_context = None
+    if cert_file and key_file:
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(cert_file, key_file)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await _read_request(reader):
+                draw = random.random()
+                if draw < cfg.reset_rate:
+                    writer.transport.abort()
+                    return
+                delay = max(0.0, random.gauss(cfg.latency_ms, cfg.latency_jitter_ms)) / 1000
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(_ERROR if draw < cfg.reset_rate + cfg.error_rate else _OK)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    hosts = [f"127.0.0.{i + 1}" for i in range(cfg.hosts)]
+    server = await asyncio.start_server(handle, hosts, port, ssl=ssl_context, reuse_port=True, backlog=4096)
+    ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+_OK = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\n\r\nok"
+_ERROR = b"HTTP/1.1 500 Internal Server Error\r\nContent-Type: text/plain\r\nContent-Length: 5\r\n\r\nerror"
+
+
+async def _read_request(reader: asyncio.StreamReader) -> bool:
+    # Probes send bodiless GETs, so the request ends at the blank line after the headers.
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return False
+    return True
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+class CountingPublisher:
+    """A ``Publisher`` that keeps nothing but counts per status class."""
+
+    def __init__(self) -> None:
+        self.published = 0
+        self.by_status: Counter[int] = Counter()
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        for outcome in outcomes:
+            self.by_status[outcome.result.status_code // 100 * 100] += 1
+        self.published += len(outcomes)
+        return [Ok(None)] * len(outcomes)
+
+
+class NullLogger:
+    def info(self, event: str, **kwargs: Any) -> None:
+        pass
+
+    def warning(self, event: str, **kwargs: Any) -> None:
+        pass
+
+    def error(self, event: str, **kwargs: Any) -> None:
+        pass
+
+    def debug(self, event: str, **kwargs: Any) -> None:
+        pass
+
+
+def inventory(size: int, base_urls: Sequence[str], period: float, cert_every: int = 2) -> list[Probe]:
+    """``size`` probes spread round-robin over ``base_urls`` and evenly over one ``period``."""
+    return [
+        Probe(
+            name=f"bench-{i}",
+            url=f"{base_urls[i % len(base_urls)]}/health/{i}",
+            schedule=f"every {period}s",
+            checkCert=cert_every > 0 and i % cert_every == 0,
+            jitter=period,
+        )
+        for i in range(size)
+    ]
+
+
+def fixed_period(period: float) -> Callable[[Probe, float], float]:
+    """A ``Scheduler.next_fire`` firing every ``period`` seconds, for schedules finer than cron's minute."""
+    def next_fire(_: Probe, after: float) -> float:
+        return (after // period + 1) * period
+
+    return next_fire
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceUsage:
+    cpu_seconds: float
+    rss_mib: float
+    peak_rss_mib: float
+
+    @classmethod
+    def now(cls) -> ResourceUsage:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        rss = peak = usage.ru_maxrss / 1024
+        try:
+            # ru_maxrss carries over the parent's peak across fork+exec on Linux; VmHWM does not.
+            for line in Path("/proc/self/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) / 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return cls(usage.ru_utime + usage.ru_stime, rss, peak)
+
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable
+
+from src.common.metrics import MetricsRegistry
+from src.domain import HttpResult, Probe
+
+
+class _State:
+    __slots__ = ("errors", "status_class", "escalated", "interval", "backed_off")
+
+    def __init__(self) -> None:
+        self.errors = 0
+        self.status_class: int | None = None
+        self.escalated = 0
+        self.interval: float | None = None
+        self.backed_off = False
+
+
+class AdaptiveCadence:
+    """Per-probe run intervals that follow each probe's recent outcomes.
+
+    ``ProbeExecutionService`` records every run of a probe with an ``adaptive`` policy and
+    ``Scheduler`` asks for the interval to the next run once a run completes:
+
+    - From the ``backoff_after``-th consecutive connection error on, each error multiplies
+      the regular period by ``backoff_factor`` once more, up to ``max_interval``.
+    - A change of status class (2xx -> 5xx, a response -> no response, passing -> failing
+      body assertions, ...) runs the probe every ``escalate_interval`` seconds for the next
+      ``escalate_runs`` runs, while each escalated run can draw from ``rate_budget`` (runs
+      per second, shared by all probes). Without budget a probe keeps its regular period.
+    """
+
+    def __init__(
+            self,
+            rate_budget: float | None = None,
+            clock: Callable[[], float] = time.monotonic,
+            metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self._rate_budget = rate_budget
+        self._clock = clock
+        self._states: dict[str, _State] = {}
+        self._tokens = max(1.0, rate_budget or 0.0)
+        self._refilled = clock()
+
+        metrics = metrics or MetricsRegistry()
+        metrics.gauge("adaptive_backed_off_probes", "Probes running less often after consecutive errors") \
+            .set_function(lambda: sum(1 for s in self._states.values() if s.backed_off))
+        metrics.gauge("adaptive_escalated_probes", "Probes running more often after a status transition") \
+            .set_function(lambda: sum(1 for s in self._states.values() if s.escalated))
+        self._denied_metric = metrics.counter(
+            "adaptive_budget_denied_total", "Escalated runs kept on the regular period for lack of rate budget").labels()
+
+    def record(self, probe: Probe, result: HttpResult | None) -> None:
+        """Folds in one run; ``None`` stands for a run that got no response."""
+        if probe.adaptive is None:
+            return
+        state = self._states.get(probe.name)
+        if state is None:
+            state = self._states[probe.name] = _State()
+
+        # A body failing its assertions is a state of its own, apart from the status it came with.
+        if result is None:
+            status_class = 0
+        else:
+            status_class = -1 if result.assertions_ok is False else result.status_code // 100
+        state.errors = 0 if result is not None else state.errors + 1
+        if state.status_class is not None and status_class != state.status_class:
+            state.escalated = probe.adaptive.escalate_runs
+        elif state.escalated:
+            state.escalated -= 1
+        state.status_class = status_class
+
+    def interval(self, probe: Probe, period: float) -> float:
+        """Seconds from the end of this run to the next, given the probe's regular ``period``."""
+        policy, state = probe.adaptive, self._states.get(probe.name)
+        interval = period
+        if policy is not None and state is not None:
+            if state.errors >= policy.backoff_after:
+                # Hard down: stop escalating and back off.
+                state.escalated = 0
+                if policy.backoff_factor > 1 and 0 < period < policy.max_interval:
+                    # Compounding stops at max_interval, so a long outage cannot overflow the power.
+                    steps = min(state.errors - policy.backoff_after + 1,
+                                math.ceil(math.log(policy.max_interval / period, policy.backoff_factor)) + 1)
+                    interval = min(policy.max_interval, period * policy.backoff_factor ** steps)
+            elif state.escalated and policy.escalate_interval < period:
+                if self._take_token():
+                    interval = policy.escalate_interval
+                else:
+                    self._denied_metric.inc()
+            state.interval = interval
+            state.backed_off = interval > period
+        return interval
+
+    def current_interval(self, name: str) -> float | None:
+        """The interval last handed to the scheduler for ``name``, if it adapts."""
+        state = self._states.get(name)
+        return state.interval if state is not None else None
+
+    def forget(self, name: str) -> None:
+        self._states.pop(name, None)
+
+    def _take_token(self) -> bool:
+        if self._rate_budget is None:
+            return True
+        now = self._clock()
+        self._tokens = min(max(1.0, self._rate_budget), self._tokens + (now - self._refilled) * self._rate_budget)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
@@ -0,0 +1,211 @@
+import calendar
+from datetime import datetime
+from typing import Final
+
+from src.common.result import Result, Err, Ok
+
+MAX_SEARCH_YEARS: Final[int] = 8  # long enough to reach the next Feb 29 across a skipped leap year
+
+_ALIASES: Final[dict[str, str]] = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTH_NAMES: Final[dict[str, int]] = {
+    name.lower(): i for i, name in enumerate(calendar.month_abbr) if name
+}
+_DAY_NAMES: Final[dict[str, int]] = {
+    "sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6,
+}
+
+# (low, high, names) per field: minute, hour, day of month, month, day of week
+_FIELDS: Final[tuple[tuple[int, int, dict[str, int]], ...]] = (
+    (0, 59, {}),
+    (0, 23, {}),
+    (1, 31, {}),
+    (1, 12, _MONTH_NAMES),
+    (0, 7, _DAY_NAMES),
+)
+
+
+class CronSchedule:
+    """A five-field cron expression compiled to one bitmask per field.
+
+    Probes sharing an expression share one instance (see ``compile_cron``), and the
+    last answer is memoised per minute, so every probe on ``*/1 * * * *`` that fires
+    in the same tick costs a single computation.
+    """
+
+    __slots__ = ("expression", "_minutes", "_hours", "_days", "_months", "_weekdays",
+                 "_dom_restricted", "_dow_restricted", "_memo_minute", "_memo_next")
+
+    def __init__(self, expression: str, masks: tuple[int, int, int, int, int],
+                 dom_restricted: bool, dow_restricted: bool) -> None:
+        self.expression = expression
+        self._minutes, self._hours, self._days, self._months, self._weekdays = masks
+        self._dom_restricted = dom_restricted
+        self._dow_restricted = dow_restricted
+        self._memo_minute = -1
+        self._memo_next = 0.0
+
+    def next_fire(self, after: float) -> float:
+        """Epoch seconds of the first matching local-time minute strictly after ``after``."""
+        minute = int(after // 60)
+        if minute == self._memo_minute:
+            return self._memo_next
+
+        start = datetime.fromtimestamp(after)
+        found = self._search(start.year, start.month, start.day, start.hour, start.minute + 1)
+        if found is None:
+            raise ValueError(f"Cron expression '{self.expression}' has no fire time after {start}")
+
+        fire = datetime(*found).timestamp()
+        if fire <= after:
+            # Second pass through a wall-clock hour repeated by a DST fall-back
+            fire = datetime(*found, fold=1).timestamp()
+        if fire <= after:
+            return self.next_fire(after + 60)
+
+        self._memo_minute, self._memo_next = minute, fire
+        return fire
+
+    def _search(self, year: int, month: int, day: int, hour: int,
+                minute: int) -> tuple[int, int, int, int, int] | None:
+        last_year = year + MAX_SEARCH_YEARS
+        while year <= last_year:
+            next_month = _next_bit(self._months, month)
+            if next_month is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+
+            next_day = self._next_day(year, month, day)
+            if next_day is None:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+
+            next_hour = _next_bit(self._hours, hour)
+            if next_hour is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute = next_hour, 0
+
+            next_minute = _next_bit(self._minutes, minute)
+            if next_minute is None:
+                hour, minute = hour + 1, 0
+                continue
+
+            return year, month, day, hour, next_minute
+        return None
+
+    def _next_day(self, year: int, month: int, day: int) -> int | None:
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        for d in range(day, days_in_month + 1):
+            if self._day_matches(d, (first_weekday + d) % 7):
+                return d
+        return None
+
+    def _day_matches(self, day: int, weekday: int) -> bool:
+        # `weekday` is cron-numbered (Sunday = 0). As in croniter, when both day fields are
+        # restricted a day matches if either does.
+        dom = bool(self._days >> day & 1)
+        dow = bool(self._weekdays >> weekday & 1)
+        match (self._dom_restricted, self._dow_restricted):
+            case (True, True):
+                return dom or dow
+            case (True, False):
+                return dom
+            case (False, True):
+                return dow
+            case _:
+                return True
+
+
+_compiled: dict[str, Result[CronSchedule, str]] = {}
+
+
+def compile_cron(expression: str) -> Result[CronSchedule, str]:
+    cached = _compiled.get(expression)
+    if cached is None:
+        cached = _compiled[expression] = _compile(expression)
+    return cached
+
+
+def _compile(expression: str) -> Result[CronSchedule, str]:
+    fields = _ALIASES.get(expression.strip().lower(), expression).split()
+    if len(fields) != 5:
+        return Err(f"Cron expression '{expression}' must have 5 fields")
+
+    masks: list[int] = []
+    for field, (low, high, names) in zip(fields, _FIELDS):
+        match _parse_field(field, low, high, names):
+            case Ok(mask):
+                masks.append(mask)
+            case Err(e):
+                return Err(f"Cron expression '{expression}': {e}")
+
+    minutes, hours, days, months, weekdays = masks
+    if weekdays >> 7 & 1:
+        weekdays = (weekdays | 1) & ~(1 << 7)  # 7 is an alias for Sunday
+
+    dom_restricted = fields[2] not in ("*", "?")
+    dow_restricted = fields[4] not in ("*", "?")
+
+    if dom_restricted and not dow_restricted and not _day_fits_month(days, months):
+        return Err(f"Cron expression '{expression}' never fires")
+
+    return Ok(CronSchedule(expression, (minutes, hours, days, months, weekdays), dom_restricted, dow_restricted))
+
+
+def _parse_field(field: str, low: int, high: int, names: dict[str, int]) -> Result[int, str]:
+    mask = 0
+    for part in field.split(","):
+        range_part, _, step_part = part.partition("/")
+        try:
+            step = int(step_part) if step_part else 1
+            if range_part in ("*", "?"):
+                start, end = low, high
+            elif "-" in range_part:
+                first, last = range_part.split("-", 1)
+                start, end = _value(first, names), _value(last, names)
+            else:
+                start = _value(range_part, names)
+                end = high if step_part else start
+        except ValueError:
+            return Err(f"invalid field '{field}'")
+
+        if step <= 0 or not low <= start <= end <= high:
+            return Err(f"field '{field}' is out of range {low}-{high}")
+
+        for v in range(start, end + 1, step):
+            mask |= 1 << v
+    return Ok(mask)
+
+
+def _value(token: str, names: dict[str, int]) -> int:
+    named = names.get(token.lower())
+    return named if named is not None else int(token)
+
+
+def _day_fits_month(days: int, months: int) -> bool:
+    longest = {m: 29 if m == 2 else calendar.monthrange(2001, m)[1] for m in range(1, 13)}
+    first_day = (days & -days).bit_length() - 1
+    return any(months >> m & 1 and first_day <= longest[m] for m in range(1, 13))
+
+
+def _next_bit(mask: int, start: int) -> int | None:
+    rest = mask >> start
+    if not rest:
+        return None
+    return start + (rest & -rest).bit_length() - 1
@@ -1,9 +1,28 @@
+import atexit
 import os
 import logging
+import logging.handlers
+import queue
+from dataclasses import dataclass
 from typing import Protocol
 import sys
 import structlog
-from typing import Any, cast, Callable, Iterable, Mapping, MutableMapping
+from typing import Any, Final, TextIO, cast, Callable, Iterable, Mapping, MutableMapping
+
+LOG_QUEUE_SIZE: Final[int] = 10_000
+
+# The per-run success lines of the probe hot path; errors and warnings are never sampled.
+HOT_PATH_EVENTS: Final[tuple[str, ...]] = (
+    "Executing periodic job {probe}",
+    "Executing probe {probe}",
+    "Fetched response for probe {probe}",
+    "Fetched cert info for probe {probe}",
+    "Published outcomes for probe {probe}",
+    "Published probe outcomes to Kafka",
+)
+
+_ALWAYS_KEPT: Final[frozenset[str]] = frozenset({"warning", "warn", "error", "critical", "exception", "fatal"})
+
 
 class Logger(Protocol):
     def info(self, event: str, **kwargs: Any) -> None: ...
@@ -15,38 +34,170 @@ class Logger(Protocol):
     def debug(self, event: str, **kwargs: Any) -> None: ...
 
 
-def init_logging() -> None:
+@dataclass(frozen=True, slots=True)
+class LoggingConfig:
+    # (event, rate) pairs; an event with rate r keeps one record in every round(1 / r).
+    sample_rates: tuple[tuple[str, float], ...] = tuple((event, 0.01) for event in HOT_PATH_EVENTS)
+
+
+class EventSampler:
+    """Keeps every n-th record of each sampled event, counted per event; warnings and errors always pass.
+
+    Kept records carry ``sampled=n`` so a reader can scale counts back up.
+    """
+
+    def __init__(self) -> None:
+        self._every: dict[str, int] = {}
+        self._seen: dict[str, int] = {}
+        self._dropped_events: frozenset[str] = frozenset()
+
+    def configure(self, cfg: LoggingConfig) -> None:
+        self._every = {event: max(1, round(1 / rate)) for event, rate in cfg.sample_rates if rate > 0}
+        self._seen = {}
+        self._dropped_events = frozenset(event for event, rate in cfg.sample_rates if rate <= 0)
+
+    def __call__(self, _: Any, method_name: str, event_dict: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        event = event_dict.get("event")
+        if method_name in _ALWAYS_KEPT or not isinstance(event, str):
+            return event_dict
+        if event in self._dropped_events:
+            raise structlog.DropEvent
+
+        every = self._every.get(event)
+        if every is None or every == 1:
+            return event_dict
+
+        seen = self._seen.get(event, 0)
+        self._seen[event] = seen + 1
+        if seen % every:
+            raise structlog.DropEvent
+        event_dict["sampled"] = every
+        return event_dict
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without ever waiting; a full queue drops and counts."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Rendering is left to the listener thread; the record never leaves this process.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Dropped {self.dropped} log records, the log queue was full",
+                }))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_sampler = EventSampler()
+_listener: logging.handlers.QueueListener | None = None
+
+
+def init_logging(queue_size: int = LOG_QUEUE_SIZE, stream: TextIO | None = None) -> None:
+    """Configures structlog so the calling thread only filters, samples and enqueues.
+
+    Records below ``LOG_LEVEL`` (default info) are discarded before any processor runs.
+    Rendering and writing happen on a listener thread fed by a queue of ``queue_size``
+    records; ``queue_size=0`` renders and writes synchronously instead.
+    """
+    global _listener
+    shutdown_logging()
+
     # Determine environment
     env = (os.getenv("ENV") or "development").lower()
-    log_level_name = os.getenv("LOG_LEVEL") or "debug"
+    log_level_name = os.getenv("LOG_LEVEL") or "info"
     level = getattr(logging, log_level_name.upper())
 
-    logging.basicConfig(format="%(message)s", stream=sys.stdout, level=level)
-
     Processor = Callable[
         [Any, str, MutableMapping[str, Any]],
         Mapping[str, Any] | str | bytes | bytearray | tuple[Any, ...],
     ]
 
+    # Runs on the calling thread: only what has to be captured at the call site.
     processors = cast(
         Iterable[Processor],
         [
+            _sampler,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
+            _capture_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+    )
+
+    # Runs on the listener thread.
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
             structlog.processors.format_exc_info,
             structlog.processors.JSONRenderer() if env == "production" else structlog.dev.ConsoleRenderer(),
         ],
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
     )
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(level)
+    if queue_size > 0:
+        log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=queue_size)
+        root.addHandler(_NonBlockingQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+    else:
+        root.addHandler(output)
 
     structlog.configure(
         processors=processors,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=cast(Any, structlog.stdlib.BoundLogger),
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         cache_logger_on_first_use=True,
     )
 
+
+def _capture_exc_info(_: Any, __: str, event_dict: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    # The listener thread formats the traceback later, when sys.exc_info() no longer holds it.
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+def configure_sampling(cfg: LoggingConfig) -> None:
+    _sampler.configure(cfg)
+
+
+def shutdown_logging() -> None:
+    """Writes out whatever is still queued and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger() -> Logger:
     return structlog.get_logger()
+
+
+_sampler.configure(LoggingConfig())
+atexit.register(shutdown_logging)
@@ -0,0 +1,148 @@
+import bisect
+import math
+from typing import Callable, Final, Generic, Sequence, TypeVar
+
+# Seconds; covers a fast local hop up to a request that ran into its timeout.
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class GaugeValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One slot per bound plus the +Inf bucket; made cumulative only when rendered.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+V = TypeVar("V", bound=CounterValue | GaugeValue | HistogramValue)
+
+
+class Metric(Generic[V]):
+    """A named metric and its children, one per combination of label values.
+
+    Hot paths should resolve ``labels(...)`` once and keep the child: recording is then a
+    single attribute update, cheap enough to leave on in production.
+    """
+
+    def __init__(self, kind: str, name: str, help_text: str, label_names: Sequence[str],
+                 factory: Callable[[], V]) -> None:
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children: dict[tuple[str, ...], V] = {}
+        self._callback: Callable[[], float] | None = None
+
+    def labels(self, *values: str) -> V:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            child = self._children[values] = self._factory()
+        return child
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        """Computes an unlabelled gauge when scraped instead of on every change."""
+        self._callback = callback
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if self._callback is not None:
+            lines.append(f"{self.name} {_format(self._callback())}")
+
+        for values, child in self._children.items():
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, values))
+            if isinstance(child, HistogramValue):
+                cumulative = 0
+                for bound, count in zip((*child.bounds, math.inf), child.counts):
+                    cumulative += count
+                    le = f'le="{_format(bound)}"'
+                    lines.append(f"{self.name}_bucket{{{labels + ',' if labels else ''}{le}}} {cumulative}")
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{self.name}_sum{suffix} {_format(child.sum)}")
+                lines.append(f"{self.name}_count{suffix} {child.count}")
+            else:
+                lines.append(f"{self.name}{{{labels}}} {_format(child.value)}" if labels
+                             else f"{self.name} {_format(child.value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local counters, gauges and histograms, rendered in the Prometheus text format."""
+
+    def __init__(self, namespace: str = "ping_monkey") -> None:
+        self._namespace = namespace
+        self._metrics: dict[str, Metric[CounterValue] | Metric[GaugeValue] | Metric[HistogramValue]] = {}
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Metric[CounterValue]:
+        metric = Metric("counter", self._full_name(name), help_text, labels, CounterValue)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Metric[GaugeValue]:
+        metric = Metric("gauge", self._full_name(name), help_text, labels, GaugeValue)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Metric[HistogramValue]:
+        bounds = tuple(sorted(buckets))
+        metric = Metric("histogram", self._full_name(name), help_text, labels, lambda: HistogramValue(bounds))
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+    def _full_name(self, name: str) -> str:
+        full = f"{self._namespace}_{name}" if self._namespace else name
+        if full in self._metrics:
+            raise ValueError(f"Metric {full} is already registered")
+        return full
+
+
+def _format(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
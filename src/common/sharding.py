@@ -0,0 +1,54 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+from src.common.result import Result, Err, Ok
+from src.domain import Probe
+
+
+@dataclass(frozen=True, slots=True)
+class ShardConfig:
+    index: int = 0
+    count: int = 1
+    workers: int = 1
+
+    def for_worker(self, worker: int) -> "ShardConfig":
+        """The shard a local worker process runs.
+
+        Workers are not a sub-split of the instance's shard: instances and their workers form
+        one flat space of ``count * workers`` shards, with this instance's workers at
+        ``index * workers`` onwards. That only partitions the inventory when every instance
+        runs the same number of workers; with differing values some probes run twice and
+        others not at all.
+        """
+        return ShardConfig(index=self.index * self.workers + worker, count=self.count * self.workers)
+
+
+def shard_of(name: str, count: int) -> int:
+    """Rendezvous (highest random weight) hash of a probe name over ``count`` shards.
+
+    Going from n to n+1 shards moves only the ~1/(n+1) of probes that the new shard wins;
+    every other probe stays where it was.
+    """
+    encoded = name.encode("utf-8")
+    return max(range(count), key=lambda shard: hashlib.blake2b(
+        encoded, digest_size=8, salt=shard.to_bytes(8, "little")).digest())
+
+
+def select_shard(probes: Iterable[Probe], shard: ShardConfig) -> list[Probe]:
+    if shard.count == 1:
+        return list(probes)
+    return [p for p in probes if shard_of(p.name, shard.count) == shard.index]
+
+
+def apply_env(shard: ShardConfig, environ: Mapping[str, str]) -> Result[ShardConfig, str]:
+    """Overrides the configured shard with SHARD_INDEX / SHARD_COUNT, so replicas can share one config file."""
+    try:
+        index = int(environ.get("SHARD_INDEX", shard.index))
+        count = int(environ.get("SHARD_COUNT", shard.count))
+    except ValueError:
+        return Err("SHARD_INDEX and SHARD_COUNT must be integers")
+
+    if count <= 0 or not 0 <= index < count:
+        return Err(f"Shard index {index} is out of range for {count} shards")
+    return Ok(ShardConfig(index=index, count=count, workers=shard.workers))
@@ -0,0 +1,117 @@
+import bisect
+import math
+from array import array
+from typing import Any, Final
+
+MIN_TRACKED_MS: Final[float] = 0.1
+
+
+class LatencySketch:
+    """Streaming quantile sketch over logarithmic buckets (as in DDSketch).
+
+    Every quantile is within ``relative_accuracy`` of a value that was recorded. Buckets
+    are kept sparse in two parallel arrays, capped at ``max_buckets``; past the cap the
+    lowest buckets are folded together, so the tail quantiles stay accurate and memory
+    per sketch is fixed. Sketches with the same settings merge exactly.
+    """
+
+    __slots__ = ("relative_accuracy", "max_buckets", "_gamma_ln", "_keys", "_counts",
+                 "count", "total", "min", "max")
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 64) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma_ln = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._keys = array("H")
+        self._counts = array("I")
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value_ms: float, count: int = 1) -> None:
+        self._add_to_bucket(self._key(value_ms), count)
+        self.count += count
+        self.total += value_ms * count
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+
+    def merge(self, other: "LatencySketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches with different accuracies cannot be merged")
+        for key, count in zip(other._keys, other._counts):
+            self._add_to_bucket(key, count)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for key, count in zip(self._keys, self._counts):
+            seen += count
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def clear(self) -> None:
+        del self._keys[:]
+        del self._counts[:]
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relativeAccuracy": self.relative_accuracy,
+            "keys": self._keys.tolist(),
+            "counts": self._counts.tolist(),
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], max_buckets: int = 64) -> "LatencySketch":
+        sketch = cls(data["relativeAccuracy"], max(max_buckets, len(data["keys"])))
+        sketch._keys = array("H", data["keys"])
+        sketch._counts = array("I", data["counts"])
+        sketch.count = data["count"]
+        sketch.total = data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+    def _key(self, value_ms: float) -> int:
+        if value_ms <= MIN_TRACKED_MS:
+            return 0
+        return min(0xFFFF, math.ceil(math.log(value_ms / MIN_TRACKED_MS) / self._gamma_ln))
+
+    def _value(self, key: int) -> float:
+        # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms.
+        if key == 0:
+            return MIN_TRACKED_MS
+        gamma = math.exp(self._gamma_ln)
+        return MIN_TRACKED_MS * 2 * gamma ** key / (gamma + 1)
+
+    def _add_to_bucket(self, key: int, count: int) -> None:
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            self._counts[i] += count
+            return
+
+        self._keys.insert(i, key)
+        self._counts.insert(i, count)
+        if len(self._keys) > self.max_buckets:
+            # Fold the two lowest buckets into the higher of them.
+            self._counts[1] += self._counts[0]
+            del self._keys[0]
+            del self._counts[0]
@@ -1,5 +1,29 @@
 import datetime
 from dataclasses import dataclass
+from typing import Any, Final
+
+HTTP_METHODS: Final[frozenset[str]] = frozenset({"GET", "HEAD"})
+
+
+@dataclass(frozen=True, slots=True)
+class AdaptivePolicy:
+    backoff_after: int = 3              # consecutive connection errors before backing off
+    backoff_factor: float = 2.0
+    max_interval: float = 3600.0        # ceiling for the backed-off interval, in seconds
+    escalate_interval: float = 10.0     # interval right after a status transition, in seconds
+    escalate_runs: int = 6              # runs at that interval before the regular schedule resumes
+
+
+@dataclass(frozen=True, slots=True)
+class HedgePolicy:
+    percentile: float = 95.0            # a second request goes out once the first runs past this
+    min_samples: int = 20               # recent responses needed before the percentile is trusted
+
+
+@dataclass(frozen=True, slots=True)
+class BodyAssertion:
+    kind: str       # contains | regex | json_key (a dotted path, list indices as numbers)
+    value: str
 
 
 @dataclass(frozen=True, slots=True)
@@ -8,6 +32,18 @@ class Probe:
     url: str
     schedule: str
     checkCert: bool = False
+    fresh_connection: bool = False
+    jitter: float | None = None
+    priority: int = 0
+    adaptive: AdaptivePolicy | None = None
+    method: str = "GET"
+    max_body_bytes: int | None = None  # falls back to the http section's limit
+    assertions: tuple[BodyAssertion, ...] = ()
+    http2: bool | None = None  # None follows the http section's http2Hosts
+    timeout: float | None = None   # seconds per attempt; falls back to the http section's timeout
+    retries: int = 0               # further attempts after one that got no response
+    deadline: float | None = None  # seconds for all attempts together
+    hedge: HedgePolicy | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -23,7 +59,56 @@ class CertInfo:
     not_after: datetime.datetime
 
 
+@dataclass(frozen=True, slots=True)
+class HttpTimings:
+    dns_ms: float | None
+    connect_ms: float | None
+    tls_ms: float | None
+    ttfb_ms: float
+    total_ms: float
+
+
+@dataclass(frozen=True, slots=True)
+class Attempt:
+    started_ms: float   # since the first attempt of the run started
+    elapsed_ms: float
+    outcome: str        # response | error | timeout | cancelled (a hedge that lost)
+    hedge: bool = False
+
+
 @dataclass(frozen=True, slots=True)
 class HttpResult:
     status_code: int
     elapsed_ms: int
+    timings: HttpTimings | None = None
+    body_bytes: int | None = None        # read before the stream was closed; None for HEAD
+    body_truncated: bool = False         # the body went on past the byte limit
+    assertions_ok: bool | None = None    # None when the probe has no body assertions
+    assertion_error: str | None = None   # the first assertion that failed
+    http_version: str | None = None      # as negotiated: HTTP/1.1 or HTTP/2
+    attempts: tuple[Attempt, ...] = ()   # every request of the run when there was more than one
+
+
+@dataclass(frozen=True, slots=True)
+class ProbeOutcome:
+    probe_name: str
+    result: HttpResult
+    cert_info: CertInfo | None
+    heartbeat: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class LatencySummary:
+    probe_name: str
+    window_start: float
+    window_end: float
+    runs: int
+    successes: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    min_ms: float
+    max_ms: float
+    mean_ms: float
+    # Serialised LatencySketch, so consumers can merge windows into longer ones.
+    sketch: dict[str, Any]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Sequence
+
+from src.common.result import Result, Err
+from src.domain import CertInfo, HttpResult, ProbeOutcome
+from src.infra.publisher_protocol import Publisher
+
+
+@dataclass(frozen=True, slots=True)
+class BatchConfig:
+    max_size: int = 500
+    max_delay: float = 0.01
+
+
+class BatchingPublisher:
+    """Collects outcomes published around the same time and hands them to ``inner`` as one batch.
+
+    A batch is sent once it holds ``max_size`` outcomes or ``max_delay`` seconds after its
+    first outcome arrived, whichever comes first. Each caller still gets the result of its
+    own outcome.
+    """
+
+    def __init__(self, inner: Publisher, cfg: BatchConfig = BatchConfig()) -> None:
+        self._inner = inner
+        self._cfg = cfg
+        self._pending: list[tuple[ProbeOutcome, asyncio.Future[Result[None, str]]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._sending: set[asyncio.Task[None]] = set()
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        loop = asyncio.get_running_loop()
+        futures: list[asyncio.Future[Result[None, str]]] = []
+        for outcome in outcomes:
+            future: asyncio.Future[Result[None, str]] = loop.create_future()
+            self._pending.append((outcome, future))
+            futures.append(future)
+            if len(self._pending) >= self._cfg.max_size:
+                self._flush()
+
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self._cfg.max_delay, self._flush)
+        return list(await asyncio.gather(*futures))
+
+    async def aclose(self) -> None:
+        self._flush()
+        await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: list[tuple[ProbeOutcome, asyncio.Future[Result[None, str]]]]) -> None:
+        try:
+            results = await self._inner.publish_many([outcome for outcome, _ in batch])
+        except Exception as e:
+            results = [Err(f"Publishing batch failed: {e}")] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_result(Err("Publisher reported no result for this outcome"))
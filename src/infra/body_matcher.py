@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Sequence
+
+from src.domain import BodyAssertion
+
+
+class BodyMatcher:
+    """Evaluates a probe's body assertions over the chunks of a streamed response.
+
+    Substrings and regexes are searched as chunks arrive, and each one is settled the
+    moment it matches; ``decided`` turns true once nothing is left that more of the body
+    could change, so the caller can stop reading. A JSON key needs the whole document and
+    is checked in ``finish``. Only the bytes an open assertion still needs are kept: the
+    whole body (up to the caller's limit) for regexes and JSON keys, otherwise just enough
+    of the tail to catch a substring split across chunks.
+    """
+
+    def __init__(self, assertions: Sequence[BodyAssertion]) -> None:
+        self._assertions = assertions
+        self._contains = [a.value.encode("utf-8") for a in assertions if a.kind == "contains"]
+        self._regexes = [re.compile(a.value.encode("utf-8")) for a in assertions if a.kind == "regex"]
+        self._json_keys = [a.value for a in assertions if a.kind == "json_key"]
+        self._buffer = bytearray()
+        self._dropped = 0
+
+    @property
+    def decided(self) -> bool:
+        return not (self._contains or self._regexes or self._json_keys)
+
+    def feed(self, chunk: bytes) -> None:
+        if self.decided:
+            return
+        scanned = self._dropped + len(self._buffer)
+        self._buffer += chunk
+
+        if self._contains:
+            self._contains = [needle for needle in self._contains
+                              if self._buffer.find(needle, max(0, scanned - len(needle) + 1 - self._dropped)) < 0]
+        if self._regexes:
+            self._regexes = [pattern for pattern in self._regexes if pattern.search(self._buffer) is None]
+
+        if not (self._regexes or self._json_keys):
+            keep = max((len(needle) - 1 for needle in self._contains), default=0)
+            if len(self._buffer) > keep:
+                self._dropped += len(self._buffer) - keep
+                del self._buffer[:len(self._buffer) - keep]
+
+    def finish(self, truncated: bool) -> str | None:
+        """The first assertion that failed once the body has ended, or ``None`` if all passed."""
+        document: Any = None
+        document_error: str | None = None
+        if self._json_keys:
+            if truncated:
+                document_error = "body exceeded the byte limit before it could be parsed as JSON"
+            else:
+                try:
+                    document = json.loads(self._buffer)
+                except ValueError:
+                    document_error = "body is not valid JSON"
+
+        for assertion in self._assertions:
+            match assertion.kind:
+                case "contains" if assertion.value.encode("utf-8") in self._contains:
+                    return f"body does not contain {assertion.value!r}"
+                case "regex" if any(p.pattern == assertion.value.encode("utf-8") for p in self._regexes):
+                    return f"body does not match /{assertion.value}/"
+                case "json_key" if document_error is not None:
+                    return f"{document_error}, cannot check key {assertion.value!r}"
+                case "json_key" if not _has_key(document, assertion.value):
+                    return f"JSON key {assertion.value!r} not found"
+        return None
+
+
+def _has_key(document: Any, path: str) -> bool:
+    node = document
+    for part in path.split("."):
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        else:
+            return False
+    return True
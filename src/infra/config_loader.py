@@ -1,10 +1,61 @@
+import glob
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, assert_never
+from typing import Any, Final, Iterable, Iterator, Sequence, assert_never
 
 import yaml
+from croniter import croniter
 
-from src.domain import (Probe)
+from src.domain import (AdaptivePolicy, BodyAssertion, HTTP_METHODS, HedgePolicy, Probe)
+from src.common.cron import compile_cron
+from src.common.logging import LoggingConfig
 from src.common.result import Result, Err, Ok, bind_result
+from src.common.sharding import ShardConfig
+from src.infra.batching_publisher import BatchConfig
+from src.infra.config_watcher import ReloadConfig
+from src.infra.delta_publisher import DeltaConfig
+from src.infra.kafka_publisher import KafkaPublisherConfig
+from src.infra.metrics_server import MetricsServerConfig
+from src.infra.outcome_codec import SERIALIZERS
+from src.infra.dns_resolver import DnsCacheConfig
+from src.infra.requestor import HttpRequestorConfig
+from src.infra.spool import SpoolConfig
+from src.latency_aggregator import AggregationConfig
+from src.scheduler import SchedulerConfig
+
+# The libyaml bindings parse large configs several times faster; fall back when they are not built.
+_YAML_LOADER: Final[Any] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+NDJSON_SUFFIXES: Final[frozenset[str]] = frozenset({".ndjson", ".jsonl"})
+YAML_SUFFIXES: Final[frozenset[str]] = frozenset({".yml", ".yaml"})
+
+KAFKA_COMPRESSION_CODECS: Final[frozenset[str]] = frozenset({"none", "gzip", "snappy", "lz4", "zstd"})
+
+MAX_RETRIES: Final[int] = 10
+
+# Config key of each body assertion to its BodyAssertion kind.
+BODY_ASSERTION_KEYS: Final[dict[str, str]] = {"contains": "contains", "regex": "regex", "jsonKey": "json_key"}
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    kafka: KafkaPublisherConfig
+    http: HttpRequestorConfig
+    scheduler: SchedulerConfig
+    probes: list[Probe]
+    spool: SpoolConfig | None = None
+    batching: BatchConfig = BatchConfig()
+    delta: DeltaConfig | None = None
+    aggregation: AggregationConfig | None = None
+    reload: ReloadConfig = ReloadConfig()
+    sharding: ShardConfig = ShardConfig()
+    metrics: MetricsServerConfig | None = None
+    logging: LoggingConfig = LoggingConfig()
+    probe_files: tuple[str, ...] = ()
 
 
 def _parse_probe(p: Any) -> Result[Probe, list[str]]:
@@ -17,6 +68,18 @@ def _parse_probe(p: Any) -> Result[Probe, list[str]]:
     url = p.get("url", "")
     schedule = p.get("schedule", "")
     checkCert = p.get("checkCert", True)
+    fresh_connection = p.get("freshConnection", False)
+    jitter = p.get("jitter")
+    priority = p.get("priority", 0)
+    adaptive = _parse_adaptive_policy(p.get("adaptive"))
+    method = p.get("method", "GET")
+    max_body_bytes = p.get("maxBodyBytes")
+    assertions = _parse_body_assertions(p.get("expect"))
+    http2 = p.get("http2")
+    timeout = p.get("timeout")
+    retries = p.get("retries", 0)
+    deadline = p.get("deadline")
+    hedge = _parse_hedge_policy(p.get("hedge"))
 
     if not name:
         errors.append("Probe name is required")
@@ -24,37 +87,661 @@ def _parse_probe(p: Any) -> Result[Probe, list[str]]:
         errors.append("Probe url is required")
     if not schedule:
         errors.append("Probe schedule is required")
+    elif not _is_valid_schedule(schedule):
+        errors.append(f"Probe schedule {schedule!r} is not a valid cron expression")
+    if jitter is not None and (not isinstance(jitter, (int, float)) or jitter < 0):
+        errors.append("Probe jitter must be a non-negative number of seconds")
+    if not isinstance(priority, int):
+        errors.append("Probe priority must be an integer")
+    if isinstance(adaptive, Err):
+        errors.extend(adaptive.error)
+    if not isinstance(method, str) or method.upper() not in HTTP_METHODS:
+        errors.append("Probe method must be GET or HEAD")
+    if max_body_bytes is not None and (not isinstance(max_body_bytes, int) or max_body_bytes <= 0):
+        errors.append("Probe maxBodyBytes must be a positive integer")
+    if isinstance(assertions, Err):
+        errors.extend(assertions.error)
+    elif assertions.value and isinstance(method, str) and method.upper() == "HEAD":
+        errors.append("Probe expect needs a body, so it cannot be used with method HEAD")
+    if http2 is not None and not isinstance(http2, bool):
+        errors.append("Probe http2 must be true or false")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        errors.append("Probe timeout must be a positive number of seconds")
+    if not isinstance(retries, int) or not 0 <= retries <= MAX_RETRIES:
+        errors.append(f"Probe retries must be an integer from 0 to {MAX_RETRIES}")
+    if deadline is not None and (not isinstance(deadline, (int, float)) or deadline <= 0):
+        errors.append("Probe deadline must be a positive number of seconds")
+    if isinstance(hedge, Err):
+        errors.extend(hedge.error)
 
     return Err(errors) if errors else Ok(Probe(
         name=name,
         url=url,
-        schedule=schedule,
+        # Inventories repeat a handful of schedules many times over.
+        schedule=sys.intern(schedule),
         checkCert=checkCert,
+        fresh_connection=fresh_connection,
+        jitter=float(jitter) if jitter is not None else None,
+        priority=priority,
+        adaptive=adaptive.value if isinstance(adaptive, Ok) else None,
+        method=sys.intern(method.upper()),
+        max_body_bytes=max_body_bytes,
+        assertions=assertions.value if isinstance(assertions, Ok) else (),
+        http2=http2,
+        timeout=float(timeout) if timeout is not None else None,
+        retries=retries,
+        deadline=float(deadline) if deadline is not None else None,
+        hedge=hedge.value if isinstance(hedge, Ok) else None,
     ))
 
 
-def _parse_config(config: dict[str, Any]) -> Result[tuple[dict[str, str], str, list[Probe]], list[str]]:
+def _parse_body_assertions(expect: Any) -> Result[tuple[BodyAssertion, ...], list[str]]:
+    if expect is None:
+        return Ok(())
+    if not isinstance(expect, list):
+        return Err(["Probe expect must be a list of assertions"])
+
+    assertions: list[BodyAssertion] = []
+    errors: list[str] = []
+    for item in expect:
+        if not isinstance(item, dict) or len(item) != 1:
+            errors.append("Probe expect entries must each have one of contains, regex or jsonKey")
+            continue
+        ((key, value),) = item.items()
+        if key not in BODY_ASSERTION_KEYS:
+            errors.append(f"Probe expect has unknown assertion '{key}', use contains, regex or jsonKey")
+        elif not isinstance(value, str) or not value:
+            errors.append(f"Probe expect {key} must be a non-empty string")
+        elif key == "regex" and (error := _regex_error(value)):
+            errors.append(f"Probe expect regex {value!r} is invalid: {error}")
+        else:
+            assertions.append(BodyAssertion(BODY_ASSERTION_KEYS[key], value))
+
+    return Err(errors) if errors else Ok(tuple(assertions))
+
+
+def _is_valid_schedule(schedule: Any) -> bool:
+    # The scheduler falls back to croniter for what the compiled form does not cover.
+    return isinstance(schedule, str) and (isinstance(compile_cron(schedule), Ok) or croniter.is_valid(schedule))
+
+
+def _regex_error(pattern: str) -> str | None:
+    try:
+        re.compile(pattern.encode("utf-8"))
+    except re.error as e:
+        return str(e)
+    return None
+
+
+def _parse_hedge_policy(hedge: Any) -> Result[HedgePolicy | None, list[str]]:
+    # `hedge: true` takes the defaults; a mapping overrides some of them.
+    if hedge is None or hedge is False:
+        return Ok(None)
+    if hedge is True:
+        hedge = {}
+    if not isinstance(hedge, dict):
+        return Err(["Probe hedge must be true or a mapping"])
+
+    default = HedgePolicy()
+    percentile = hedge.get("percentile", default.percentile)
+    min_samples = hedge.get("minSamples", default.min_samples)
+
+    errors: list[str] = []
+
+    if not isinstance(percentile, (int, float)) or not 0 < percentile < 100:
+        errors.append("Probe hedge percentile must be a number between 0 and 100")
+    if not isinstance(min_samples, int) or min_samples <= 0:
+        errors.append("Probe hedge minSamples must be a positive integer")
+
+    if errors:
+        return Err(errors)
+
+    return Ok(HedgePolicy(percentile=float(percentile), min_samples=min_samples))
+
+
+def _parse_adaptive_policy(adaptive: Any) -> Result[AdaptivePolicy | None, list[str]]:
+    # `adaptive: true` takes the defaults; a mapping overrides some of them.
+    if adaptive is None or adaptive is False:
+        return Ok(None)
+    if adaptive is True:
+        adaptive = {}
+    if not isinstance(adaptive, dict):
+        return Err(["Probe adaptive must be true or a mapping"])
+
+    default = AdaptivePolicy()
+    backoff_after = adaptive.get("backoffAfter", default.backoff_after)
+    backoff_factor = adaptive.get("backoffFactor", default.backoff_factor)
+    max_interval = adaptive.get("maxInterval", default.max_interval)
+    escalate_interval = adaptive.get("escalateInterval", default.escalate_interval)
+    escalate_runs = adaptive.get("escalateRuns", default.escalate_runs)
+
+    errors: list[str] = []
+
+    if not isinstance(backoff_after, int) or backoff_after <= 0:
+        errors.append("Probe adaptive backoffAfter must be a positive integer")
+    if not isinstance(backoff_factor, (int, float)) or backoff_factor < 1:
+        errors.append("Probe adaptive backoffFactor must be a number of at least 1")
+    if not isinstance(max_interval, (int, float)) or max_interval <= 0:
+        errors.append("Probe adaptive maxInterval must be a positive number of seconds")
+    if not isinstance(escalate_interval, (int, float)) or escalate_interval <= 0:
+        errors.append("Probe adaptive escalateInterval must be a positive number of seconds")
+    if not isinstance(escalate_runs, int) or escalate_runs < 0:
+        errors.append("Probe adaptive escalateRuns must be a non-negative integer")
+
+    if errors:
+        return Err(errors)
+
+    return Ok(AdaptivePolicy(
+        backoff_after=backoff_after,
+        backoff_factor=float(backoff_factor),
+        max_interval=float(max_interval),
+        escalate_interval=float(escalate_interval),
+        escalate_runs=escalate_runs,
+    ))
+
+
+def _resolve_probe_files(config: dict[str, Any], base_dir: Path) -> Result[list[Path], list[str]]:
+    patterns = config.get("probeFiles") or []
+    if not isinstance(patterns, list) or not all(isinstance(p, str) and p for p in patterns):
+        return Err(["probeFiles must be a list of file paths or glob patterns"])
+
+    files: list[Path] = []
+    errors: list[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.join(base_dir, pattern)))
+        if not matches:
+            errors.append(f"Probe file not found. Path: {base_dir / pattern}")
+        for match in matches:
+            path = Path(match)
+            if path.suffix not in NDJSON_SUFFIXES | YAML_SUFFIXES:
+                errors.append(f"Probe file {path} must be .ndjson, .jsonl, .yml or .yaml")
+            elif path not in files:
+                files.append(path)
+
+    return Err(errors) if errors else Ok(files)
+
+
+def _read_probe_file(path: Path) -> Iterator[tuple[str, Result[Any, str]]]:
+    """Yields each raw probe of an include file with its location, for error messages.
+
+    NDJSON files are decoded a line at a time, so only one raw probe is held at once.
+    """
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            if path.suffix in NDJSON_SUFFIXES:
+                for lineno, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield f"{path}:{lineno}", Ok(json.loads(line))
+                    except ValueError as e:
+                        yield f"{path}:{lineno}", Err(f"invalid JSON: {e}")
+                return
+
+            try:
+                items = yaml.load(f, Loader=_YAML_LOADER)
+            except yaml.YAMLError as e:
+                yield str(path), Err(f"invalid YAML: {e}")
+                return
+            if not isinstance(items, list):
+                yield str(path), Err("must contain a list of probes")
+                return
+            for idx, item in enumerate(items):
+                yield f"{path}[{idx}]", Ok(item)
+    except OSError as e:
+        yield str(path), Err(f"cannot be read: {e.strerror}")
+
+
+def _parse_config(
+        config: dict[str, Any],
+        probe_files: Sequence[Path] = (),
+) -> Result[tuple[dict[str, str], str, list[Probe]], list[str]]:
     sink = config.get("sink", {}).get("kafka", {})
     kafka_cfg = sink.get("cfg", {})
     topic = sink.get("topic", "")
 
-    probes_raw = config.get("probes", [])
+    sources: list[Iterable[tuple[str, Result[Any, str]]]] = [
+        (("", Ok(rp)) for rp in config.get("probes") or []),
+        *(_read_probe_file(path) for path in probe_files),
+    ]
 
     probes: list[Probe] = []
     errors: list[str] = []
+    names: set[str] = set()
 
-    for idx, rp in enumerate(probes_raw):
-        match _parse_probe(rp):
-            case Ok(v):
-                probes.append(v)
-            case Err(e):
-                errors.extend(e)
-            case _ as unreachable:
-                assert_never(unreachable)
+    for source in sources:
+        for location, raw in source:
+            parsed = _parse_probe(raw.value) if isinstance(raw, Ok) else Err([raw.error])
+            match parsed:
+                case Ok(v):
+                    # Probes are identified by name when scheduling and reloading.
+                    if v.name in names:
+                        errors.append(f"Probe name '{v.name}' is used more than once")
+                    names.add(v.name)
+                    probes.append(v)
+                case Err(e):
+                    errors.extend(f"{location}: {err}" if location else err for err in e)
+                case _ as unreachable:
+                    assert_never(unreachable)
 
     return Ok((kafka_cfg, topic, probes)) if not errors else Err(errors)
 
 
+def _parse_kafka_config(config: dict[str, Any]) -> Result[KafkaPublisherConfig, list[str]]:
+    sink = config.get("sink", {}).get("kafka", {})
+    default = KafkaPublisherConfig({}, "")
+
+    linger_ms = sink.get("lingerMs", default.linger_ms)
+    batch_size = sink.get("batchSize", default.batch_size)
+    compression = sink.get("compression", default.compression)
+    serializer = sink.get("format", default.serializer)
+    summary_topic = sink.get("summaryTopic", default.summary_topic)
+    delivery_timeout = sink.get("deliveryTimeout", default.delivery_timeout)
+
+    errors: list[str] = []
+
+    if not isinstance(linger_ms, int) or linger_ms < 0:
+        errors.append("sink.kafka lingerMs must be a non-negative integer")
+    if not isinstance(batch_size, int) or batch_size <= 0:
+        errors.append("sink.kafka batchSize must be a positive integer")
+    if compression not in KAFKA_COMPRESSION_CODECS:
+        errors.append(f"sink.kafka compression must be one of {sorted(KAFKA_COMPRESSION_CODECS)}")
+    if serializer not in SERIALIZERS:
+        errors.append(f"sink.kafka format must be one of {sorted(SERIALIZERS)}")
+    if summary_topic is not None and (not isinstance(summary_topic, str) or not summary_topic):
+        errors.append("sink.kafka summaryTopic must be a non-empty string")
+    if not isinstance(delivery_timeout, (int, float)) or delivery_timeout <= 0:
+        errors.append("sink.kafka deliveryTimeout must be a positive number of seconds")
+
+    return Err(errors) if errors else Ok(KafkaPublisherConfig(
+        kafka_cfg=sink.get("cfg", {}),
+        topic=sink.get("topic", ""),
+        linger_ms=linger_ms,
+        batch_size=batch_size,
+        compression=compression,
+        serializer=serializer,
+        summary_topic=summary_topic,
+        delivery_timeout=float(delivery_timeout),
+    ))
+
+
+def _parse_http_config(config: dict[str, Any]) -> Result[HttpRequestorConfig, list[str]]:
+    http = config.get("http") or {}
+    default = HttpRequestorConfig()
+
+    if not isinstance(http, dict):
+        return Err(["http section must be a mapping"])
+
+    max_connections = http.get("maxConnections", default.max_connections)
+    max_keepalive_connections = http.get("maxKeepaliveConnections", default.max_keepalive_connections)
+    keepalive_expiry = http.get("keepaliveExpiry", default.keepalive_expiry)
+    cert_cache_ttl = http.get("certCacheTtl", default.cert_cache_ttl)
+    cert_cache_max_entries = http.get("certCacheMaxEntries", default.cert_cache_max_entries)
+    dns_cache_ttl = http.get("dnsCacheTtl", default.dns.ttl)
+    dns_negative_ttl = http.get("dnsNegativeTtl", default.dns.negative_ttl)
+    dns_cache_max_entries = http.get("dnsCacheMaxEntries", default.dns.max_entries)
+    max_body_bytes = http.get("maxBodyBytes", default.max_body_bytes)
+    http2_hosts = http.get("http2Hosts", [])
+    max_concurrent_streams = http.get("maxConcurrentStreams", default.max_concurrent_streams)
+    timeout = http.get("timeout", default.timeout)
+
+    errors: list[str] = []
+
+    if not isinstance(max_connections, int) or max_connections <= 0:
+        errors.append("http maxConnections must be a positive integer")
+    if not isinstance(max_keepalive_connections, int) or max_keepalive_connections < 0:
+        errors.append("http maxKeepaliveConnections must be a non-negative integer")
+    if not isinstance(keepalive_expiry, (int, float)) or keepalive_expiry < 0:
+        errors.append("http keepaliveExpiry must be a non-negative number of seconds")
+    if not isinstance(cert_cache_ttl, (int, float)) or cert_cache_ttl < 0:
+        errors.append("http certCacheTtl must be a non-negative number of seconds")
+    if not isinstance(cert_cache_max_entries, int) or cert_cache_max_entries < 0:
+        errors.append("http certCacheMaxEntries must be a non-negative integer")
+    if not isinstance(dns_cache_ttl, (int, float)) or dns_cache_ttl < 0:
+        errors.append("http dnsCacheTtl must be a non-negative number of seconds")
+    if not isinstance(dns_negative_ttl, (int, float)) or dns_negative_ttl < 0:
+        errors.append("http dnsNegativeTtl must be a non-negative number of seconds")
+    if not isinstance(dns_cache_max_entries, int) or dns_cache_max_entries < 0:
+        errors.append("http dnsCacheMaxEntries must be a non-negative integer")
+    if not isinstance(max_body_bytes, int) or max_body_bytes <= 0:
+        errors.append("http maxBodyBytes must be a positive integer")
+    if not isinstance(http2_hosts, list) or not all(isinstance(h, str) and h for h in http2_hosts):
+        errors.append("http http2Hosts must be a list of host names")
+    if not isinstance(max_concurrent_streams, int) or max_concurrent_streams <= 0:
+        errors.append("http maxConcurrentStreams must be a positive integer")
+    if not isinstance(timeout, (int, float)) or timeout <= 0:
+        errors.append("http timeout must be a positive number of seconds")
+
+    return Err(errors) if errors else Ok(HttpRequestorConfig(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=float(keepalive_expiry),
+        cert_cache_ttl=float(cert_cache_ttl),
+        cert_cache_max_entries=cert_cache_max_entries,
+        dns=DnsCacheConfig(
+            ttl=float(dns_cache_ttl),
+            negative_ttl=float(dns_negative_ttl),
+            max_entries=dns_cache_max_entries,
+        ),
+        max_body_bytes=max_body_bytes,
+        http2_hosts=frozenset(h.lower() for h in http2_hosts),
+        max_concurrent_streams=max_concurrent_streams,
+        timeout=float(timeout),
+    ))
+
+
+def _parse_scheduler_config(config: dict[str, Any]) -> Result[SchedulerConfig, list[str]]:
+    scheduler = config.get("scheduler") or {}
+    default = SchedulerConfig()
+
+    if not isinstance(scheduler, dict):
+        return Err(["scheduler section must be a mapping"])
+
+    max_workers = scheduler.get("maxWorkers", default.max_workers)
+    max_per_host = scheduler.get("maxPerHost", default.max_per_host)
+    spread = scheduler.get("spread", default.spread)
+    max_spread = scheduler.get("maxSpread", default.max_spread)
+    adaptive_rate_budget = scheduler.get("adaptiveRateBudget", default.adaptive_rate_budget)
+
+    errors: list[str] = []
+
+    if not isinstance(max_workers, int) or max_workers <= 0:
+        errors.append("scheduler maxWorkers must be a positive integer")
+    if max_per_host is not None and (not isinstance(max_per_host, int) or max_per_host <= 0):
+        errors.append("scheduler maxPerHost must be a positive integer")
+    if not isinstance(spread, bool):
+        errors.append("scheduler spread must be a boolean")
+    if not isinstance(max_spread, (int, float)) or max_spread < 0:
+        errors.append("scheduler maxSpread must be a non-negative number of seconds")
+    if adaptive_rate_budget is not None and (not isinstance(adaptive_rate_budget, (int, float))
+                                             or adaptive_rate_budget <= 0):
+        errors.append("scheduler adaptiveRateBudget must be a positive number of runs per second")
+
+    return Err(errors) if errors else Ok(SchedulerConfig(
+        max_workers=max_workers,
+        max_per_host=max_per_host,
+        spread=spread,
+        max_spread=float(max_spread),
+        adaptive_rate_budget=float(adaptive_rate_budget) if adaptive_rate_budget is not None else None,
+    ))
+
+
+def _parse_spool_config(config: dict[str, Any]) -> Result[SpoolConfig | None, list[str]]:
+    spool = config.get("spool")
+    if spool is None:
+        return Ok(None)
+
+    if not isinstance(spool, dict):
+        return Err(["spool section must be a mapping"])
+
+    directory = spool.get("directory")
+    default = SpoolConfig(directory="")
+    max_bytes = spool.get("maxBytes", default.max_bytes)
+    segment_bytes = spool.get("segmentBytes", default.segment_bytes)
+    replay_batch_size = spool.get("replayBatchSize", default.replay_batch_size)
+    replay_interval = spool.get("replayInterval", default.replay_interval)
+    publish_timeout = spool.get("publishTimeout", default.publish_timeout)
+
+    errors: list[str] = []
+
+    if not isinstance(directory, str) or not directory:
+        errors.append("spool directory is required")
+    if not isinstance(segment_bytes, int) or segment_bytes <= 0:
+        errors.append("spool segmentBytes must be a positive integer")
+    elif not isinstance(max_bytes, int) or max_bytes < segment_bytes:
+        errors.append("spool maxBytes must be an integer no smaller than segmentBytes")
+    if not isinstance(replay_batch_size, int) or replay_batch_size <= 0:
+        errors.append("spool replayBatchSize must be a positive integer")
+    if not isinstance(replay_interval, (int, float)) or replay_interval <= 0:
+        errors.append("spool replayInterval must be a positive number of seconds")
+    if not isinstance(publish_timeout, (int, float)) or publish_timeout <= 0:
+        errors.append("spool publishTimeout must be a positive number of seconds")
+
+    if errors:
+        return Err(errors)
+
+    return Ok(SpoolConfig(
+        directory=str(directory),
+        max_bytes=max_bytes,
+        segment_bytes=segment_bytes,
+        replay_batch_size=replay_batch_size,
+        replay_interval=float(replay_interval),
+        publish_timeout=float(publish_timeout),
+    ))
+
+
+def _parse_batch_config(config: dict[str, Any]) -> Result[BatchConfig, list[str]]:
+    publishing = config.get("publishing") or {}
+    default = BatchConfig()
+
+    if not isinstance(publishing, dict):
+        return Err(["publishing section must be a mapping"])
+
+    max_size = publishing.get("maxBatch", default.max_size)
+    window_ms = publishing.get("batchWindowMs", default.max_delay * 1000)
+
+    errors: list[str] = []
+
+    if not isinstance(max_size, int) or max_size <= 0:
+        errors.append("publishing maxBatch must be a positive integer")
+    if not isinstance(window_ms, (int, float)) or window_ms < 0:
+        errors.append("publishing batchWindowMs must be a non-negative number of milliseconds")
+
+    return Err(errors) if errors else Ok(BatchConfig(max_size=max_size, max_delay=window_ms / 1000))
+
+
+def _parse_delta_config(config: dict[str, Any]) -> Result[DeltaConfig | None, list[str]]:
+    publishing = config.get("publishing") or {}
+    delta = publishing.get("delta") if isinstance(publishing, dict) else None
+    if delta is None:
+        return Ok(None)
+
+    if not isinstance(delta, dict):
+        return Err(["publishing delta must be a mapping"])
+
+    state_file = delta.get("stateFile")
+    default = DeltaConfig(state_file="")
+    heartbeat_interval = delta.get("heartbeatInterval", default.heartbeat_interval)
+    latency_buckets = delta.get("latencyBucketsMs", list(default.latency_buckets_ms))
+    snapshot_interval = delta.get("snapshotInterval", default.snapshot_interval)
+
+    errors: list[str] = []
+
+    if not isinstance(state_file, str) or not state_file:
+        errors.append("publishing delta stateFile is required")
+    if not isinstance(heartbeat_interval, (int, float)) or heartbeat_interval < 0:
+        errors.append("publishing delta heartbeatInterval must be a non-negative number of seconds")
+    if (not isinstance(latency_buckets, list)
+            or not all(isinstance(b, int) and b > 0 for b in latency_buckets)
+            or latency_buckets != sorted(set(latency_buckets))):
+        errors.append("publishing delta latencyBucketsMs must be increasing positive integers")
+    if not isinstance(snapshot_interval, (int, float)) or snapshot_interval <= 0:
+        errors.append("publishing delta snapshotInterval must be a positive number of seconds")
+
+    if errors:
+        return Err(errors)
+
+    return Ok(DeltaConfig(
+        state_file=str(state_file),
+        heartbeat_interval=float(heartbeat_interval),
+        latency_buckets_ms=tuple(latency_buckets),
+        snapshot_interval=float(snapshot_interval),
+    ))
+
+
+def _parse_aggregation_config(config: dict[str, Any]) -> Result[AggregationConfig | None, list[str]]:
+    aggregation = config.get("aggregation")
+    if aggregation is None:
+        return Ok(None)
+
+    if not isinstance(aggregation, dict):
+        return Err(["aggregation section must be a mapping"])
+
+    default = AggregationConfig()
+    interval = aggregation.get("interval", default.interval)
+    relative_accuracy = aggregation.get("relativeAccuracy", default.relative_accuracy)
+    max_buckets = aggregation.get("maxBuckets", default.max_buckets)
+    raw_events = aggregation.get("rawEvents", default.raw_events)
+
+    errors: list[str] = []
+
+    if not isinstance(interval, (int, float)) or interval <= 0:
+        errors.append("aggregation interval must be a positive number of seconds")
+    if not isinstance(relative_accuracy, float) or not 0 < relative_accuracy < 1:
+        errors.append("aggregation relativeAccuracy must be a number between 0 and 1")
+    if not isinstance(max_buckets, int) or max_buckets < 2:
+        errors.append("aggregation maxBuckets must be an integer of at least 2")
+    if not isinstance(raw_events, bool):
+        errors.append("aggregation rawEvents must be a boolean")
+
+    if errors:
+        return Err(errors)
+
+    return Ok(AggregationConfig(
+        interval=float(interval),
+        relative_accuracy=relative_accuracy,
+        max_buckets=max_buckets,
+        raw_events=raw_events,
+    ))
+
+
+def _parse_reload_config(config: dict[str, Any]) -> Result[ReloadConfig, list[str]]:
+    reload = config.get("reload") or {}
+    default = ReloadConfig()
+
+    if not isinstance(reload, dict):
+        return Err(["reload section must be a mapping"])
+
+    poll_interval = reload.get("pollInterval", default.poll_interval)
+
+    if not isinstance(poll_interval, (int, float)) or poll_interval < 0:
+        return Err(["reload pollInterval must be a non-negative number of seconds"])
+
+    return Ok(ReloadConfig(poll_interval=float(poll_interval)))
+
+
+def _parse_shard_config(config: dict[str, Any]) -> Result[ShardConfig, list[str]]:
+    sharding = config.get("sharding") or {}
+    default = ShardConfig()
+
+    if not isinstance(sharding, dict):
+        return Err(["sharding section must be a mapping"])
+
+    index = sharding.get("index", default.index)
+    count = sharding.get("count", default.count)
+    workers = sharding.get("workers", default.workers)
+
+    errors: list[str] = []
+
+    if not isinstance(count, int) or count <= 0:
+        errors.append("sharding count must be a positive integer")
+    elif not isinstance(index, int) or not 0 <= index < count:
+        errors.append("sharding index must be an integer from 0 to count - 1")
+    if not isinstance(workers, int) or workers <= 0:
+        errors.append("sharding workers must be a positive integer")
+
+    return Err(errors) if errors else Ok(ShardConfig(index=index, count=count, workers=workers))
+
+
+def _parse_metrics_config(config: dict[str, Any]) -> Result[MetricsServerConfig | None, list[str]]:
+    metrics = config.get("metrics")
+    if metrics is None:
+        return Ok(None)
+
+    if not isinstance(metrics, dict):
+        return Err(["metrics section must be a mapping"])
+
+    default = MetricsServerConfig()
+    host = metrics.get("host", default.host)
+    port = metrics.get("port", default.port)
+
+    errors: list[str] = []
+
+    if not isinstance(host, str) or not host:
+        errors.append("metrics host must be a non-empty string")
+    if not isinstance(port, int) or not 0 <= port <= 65535:
+        errors.append("metrics port must be an integer from 0 to 65535")
+
+    if errors:
+        return Err(errors)
+
+    return Ok(MetricsServerConfig(host=host, port=port))
+
+
+def _parse_logging_config(config: dict[str, Any]) -> Result[LoggingConfig, list[str]]:
+    logging_section = config.get("logging") or {}
+
+    if not isinstance(logging_section, dict):
+        return Err(["logging section must be a mapping"])
+
+    sampling = logging_section.get("sampling") or {}
+    if not isinstance(sampling, dict):
+        return Err(["logging sampling must be a mapping of event to rate"])
+
+    errors: list[str] = []
+
+    for event, rate in sampling.items():
+        if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            errors.append(f"logging sampling rate for '{event}' must be a number from 0 to 1")
+
+    if errors:
+        return Err(errors)
+
+    # Listed events override the built-in rates; the rest keep them.
+    rates = dict(LoggingConfig().sample_rates) | {str(event): float(rate) for event, rate in sampling.items()}
+    return Ok(LoggingConfig(sample_rates=tuple(rates.items())))
+
+
+def _parse_app_config(config: dict[str, Any], base_dir: Path | None = None) -> Result[AppConfig, list[str]]:
+    probe_files = _resolve_probe_files(config, base_dir or Path.cwd())
+    if isinstance(probe_files, Err):
+        return probe_files
+
+    sink_and_probes = _parse_config(config, probe_files.value)
+    kafka = _parse_kafka_config(config)
+    http = _parse_http_config(config)
+    scheduler = _parse_scheduler_config(config)
+    spool = _parse_spool_config(config)
+    batching = _parse_batch_config(config)
+    delta = _parse_delta_config(config)
+    aggregation = _parse_aggregation_config(config)
+    reload = _parse_reload_config(config)
+    sharding = _parse_shard_config(config)
+    metrics = _parse_metrics_config(config)
+    logging_cfg = _parse_logging_config(config)
+
+    match (sink_and_probes, kafka, http, scheduler, spool, batching, delta, aggregation, reload, sharding, metrics,
+           logging_cfg):
+        case (Ok((_, _, probes)), Ok(kafka_cfg), Ok(http_cfg), Ok(scheduler_cfg), Ok(spool_cfg), Ok(batch_cfg),
+              Ok(delta_cfg), Ok(aggregation_cfg), Ok(reload_cfg), Ok(shard_cfg), Ok(metrics_cfg), Ok(log_cfg)):
+            # Local worker n listens on port + n, so the last one must still be a valid port.
+            if metrics_cfg and metrics_cfg.port and metrics_cfg.port + shard_cfg.workers - 1 > 65535:
+                return Err([f"metrics port {metrics_cfg.port} leaves no port for each of "
+                            f"{shard_cfg.workers} sharding workers"])
+            return Ok(AppConfig(
+                kafka=kafka_cfg,
+                http=http_cfg,
+                scheduler=scheduler_cfg,
+                probes=probes,
+                spool=spool_cfg,
+                batching=batch_cfg,
+                delta=delta_cfg,
+                aggregation=aggregation_cfg,
+                reload=reload_cfg,
+                sharding=shard_cfg,
+                metrics=metrics_cfg,
+                logging=log_cfg,
+                probe_files=tuple(str(p) for p in probe_files.value),
+            ))
+
+    return Err(_collect_errors(sink_and_probes, kafka, http, scheduler, spool, batching, delta, aggregation,
+                               reload, sharding, metrics, logging_cfg))
+
+
+def _collect_errors(*results: Result[Any, list[str]]) -> list[str]:
+    return [e for r in results if isinstance(r, Err) for e in r.error]
+
+
 def _read_config_file(file_name: str) -> Result[dict[str, Any], list[str]]:
     config_path: Path = Path.cwd() / file_name
 
@@ -63,7 +750,7 @@ def _read_config_file(file_name: str) -> Result[dict[str, Any], list[str]]:
 
     with config_path.open("r", encoding="utf-8") as f:
         try:
-            yml = yaml.safe_load(f)
+            yml = yaml.load(f, Loader=_YAML_LOADER)
         except yaml.YAMLError as e:
             return Err([f"Error parsing YAML file {config_path}: {e}"])
 
@@ -73,9 +760,11 @@ def _read_config_file(file_name: str) -> Result[dict[str, Any], list[str]]:
         return Err(["Failed to load yaml config"])
 
 
-def get_config(file_name: str) -> Result[tuple[dict[str, str], str, list[Probe]], list[str]]:
+def get_config(file_name: str) -> Result[AppConfig, list[str]]:
+    # probeFiles are relative to the config file, not the working directory.
+    base_dir = (Path.cwd() / file_name).parent
     return bind_result(
-        _parse_config,
+        lambda config: _parse_app_config(config, base_dir),
         _read_config_file(file_name)
     )
 
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass, fields, replace
+from typing import TYPE_CHECKING, Callable, Protocol, Sequence
+
+from src.common.logging import Logger
+from src.common.result import Err, Result
+from src.domain import Probe
+
+if TYPE_CHECKING:
+    from src.infra.config_loader import AppConfig
+
+
+@dataclass(frozen=True, slots=True)
+class ReloadConfig:
+    poll_interval: float = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class ProbeDiff:
+    added: list[Probe]
+    removed: list[str]
+    changed: list[Probe]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class ProbeTarget(Protocol):
+    def add(self, probe: Probe) -> None: ...
+
+    def remove(self, name: str) -> None: ...
+
+
+def diff_probes(old: Sequence[Probe], new: Sequence[Probe]) -> ProbeDiff:
+    before = {p.name: p for p in old}
+    after = {p.name: p for p in new}
+    return ProbeDiff(
+        added=[p for name, p in after.items() if name not in before],
+        removed=[name for name in before if name not in after],
+        changed=[p for name, p in after.items() if name in before and before[name] != p],
+    )
+
+
+class ConfigWatcher:
+    """Re-reads the config when its file or one of its probe files changes, or ``trigger`` is called (SIGHUP).
+
+    Only the probe list is applied live: probes are diffed by name and just the added,
+    removed and changed ones are rescheduled, so the rest keep their timers and pooled
+    connections. A config that fails validation is logged and the running one is kept.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            current: AppConfig,
+            target: ProbeTarget,
+            load: Callable[[], Result[AppConfig, list[str]]],
+            logger: Logger,
+    ) -> None:
+        self._path = path
+        self._current = current
+        self._target = target
+        self._load = load
+        self._logger = logger
+        self._wakeup = asyncio.Event()
+        self._signature = self._file_signature()
+
+    @property
+    def current(self) -> AppConfig:
+        return self._current
+
+    def trigger(self) -> None:
+        self._wakeup.set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                async with asyncio.timeout(self._current.reload.poll_interval or None):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+
+            forced = self._wakeup.is_set()
+            self._wakeup.clear()
+            signature = self._file_signature()
+            if forced or signature != self._signature:
+                try:
+                    await self.reload()
+                except Exception as e:
+                    # Hot reload must outlive a bad config, so the failure only costs this attempt.
+                    self._logger.error("Config reload failed, keeping the running config", error=repr(e))
+                # The reloaded config may include a different set of probe files.
+                self._signature = self._file_signature()
+
+    async def reload(self) -> bool:
+        # Large inventories take a while to parse, so it is kept off the event loop.
+        loaded = await asyncio.to_thread(self._load)
+        if isinstance(loaded, Err):
+            self._logger.error("Config reload failed, keeping the running config", errors=loaded.error)
+            return False
+
+        new = loaded.value
+        diff = diff_probes(self._current.probes, new.probes)
+        for name in diff.removed:
+            self._target.remove(name)
+        # A probe that cannot be scheduled keeps its running definition (or stays out, if it
+        # is new) instead of stopping the reload of the others.
+        before = {p.name: p for p in self._current.probes}
+        kept: dict[str, Probe | None] = {}
+        for probe in [*diff.added, *diff.changed]:
+            try:
+                self._target.add(probe)
+            except Exception as e:
+                self._logger.error("Failed to schedule probe {probe}, keeping its running definition",
+                                   probe=probe.name, error=str(e))
+                kept[probe.name] = before.get(probe.name)
+        if kept:
+            probes = [p for p in new.probes if p.name not in kept]
+            probes.extend(p for p in kept.values() if p is not None)
+            new = replace(new, probes=probes)
+
+        restart_only = [f.name for f in fields(new) if f.name not in ("probes", "reload")
+                        and getattr(new, f.name) != getattr(self._current, f.name)]
+        if restart_only:
+            self._logger.warning("Config sections changed that only apply after a restart", sections=restart_only)
+
+        self._current = new
+        self._logger.info("Config reloaded", added=len(diff.added), removed=len(diff.removed),
+                          changed=len(diff.changed))
+        return True
+
+    def _file_signature(self) -> tuple[tuple[int, int] | None, ...]:
+        return tuple(_stat_signature(path) for path in (self._path, *self._current.probe_files))
+
+
+def _stat_signature(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
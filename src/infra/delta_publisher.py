@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from src.common.logging import Logger
+from src.common.result import Result, Ok
+from src.domain import CertInfo, HttpResult, ProbeOutcome
+from src.infra.publisher_protocol import Publisher
+
+
+@dataclass(frozen=True, slots=True)
+class DeltaConfig:
+    state_file: str
+    heartbeat_interval: float = 300.0
+    latency_buckets_ms: tuple[int, ...] = (100, 300, 1000, 3000)
+    snapshot_interval: float = 30.0
+
+
+@dataclass(frozen=True, slots=True)
+class DeltaStats:
+    tracked: int
+    full: int
+    heartbeats: int
+    suppressed: int
+
+
+@dataclass(frozen=True, slots=True)
+class _ProbeState:
+    status_class: int
+    cert: tuple[str | None, str | None, float, float] | None
+    latency_bucket: int
+    last_sent: float
+    assertions_ok: bool | None = None
+
+
+class DeltaPublisher:
+    """Publishes a probe's full outcome only when its state changes.
+
+    The state is the status class (2xx, 5xx, ...), the certificate, the latency bucket and
+    whether the body assertions passed.
+    An unchanged run is sent as a compact heartbeat at most every ``heartbeat_interval``
+    seconds and dropped otherwise. The last published state is kept per probe and
+    snapshotted to ``state_file``, so a restart does not re-announce every probe.
+    """
+
+    def __init__(
+            self,
+            inner: Publisher,
+            logger: Logger,
+            cfg: DeltaConfig,
+            clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._inner = inner
+        self._logger = logger
+        self._cfg = cfg
+        self._clock = clock
+        self._states: dict[str, _ProbeState] = _load_states(Path(cfg.state_file), logger)
+        self._dirty = False
+        self._snapshot_task: asyncio.Task[None] | None = None
+        self._full = 0
+        self._heartbeats = 0
+        self._suppressed = 0
+
+    def start(self) -> None:
+        if self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(self._snapshot_forever())
+
+    async def aclose(self) -> None:
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+            self._snapshot_task = None
+        await self.snapshot()
+
+    def stats(self) -> DeltaStats:
+        return DeltaStats(
+            tracked=len(self._states),
+            full=self._full,
+            heartbeats=self._heartbeats,
+            suppressed=self._suppressed,
+        )
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        self.start()
+        now = self._clock()
+        results: list[Result[None, str]] = [Ok(None)] * len(outcomes)
+        sending: list[tuple[int, ProbeOutcome, _ProbeState]] = []
+
+        for i, outcome in enumerate(outcomes):
+            state = self._state_of(outcome, now)
+            previous = self._states.get(outcome.probe_name)
+            if previous is None or _changed(previous, state):
+                sending.append((i, outcome, state))
+            elif now - previous.last_sent >= self._cfg.heartbeat_interval:
+                heartbeat = ProbeOutcome(outcome.probe_name, HttpResult(outcome.result.status_code,
+                                                                        outcome.result.elapsed_ms),
+                                         None, heartbeat=True)
+                sending.append((i, heartbeat, state))
+            else:
+                self._suppressed += 1
+
+        if not sending:
+            return results
+
+        published = await self._inner.publish_many([outcome for _, outcome, _ in sending])
+        for (i, outcome, state), result in zip(sending, published):
+            results[i] = result
+            # A failed send leaves the old state, so the change is retried on the next run.
+            if isinstance(result, Ok):
+                self._states[outcome.probe_name] = state
+                self._dirty = True
+                if outcome.heartbeat:
+                    self._heartbeats += 1
+                else:
+                    self._full += 1
+        return results
+
+    def _state_of(self, outcome: ProbeOutcome, now: float) -> _ProbeState:
+        cert = outcome.cert_info
+        return _ProbeState(
+            status_class=outcome.result.status_code // 100,
+            cert=(cert.subject_cn, cert.issuer_cn, cert.not_before.timestamp(), cert.not_after.timestamp())
+            if cert else None,
+            latency_bucket=bisect.bisect_right(self._cfg.latency_buckets_ms, outcome.result.elapsed_ms),
+            last_sent=now,
+            assertions_ok=outcome.result.assertions_ok,
+        )
+
+    async def _snapshot_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._cfg.snapshot_interval)
+            await self.snapshot()
+
+    async def snapshot(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = json.dumps({name: [s.status_class, s.cert, s.latency_bucket, s.last_sent, s.assertions_ok]
+                           for name, s in self._states.items()})
+        try:
+            await asyncio.to_thread(_write_atomically, Path(self._cfg.state_file), data)
+        except OSError as e:
+            self._dirty = True
+            self._logger.error("Failed to snapshot delta publishing state", error=str(e))
+
+
+def _changed(previous: _ProbeState, current: _ProbeState) -> bool:
+    return (previous.status_class != current.status_class
+            or previous.cert != current.cert
+            or previous.latency_bucket != current.latency_bucket
+            or previous.assertions_ok != current.assertions_ok)
+
+
+def _load_states(path: Path, logger: Logger) -> dict[str, _ProbeState]:
+    try:
+        raw: dict[str, Any] = json.loads(path.read_text("utf-8"))
+        # Snapshots written before body assertions existed have four fields.
+        return {
+            name: _ProbeState(status_class, tuple(cert) if cert else None, latency_bucket, last_sent, *rest)
+            for name, (status_class, cert, latency_bucket, last_sent, *rest) in raw.items()
+        }
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning("Ignoring unreadable delta publishing state", path=str(path), error=str(e))
+        return {}
+
+
+def _write_atomically(path: Path, data: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(data, "utf-8")
+    os.replace(tmp, path)
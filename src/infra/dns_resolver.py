@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from src.common.ttl_cache import TtlCache
+
+
+@dataclass(frozen=True, slots=True)
+class DnsCacheConfig:
+    ttl: float = 60.0
+    negative_ttl: float = 5.0
+    max_entries: int = 10_000
+
+
+class _Failure:
+    __slots__ = ("message",)
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+class CachingResolver:
+    """Resolves host names through ``loop.getaddrinfo`` and caches the answers per host.
+
+    Failures are cached for ``negative_ttl`` so a dead name does not tie up the resolver
+    threads on every run. Concurrent lookups of the same host share one ``getaddrinfo``
+    call. A caller that passes ``fresh=True`` always resolves, and refreshes the cache.
+    """
+
+    def __init__(self, cfg: DnsCacheConfig = DnsCacheConfig(), clock: Callable[[], float] = time.monotonic) -> None:
+        self._cfg = cfg
+        self._cache: TtlCache[str, tuple[str, ...] | _Failure] = TtlCache(cfg.ttl, cfg.max_entries, clock)
+        self._lookups: dict[str, asyncio.Task[tuple[str, ...] | _Failure]] = {}
+
+    async def resolve(self, host: str, fresh: bool = False) -> list[str]:
+        if _is_ip_address(host):
+            return [host]
+
+        answer = None if fresh else self._cache.get(host)
+        if answer is None:
+            # Shielded so a cancelled caller does not abort a lookup other probes are waiting on.
+            answer = await asyncio.shield(self._start_lookup(host, fresh))
+
+        if isinstance(answer, _Failure):
+            raise socket.gaierror(answer.message)
+        return list(answer)
+
+    def _start_lookup(self, host: str, fresh: bool) -> asyncio.Task[tuple[str, ...] | _Failure]:
+        lookup = None if fresh else self._lookups.get(host)
+        if lookup is None:
+            lookup = asyncio.create_task(self._lookup(host))
+            if host not in self._lookups:
+                self._lookups[host] = lookup
+                lookup.add_done_callback(lambda done: self._forget(host, done))
+        return lookup
+
+    def _forget(self, host: str, lookup: asyncio.Task[tuple[str, ...] | _Failure]) -> None:
+        if self._lookups.get(host) is lookup:
+            del self._lookups[host]
+
+    async def _lookup(self, host: str) -> tuple[str, ...] | _Failure:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except OSError as e:
+            failure = _Failure(str(e))
+            self._cache.put(host, failure, ttl=self._cfg.negative_ttl)
+            return failure
+
+        addresses = tuple(dict.fromkeys(str(info[4][0]) for info in infos))
+        self._cache.put(host, addresses)
+        return addresses
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
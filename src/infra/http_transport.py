@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import ssl
+import time
+import typing
+from contextvars import ContextVar
+from typing import Any, Final, Mapping
+
+import httpcore
+import httpx
+
+from src.domain import HttpTimings
+from src.infra.dns_resolver import CachingResolver
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("_current_trace", default=None)
+
+
+class RequestTrace:
+    """Collects phase timestamps for one request from httpcore trace events.
+
+    DNS and TCP connect are recorded by ``ResolvingNetworkBackend`` through a context
+    variable, since httpcore resolves inside ``connect_tcp`` without emitting events.
+    Phases that did not happen (a pooled connection was reused) stay ``None``. With
+    ``fresh_dns`` the host is resolved past the DNS cache, so ``dns_ms`` is a real lookup.
+    """
+
+    def __init__(self, capture_peer_cert: bool = False, fresh_dns: bool = False) -> None:
+        self._capture_peer_cert = capture_peer_cert
+        self.fresh_dns = fresh_dns
+        self.started = time.perf_counter()
+        self.dns_ms: float | None = None
+        self.connect_ms: float | None = None
+        self.tls_ms: float | None = None
+        self.ttfb_ms: float | None = None
+        self.handshake_completed = False
+        self.peer_cert: object = None
+        self._tls_started = 0.0
+
+    def activate(self) -> None:
+        _current_trace.set(self)
+
+    async def __call__(self, event_name: str, info: Mapping[str, Any]) -> None:
+        match event_name:
+            case "connection.start_tls.started":
+                self._tls_started = time.perf_counter()
+            case "connection.start_tls.complete":
+                self.tls_ms = _ms_since(self._tls_started)
+                self.handshake_completed = True
+                if self._capture_peer_cert:
+                    self.peer_cert = peer_cert(info.get("return_value"))
+            case "http11.receive_response_headers.complete" | "http2.receive_response_headers.complete":
+                self.ttfb_ms = _ms_since(self.started)
+
+    def timings(self) -> HttpTimings:
+        total_ms = _ms_since(self.started)
+        return HttpTimings(
+            dns_ms=self.dns_ms,
+            connect_ms=self.connect_ms,
+            tls_ms=self.tls_ms,
+            ttfb_ms=self.ttfb_ms if self.ttfb_ms is not None else total_ms,
+            total_ms=total_ms,
+        )
+
+
+class ResolvingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Resolves the host itself before connecting so DNS time is measured on its own."""
+
+    def __init__(self, resolver: CachingResolver, inner: httpcore.AsyncNetworkBackend | None = None) -> None:
+        self._resolver = resolver
+        self._inner = inner or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+            self,
+            host: str,
+            port: int,
+            timeout: float | None = None,
+            local_address: str | None = None,
+            socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        trace = _current_trace.get()
+
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                addresses = await self._resolver.resolve(host, fresh=trace is not None and trace.fresh_dns)
+        except TimeoutError as e:
+            raise httpcore.ConnectTimeout(f"Timed out resolving {host}") from e
+        except OSError as e:
+            raise httpcore.ConnectError(f"Failed to resolve {host}: {e}") from e
+        if trace is not None:
+            trace.dns_ms = _ms_since(started)
+
+        started = time.perf_counter()
+        last_error: Exception = httpcore.ConnectError(f"No addresses for {host}")
+        for address in addresses:
+            try:
+                stream = await self._inner.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+                continue
+            if trace is not None:
+                trace.connect_ms = _ms_since(started)
+            return stream
+        raise last_error
+
+    async def connect_unix_socket(
+            self,
+            path: str,
+            timeout: float | None = None,
+            socket_options: typing.Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._inner.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._inner.sleep(seconds)
+
+
+# httpcore errors as httpx raises them; the most specific match wins.
+_HTTPCORE_ERRORS: Final[dict[type[Exception], type[httpx.HTTPError]]] = {
+    httpcore.TimeoutException: httpx.TimeoutException,
+    httpcore.ConnectTimeout: httpx.ConnectTimeout,
+    httpcore.ReadTimeout: httpx.ReadTimeout,
+    httpcore.WriteTimeout: httpx.WriteTimeout,
+    httpcore.PoolTimeout: httpx.PoolTimeout,
+    httpcore.NetworkError: httpx.NetworkError,
+    httpcore.ConnectError: httpx.ConnectError,
+    httpcore.ReadError: httpx.ReadError,
+    httpcore.WriteError: httpx.WriteError,
+    httpcore.ProxyError: httpx.ProxyError,
+    httpcore.UnsupportedProtocol: httpx.UnsupportedProtocol,
+    httpcore.ProtocolError: httpx.ProtocolError,
+    httpcore.LocalProtocolError: httpx.LocalProtocolError,
+    httpcore.RemoteProtocolError: httpx.RemoteProtocolError,
+}
+
+
+class PoolTransport(httpx.AsyncBaseTransport):
+    """An httpx transport over an ``httpcore.AsyncConnectionPool`` whose hosts resolve through ``network_backend``.
+
+    httpx's own transport builds its pool internally with no way to pass a network backend,
+    so requests and responses are mapped here instead. Proxies from the environment are
+    still honoured: ``httpx.AsyncClient`` mounts its proxy transports in front of this one.
+    With ``http2`` the pool offers h2 over TLS (ALPN) and multiplexes requests to an origin
+    over one connection, falling back to HTTP/1.1 where the server does not take it up.
+    """
+
+    def __init__(self, limits: httpx.Limits, network_backend: httpcore.AsyncNetworkBackend,
+                 http2: bool = False, ssl_context: ssl.SSLContext | None = None) -> None:
+        self._pool = httpcore.AsyncConnectionPool(
+            # httpcore sets the ALPN protocols on the context in place, so a shared one must
+            # only be shared between pools with the same ``http2``.
+            ssl_context=ssl_context or httpx.create_ssl_context(verify=True),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=network_backend,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(request.stream, httpx.AsyncByteStream)
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            response = await self._pool.handle_async_request(core_request)
+        assert isinstance(response.stream, typing.AsyncIterable)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: typing.AsyncIterable[bytes]) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> typing.AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._stream, "aclose", None)
+        if aclose is not None:
+            with _httpx_errors():
+                await aclose()
+
+
+@contextlib.contextmanager
+def _httpx_errors() -> typing.Iterator[None]:
+    try:
+        yield
+    except Exception as e:
+        mapped: type[httpx.HTTPError] | None = None
+        for core_error, httpx_error in _HTTPCORE_ERRORS.items():
+            if isinstance(e, core_error) and (mapped is None or issubclass(httpx_error, mapped)):
+                mapped = httpx_error
+        if mapped is None:
+            raise
+        raise mapped(str(e)) from e
+
+
+def peer_cert(stream: object) -> object:
+    get_extra_info = getattr(stream, "get_extra_info", None)
+    ssl_object = get_extra_info("ssl_object") if get_extra_info else None
+    return ssl_object.getpeercert() if ssl_object else None
+
+
+def _ms_since(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
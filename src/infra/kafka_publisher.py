@@ -1,44 +1,150 @@
-import json
+import asyncio
+import time
 from dataclasses import dataclass
+from typing import Any, Callable, Final, Sequence
 
-from confluent_kafka import Producer
+from confluent_kafka import KafkaError, Message, Producer
 
 from src.common.logging import Logger
-from src.domain import HttpResult, CertInfo
+from src.common.metrics import MetricsRegistry
+from src.common.result import Result, Err, Ok
+from src.domain import HttpResult, CertInfo, LatencySummary, ProbeOutcome
+from src.infra.outcome_codec import SERIALIZERS, OutcomeSerializer, encode_summary
+
+POLL_INTERVAL_SECONDS: Final[float] = 0.05
+
+_SUMMARY_HEADERS: Final[list[tuple[str, bytes]]] = [("content-type", b"application/vnd.ping-monkey.summary+json")]
 
 
 @dataclass(frozen=True, slots=True)
 class KafkaPublisherConfig:
     kafka_cfg: dict[str, str]
     topic: str
+    linger_ms: int = 20
+    batch_size: int = 1_000_000
+    compression: str = "lz4"
+    serializer: str = "json"
+    summary_topic: str | None = None
+    flush_timeout: float = 10.0
+    delivery_timeout: float = 30.0  # seconds a publish waits for the broker's acknowledgement
 
 
 class KafkaPublisher:
-    def __init__(self, logger: Logger, cfg: KafkaPublisherConfig) -> None:
+    def __init__(self, logger: Logger, cfg: KafkaPublisherConfig, metrics: MetricsRegistry | None = None) -> None:
         self._logger = logger
-        self._producer = Producer(cfg.kafka_cfg)
+        # Explicit librdkafka settings in `cfg` win over the batching shorthands.
+        self._producer = Producer({
+            # librdkafka gives up on a message when publish stops waiting for it, so a
+            # message reported as failed is not delivered behind the caller's back.
+            "message.timeout.ms": int(cfg.delivery_timeout * 1000),
+            "linger.ms": cfg.linger_ms,
+            "batch.size": cfg.batch_size,
+            "compression.type": cfg.compression,
+            **cfg.kafka_cfg,
+        })
         self._topic = cfg.topic
+        self._summary_topic = cfg.summary_topic or cfg.topic
+        self._serializer: OutcomeSerializer = SERIALIZERS[cfg.serializer]()
+        self._headers = [("content-type", self._serializer.content_type.encode("ascii"))]
+        self._flush_timeout = cfg.flush_timeout
+        self._delivery_timeout = cfg.delivery_timeout
+        self._poll_task: asyncio.Task[None] | None = None
 
-    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> None:
-        payload = json.dumps({
-            "probeName": probe_name,
-            "httpResult": {
-                "statusCode": result.status_code,
-                "elapsedMs": result.elapsed_ms,
-            },
-            "certInfo": {
-                "subjectCN": cert_info.subject_cn,
-                "issuerCN": cert_info.issuer_cn,
-                "notBefore": cert_info.not_before.isoformat(),
-                "notAfter": cert_info.not_after.isoformat(),
-            } if cert_info else None
-        })
+        metrics = metrics or MetricsRegistry()
+        self._messages = metrics.counter("kafka_messages_total", "Messages by delivery result", ["topic", "result"])
+        self._batch_delivery_metric = metrics.histogram(
+            "kafka_batch_delivery_seconds", "Time from producing a batch until its last delivery report").labels()
+        # len() of a producer is the number of messages librdkafka still holds: queued, in flight or unacked.
+        metrics.gauge("kafka_queue_messages", "Messages waiting in the producer queue") \
+            .set_function(lambda: len(self._producer))
+
+    def start(self) -> None:
+        if self._poll_task is None:
+            self._poll_task = asyncio.create_task(self._poll_deliveries())
+
+    async def aclose(self) -> None:
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
 
-        try:
-            self._producer.produce(self._topic, payload.encode('utf-8'))
-            self._producer.flush()
-            self._logger.info("Published probe outcome to Kafka",
-                              probe=probe_name,
+        remaining = await asyncio.to_thread(self._producer.flush, self._flush_timeout)
+        if remaining:
+            self._logger.error("Kafka producer closed with undelivered messages", count=remaining)
+
+    async def _poll_deliveries(self) -> None:
+        # Serves delivery callbacks without blocking the loop; produce() itself never waits.
+        while True:
+            self._producer.poll(0)
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        encode = self._serializer.encode
+        results = await self._produce_all(self._topic, [encode(o) for o in outcomes], self._headers)
+
+        failures = [r.error for r in results if isinstance(r, Err)]
+        if failures:
+            self._logger.error("Failed to publish probe outcomes to Kafka", count=len(failures), error=failures[0])
+        if len(failures) < len(results):
+            self._logger.info("Published probe outcomes to Kafka",
+                              count=len(results) - len(failures),
                               topic=self._topic)
-        except Exception as e:
-            self._logger.error("Failed to publish probe outcome to Kafka", error=str(e))
+        return results
+
+    async def publish_summaries(self, summaries: Sequence[LatencySummary]) -> Result[None, str]:
+        results = await self._produce_all(self._summary_topic, [encode_summary(s) for s in summaries],
+                                          _SUMMARY_HEADERS)
+        failures = [r.error for r in results if isinstance(r, Err)]
+        if failures:
+            return Err(f"{len(failures)} of {len(results)} summaries failed: {failures[0]}")
+
+        self._logger.info("Published latency summaries to Kafka", count=len(results), topic=self._summary_topic)
+        return Ok(None)
+
+    async def _produce_all(self, topic: str, payloads: list[bytes],
+                           headers: list[tuple[str, bytes]]) -> list[Result[None, str]]:
+        self.start()
+        loop = asyncio.get_running_loop()
+        deliveries: list[asyncio.Future[Result[None, str]]] = []
+
+        started = time.perf_counter()
+
+        for payload in payloads:
+            delivered: asyncio.Future[Result[None, str]] = loop.create_future()
+            deliveries.append(delivered)
+            try:
+                self._producer.produce(topic, payload, headers=headers,
+                                       on_delivery=_delivery_callback(loop, delivered))
+            except Exception as e:
+                delivered.set_result(Err(f"Kafka produce failed: {e}"))
+
+        # Bounded, so an unreachable broker cannot hold the caller (and its scheduler worker) indefinitely.
+        await asyncio.wait(deliveries, timeout=self._delivery_timeout)
+        for delivered in deliveries:
+            _resolve(delivered, Err(f"Kafka delivery timed out after {self._delivery_timeout}s"))
+        results: list[Result[None, str]] = [delivered.result() for delivered in deliveries]
+        self._batch_delivery_metric.observe(time.perf_counter() - started)
+        failed = sum(isinstance(r, Err) for r in results)
+        if failed:
+            self._messages.labels(topic, "failed").inc(failed)
+        if failed < len(results):
+            self._messages.labels(topic, "delivered").inc(len(results) - failed)
+        return results
+
+
+def _delivery_callback(
+        loop: asyncio.AbstractEventLoop,
+        delivered: asyncio.Future[Result[None, str]],
+) -> Callable[[KafkaError | None, Message], None]:
+    def on_delivery(err: KafkaError | None, _: Message) -> None:
+        loop.call_soon_threadsafe(_resolve, delivered, Err(f"Kafka delivery failed: {err}") if err else Ok(None))
+
+    return on_delivery
+
+
+def _resolve(future: asyncio.Future[Any], value: Any) -> None:
+    if not future.done():
+        future.set_result(value)
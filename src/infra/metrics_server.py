@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from typing import Final
+
+from src.common.logging import Logger
+from src.common.metrics import MetricsRegistry
+
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+READ_TIMEOUT_SECONDS: Final[float] = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class MetricsServerConfig:
+    host: str = "127.0.0.1"
+    port: int = 9464
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` in the Prometheus text format; every other path is a 404."""
+
+    def __init__(self, registry: MetricsRegistry, cfg: MetricsServerConfig, logger: Logger) -> None:
+        self._registry = registry
+        self._cfg = cfg
+        self._logger = logger
+        self._server: asyncio.Server | None = None
+
+    @property
+    def port(self) -> int | None:
+        if self._server is None or not self._server.sockets:
+            return None
+        port: int = self._server.sockets[0].getsockname()[1]
+        return port
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self._cfg.host, self._cfg.port)
+        self._logger.info("Serving metrics", host=self._cfg.host, port=self.port)
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            async with asyncio.timeout(READ_TIMEOUT_SECONDS):
+                head = await reader.readuntil(b"\r\n\r\n")
+            method, _, rest = head.partition(b" ")
+            path = rest.split(b" ", 1)[0].split(b"?", 1)[0]
+
+            if method in (b"GET", b"HEAD") and path == b"/metrics":
+                body = self._registry.render().encode("utf-8")
+                status = b"200 OK"
+            else:
+                body, status = b"Not Found\n", b"404 Not Found"
+
+            writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Type: " + CONTENT_TYPE.encode("ascii")
+                         + b"\r\nContent-Length: " + str(len(body)).encode("ascii")
+                         + b"\r\nConnection: close\r\n\r\n" + (body if method != b"HEAD" else b""))
+            await writer.drain()
+        except (TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
@@ -0,0 +1,343 @@
+import hashlib
+import json
+import math
+import struct
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Final, Iterable, Protocol
+
+from src.common.result import Result, Err, Ok
+from src.domain import Attempt, CertInfo, HttpResult, HttpTimings, LatencySummary, ProbeOutcome
+
+BINARY_SCHEMA_VERSION: Final[int] = 1
+
+_FLAG_TIMINGS: Final[int] = 0x01
+_FLAG_CERT: Final[int] = 0x02
+_FLAG_HEARTBEAT: Final[int] = 0x04
+_FLAG_BODY: Final[int] = 0x08
+_FLAG_HTTP_VERSION: Final[int] = 0x10
+_FLAG_ATTEMPTS: Final[int] = 0x20
+_NO_STRING: Final[int] = 0xFFFF
+
+# version, flags, probe id, status code, elapsed ms
+_BINARY_HEADER: Final[struct.Struct] = struct.Struct("<BBQHI")
+# dns, connect, tls, ttfb, total in ms; NaN for a phase that did not happen
+_BINARY_TIMINGS: Final[struct.Struct] = struct.Struct("<5f")
+# notBefore, notAfter as epoch seconds
+_BINARY_CERT: Final[struct.Struct] = struct.Struct("<qq")
+# body bytes, truncated, assertions (0 none, 1 passed, 2 failed); then the failure as a string
+_BINARY_BODY: Final[struct.Struct] = struct.Struct("<IBB")
+_BINARY_STRING_LENGTH: Final[struct.Struct] = struct.Struct("<H")
+_ASSERTIONS_CODE: Final[dict[bool | None, int]] = {None: 0, True: 1, False: 2}
+_ASSERTIONS_FROM_CODE: Final[dict[int, bool | None]] = {code: ok for ok, code in _ASSERTIONS_CODE.items()}
+# the negotiated protocol, one byte after the body section
+_BINARY_HTTP_VERSION: Final[struct.Struct] = struct.Struct("<B")
+_HTTP_VERSION_CODE: Final[dict[str, int]] = {"HTTP/1.0": 1, "HTTP/1.1": 2, "HTTP/2": 3}
+_HTTP_VERSION_FROM_CODE: Final[dict[int, str]] = {code: version for version, code in _HTTP_VERSION_CODE.items()}
+# attempt count, then per attempt: started ms, elapsed ms, outcome, hedge
+_BINARY_ATTEMPT_COUNT: Final[struct.Struct] = struct.Struct("<B")
+_BINARY_ATTEMPT: Final[struct.Struct] = struct.Struct("<ffBB")
+_ATTEMPT_OUTCOME_CODE: Final[dict[str, int]] = {"response": 1, "error": 2, "timeout": 3, "cancelled": 4}
+_ATTEMPT_OUTCOME_FROM_CODE: Final[dict[int, str]] = {code: outcome for outcome, code in _ATTEMPT_OUTCOME_CODE.items()}
+
+
+class OutcomeSerializer(Protocol):
+    name: str
+    content_type: str
+
+    def encode(self, outcome: ProbeOutcome) -> bytes: ...
+
+    def decode(self, data: bytes) -> Result[ProbeOutcome, str]: ...
+
+
+class JsonSerializer:
+    name = "json"
+    content_type = "application/json"
+
+    def encode(self, outcome: ProbeOutcome) -> bytes:
+        result, cert_info = outcome.result, outcome.cert_info
+        if outcome.heartbeat:
+            return json.dumps({
+                "probeName": outcome.probe_name,
+                "heartbeat": True,
+                "statusCode": result.status_code,
+                "elapsedMs": result.elapsed_ms,
+            }).encode("utf-8")
+
+        return json.dumps({
+            "probeName": outcome.probe_name,
+            "httpResult": {
+                "statusCode": result.status_code,
+                "elapsedMs": result.elapsed_ms,
+                "timings": {
+                    "dnsMs": result.timings.dns_ms,
+                    "connectMs": result.timings.connect_ms,
+                    "tlsMs": result.timings.tls_ms,
+                    "ttfbMs": result.timings.ttfb_ms,
+                    "totalMs": result.timings.total_ms,
+                } if result.timings else None,
+                # Only results that read a body (GET probes) carry this section.
+                **({"body": {
+                    "bytes": result.body_bytes,
+                    "truncated": result.body_truncated,
+                    "assertionsOk": result.assertions_ok,
+                    "assertionError": result.assertion_error,
+                }} if result.body_bytes is not None else {}),
+                **({"httpVersion": result.http_version} if result.http_version is not None else {}),
+                # Only runs that needed a retry or a hedge list their attempts.
+                **({"attempts": [{
+                    "startedMs": attempt.started_ms,
+                    "elapsedMs": attempt.elapsed_ms,
+                    "outcome": attempt.outcome,
+                    "hedge": attempt.hedge,
+                } for attempt in result.attempts]} if result.attempts else {}),
+            },
+            "certInfo": {
+                "subjectCN": cert_info.subject_cn,
+                "issuerCN": cert_info.issuer_cn,
+                "notBefore": cert_info.not_before.isoformat(),
+                "notAfter": cert_info.not_after.isoformat(),
+            } if cert_info else None
+        }).encode("utf-8")
+
+    def decode(self, data: bytes) -> Result[ProbeOutcome, str]:
+        try:
+            doc: dict[str, Any] = json.loads(data)
+            if doc.get("heartbeat"):
+                return Ok(ProbeOutcome(
+                    probe_name=doc["probeName"],
+                    result=HttpResult(status_code=doc["statusCode"], elapsed_ms=doc["elapsedMs"]),
+                    cert_info=None,
+                    heartbeat=True,
+                ))
+
+            http = doc["httpResult"]
+            timings = http.get("timings")
+            body = http.get("body")
+            cert = doc.get("certInfo")
+            return Ok(ProbeOutcome(
+                probe_name=doc["probeName"],
+                result=HttpResult(
+                    status_code=http["statusCode"],
+                    elapsed_ms=http["elapsedMs"],
+                    timings=HttpTimings(
+                        dns_ms=timings["dnsMs"],
+                        connect_ms=timings["connectMs"],
+                        tls_ms=timings["tlsMs"],
+                        ttfb_ms=timings["ttfbMs"],
+                        total_ms=timings["totalMs"],
+                    ) if timings else None,
+                    body_bytes=body["bytes"] if body else None,
+                    body_truncated=body["truncated"] if body else False,
+                    assertions_ok=body["assertionsOk"] if body else None,
+                    assertion_error=body["assertionError"] if body else None,
+                    http_version=http.get("httpVersion"),
+                    attempts=tuple(Attempt(
+                        started_ms=attempt["startedMs"],
+                        elapsed_ms=attempt["elapsedMs"],
+                        outcome=attempt["outcome"],
+                        hedge=attempt["hedge"],
+                    ) for attempt in http.get("attempts", ())),
+                ),
+                cert_info=CertInfo(
+                    subject_cn=cert["subjectCN"],
+                    issuer_cn=cert["issuerCN"],
+                    not_before=datetime.fromisoformat(cert["notBefore"]),
+                    not_after=datetime.fromisoformat(cert["notAfter"]),
+                ) if cert else None,
+            ))
+        except (ValueError, KeyError, TypeError) as e:
+            return Err(f"Malformed probe outcome: {e}")
+
+
+class BinarySerializer:
+    """Fixed-layout little-endian encoding, versioned by its first byte.
+
+    The probe name travels as ``probe_id(name)``. Consumers pass the probe names they know
+    to map ids back; an unknown id decodes to its hex form. Certificate dates are epoch
+    seconds, and timings are float32 milliseconds. A heartbeat is the header alone.
+    """
+
+    name = "binary"
+    content_type = f"application/vnd.ping-monkey.outcome.v{BINARY_SCHEMA_VERSION}"
+
+    def __init__(self, probe_names: Iterable[str] = ()) -> None:
+        self._ids: dict[str, int] = {}
+        self._names: dict[int, str] = {}
+        for name in probe_names:
+            self._names[self._intern(name)] = name
+
+    def _intern(self, name: str) -> int:
+        probe = self._ids.get(name)
+        if probe is None:
+            probe = self._ids[name] = probe_id(name)
+        return probe
+
+    def encode(self, outcome: ProbeOutcome) -> bytes:
+        result, cert, timings = outcome.result, outcome.cert_info, outcome.result.timings
+        if outcome.heartbeat:
+            # A heartbeat repeats an unchanged state, so only the header is sent.
+            return _BINARY_HEADER.pack(BINARY_SCHEMA_VERSION, _FLAG_HEARTBEAT, self._intern(outcome.probe_name),
+                                       result.status_code, result.elapsed_ms)
+
+        version_code = _HTTP_VERSION_CODE.get(result.http_version or "")
+        flags = ((_FLAG_TIMINGS if timings else 0) | (_FLAG_CERT if cert else 0)
+                 | (_FLAG_BODY if result.body_bytes is not None else 0)
+                 | (_FLAG_HTTP_VERSION if version_code is not None else 0)
+                 | (_FLAG_ATTEMPTS if result.attempts else 0))
+        parts = [_BINARY_HEADER.pack(BINARY_SCHEMA_VERSION, flags, self._intern(outcome.probe_name),
+                                     result.status_code, result.elapsed_ms)]
+        if timings:
+            parts.append(_BINARY_TIMINGS.pack(_or_nan(timings.dns_ms), _or_nan(timings.connect_ms),
+                                              _or_nan(timings.tls_ms), timings.ttfb_ms, timings.total_ms))
+        if cert:
+            parts.append(_BINARY_CERT.pack(int(cert.not_before.timestamp()), int(cert.not_after.timestamp())))
+            parts.append(_pack_string(cert.subject_cn))
+            parts.append(_pack_string(cert.issuer_cn))
+        if result.body_bytes is not None:
+            # Sections are appended after the previous ones, so older decoders ignore the ones they predate.
+            parts.append(_BINARY_BODY.pack(result.body_bytes, result.body_truncated,
+                                           _ASSERTIONS_CODE[result.assertions_ok]))
+            parts.append(_pack_string(result.assertion_error))
+        if version_code is not None:
+            parts.append(_BINARY_HTTP_VERSION.pack(version_code))
+        if result.attempts:
+            parts.append(_BINARY_ATTEMPT_COUNT.pack(len(result.attempts)))
+            parts.extend(_BINARY_ATTEMPT.pack(a.started_ms, a.elapsed_ms, _ATTEMPT_OUTCOME_CODE[a.outcome], a.hedge)
+                         for a in result.attempts)
+        return b"".join(parts)
+
+    def decode(self, data: bytes) -> Result[ProbeOutcome, str]:
+        try:
+            version, flags, probe, status_code, elapsed_ms = _BINARY_HEADER.unpack_from(data)
+            if version != BINARY_SCHEMA_VERSION:
+                return Err(f"Unsupported outcome schema version {version}")
+            offset = _BINARY_HEADER.size
+
+            timings = None
+            if flags & _FLAG_TIMINGS:
+                dns_ms, connect_ms, tls_ms, ttfb_ms, total_ms = _BINARY_TIMINGS.unpack_from(data, offset)
+                offset += _BINARY_TIMINGS.size
+                timings = HttpTimings(_or_none(dns_ms), _or_none(connect_ms), _or_none(tls_ms), ttfb_ms, total_ms)
+
+            cert = None
+            if flags & _FLAG_CERT:
+                not_before, not_after = _BINARY_CERT.unpack_from(data, offset)
+                offset += _BINARY_CERT.size
+                subject_cn, offset = _unpack_string(data, offset)
+                issuer_cn, offset = _unpack_string(data, offset)
+                cert = CertInfo(
+                    subject_cn=subject_cn,
+                    issuer_cn=issuer_cn,
+                    not_before=datetime.fromtimestamp(not_before, timezone.utc),
+                    not_after=datetime.fromtimestamp(not_after, timezone.utc),
+                )
+
+            result = HttpResult(status_code, elapsed_ms, timings)
+            if flags & _FLAG_BODY:
+                body_bytes, truncated, assertions = _BINARY_BODY.unpack_from(data, offset)
+                offset += _BINARY_BODY.size
+                assertion_error, offset = _unpack_string(data, offset)
+                result = replace(result, body_bytes=body_bytes, body_truncated=bool(truncated),
+                                 assertions_ok=_ASSERTIONS_FROM_CODE[assertions], assertion_error=assertion_error)
+            if flags & _FLAG_HTTP_VERSION:
+                (version_code,) = _BINARY_HTTP_VERSION.unpack_from(data, offset)
+                offset += _BINARY_HTTP_VERSION.size
+                result = replace(result, http_version=_HTTP_VERSION_FROM_CODE[version_code])
+            if flags & _FLAG_ATTEMPTS:
+                (count,) = _BINARY_ATTEMPT_COUNT.unpack_from(data, offset)
+                offset += _BINARY_ATTEMPT_COUNT.size
+                attempts = []
+                for _ in range(count):
+                    started_ms, attempt_ms, outcome, hedge = _BINARY_ATTEMPT.unpack_from(data, offset)
+                    offset += _BINARY_ATTEMPT.size
+                    attempts.append(Attempt(started_ms, attempt_ms, _ATTEMPT_OUTCOME_FROM_CODE[outcome], bool(hedge)))
+                result = replace(result, attempts=tuple(attempts))
+        except (struct.error, ValueError, KeyError) as e:
+            return Err(f"Malformed probe outcome: {e}")
+
+        return Ok(ProbeOutcome(
+            probe_name=self._names.get(probe, f"{probe:016x}"),
+            result=result,
+            cert_info=cert,
+            heartbeat=bool(flags & _FLAG_HEARTBEAT),
+        ))
+
+
+SERIALIZERS: Final[dict[str, type[JsonSerializer] | type[BinarySerializer]]] = {
+    JsonSerializer.name: JsonSerializer,
+    BinarySerializer.name: BinarySerializer,
+}
+
+
+def encode_summary(summary: LatencySummary) -> bytes:
+    # Summaries are one message per probe per window, so they stay JSON in every format.
+    return json.dumps({
+        "probeName": summary.probe_name,
+        "windowStart": summary.window_start,
+        "windowEnd": summary.window_end,
+        "runs": summary.runs,
+        "successes": summary.successes,
+        "availability": summary.successes / summary.runs if summary.runs else None,
+        "latencyMs": {
+            "p50": summary.p50_ms,
+            "p95": summary.p95_ms,
+            "p99": summary.p99_ms,
+            "min": summary.min_ms,
+            "max": summary.max_ms,
+            "mean": summary.mean_ms,
+        },
+        "sketch": summary.sketch,
+    }).encode("utf-8")
+
+
+def decode_summary(data: bytes) -> Result[LatencySummary, str]:
+    try:
+        doc: dict[str, Any] = json.loads(data)
+        latency = doc["latencyMs"]
+        return Ok(LatencySummary(
+            probe_name=doc["probeName"],
+            window_start=doc["windowStart"],
+            window_end=doc["windowEnd"],
+            runs=doc["runs"],
+            successes=doc["successes"],
+            p50_ms=latency["p50"],
+            p95_ms=latency["p95"],
+            p99_ms=latency["p99"],
+            min_ms=latency["min"],
+            max_ms=latency["max"],
+            mean_ms=latency["mean"],
+            sketch=doc["sketch"],
+        ))
+    except (ValueError, KeyError, TypeError) as e:
+        return Err(f"Malformed latency summary: {e}")
+
+
+def probe_id(name: str) -> int:
+    """Stable 64-bit id of a probe name, identical across processes and releases."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _or_nan(value: float | None) -> float:
+    return math.nan if value is None else value
+
+
+def _or_none(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def _pack_string(value: str | None) -> bytes:
+    if value is None:
+        return _BINARY_STRING_LENGTH.pack(_NO_STRING)
+    encoded = value.encode("utf-8")[:_NO_STRING - 1]
+    return _BINARY_STRING_LENGTH.pack(len(encoded)) + encoded
+
+
+def _unpack_string(data: bytes, offset: int) -> tuple[str | None, int]:
+    (length,) = _BINARY_STRING_LENGTH.unpack_from(data, offset)
+    offset += _BINARY_STRING_LENGTH.size
+    if length == _NO_STRING:
+        return None, offset
+    if offset + length > len(data):
+        raise ValueError("string runs past the end of the message")
+    return data[offset:offset + length].decode("utf-8", errors="replace"), offset + length
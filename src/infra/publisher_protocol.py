@@ -1,7 +1,12 @@
-from typing import Protocol
+from typing import Protocol, Sequence
 
-from src.domain import HttpResult, CertInfo
+from src.common.result import Result
+from src.domain import HttpResult, CertInfo, ProbeOutcome
 
 
 class Publisher(Protocol):
-    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> None: ...
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]: ...
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        """Publishes a batch; the i-th result reports the i-th outcome."""
+        ...
@@ -1,75 +1,406 @@
 from __future__ import annotations
 
 import asyncio
-import socket
+import contextlib
+import math
 import ssl
-from dataclasses import dataclass
+import time
+from collections import deque
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from typing import Any, Final, Mapping, Sequence, Tuple, Optional, cast, assert_never, Protocol
 
 import httpx
 from urllib.parse import urlparse
 
+from src.common.metrics import MetricsRegistry
 from src.common.result import Result, Err, Ok
-from src.domain import CertInfo, HttpResult
+from src.common.ttl_cache import TtlCache
+from src.domain import Attempt, CertInfo, HttpResult, Probe
+from src.infra.body_matcher import BodyMatcher
+from src.infra.dns_resolver import CachingResolver, DnsCacheConfig
+from src.infra.http_transport import RequestTrace, PoolTransport, ResolvingNetworkBackend, peer_cert
 
 CERT_TIME_FMT: Final[str] = "%b %d %H:%M:%S %Y %Z"  # e.g. 'Nov  9 12:34:56 2025 GMT'
+# A body abandoned with at most this much left (per Content-Length) is drained so the
+# connection can go back to the pool; anything longer is cheaper to reconnect.
+DRAIN_LIMIT_BYTES: Final[int] = 16_384
+# Hedging percentiles are taken over a probe's most recent responses, kept for probes that
+# responded within the TTL, up to a number of probes.
+HEDGE_SAMPLES: Final[int] = 200
+HEDGE_HISTORY_TTL: Final[float] = 3600.0
+HEDGE_HISTORY_MAX_PROBES: Final[int] = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class HttpRequestorConfig:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    cert_cache_ttl: float = 600.0
+    cert_cache_max_entries: int = 10_000
+    dns: DnsCacheConfig = DnsCacheConfig()
+    max_body_bytes: int = 65_536
+    http2_hosts: frozenset[str] = frozenset()
+    max_concurrent_streams: int = 100
+    timeout: float = 10.0  # seconds per attempt, for probes that do not set their own
 
 
 class Requestor(Protocol):
-    async def get_response(self, url: str) -> Result[HttpResult, str]: ...
+    async def get_response(self, probe: Probe) -> Result[HttpResult, str]: ...
+
+    async def get_cert_info(self, url: str, timeout: float | None = None) -> Result[CertInfo, str]: ...
 
-    def get_cert_info(self, url: str, timeout: float = 10.0) -> Result[CertInfo, str]: ...
+    async def aclose(self) -> None: ...
 
 
 class HttpRequestor:
-    def __init__(self):
-        pass
+    def __init__(
+            self,
+            cfg: HttpRequestorConfig = HttpRequestorConfig(),
+            metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self._cfg = cfg
+        self._resolver = CachingResolver(cfg.dns)
+        self._network_backend = ResolvingNetworkBackend(self._resolver)
+        self._client = self._create_client(cfg)
+        # Created on first use, since most deployments never enable HTTP/2.
+        self._http2_client: httpx.AsyncClient | None = None
+        # One per ALPN setting: httpcore sets the protocols on the context in place.
+        self._fresh_ssl_contexts: dict[bool, ssl.SSLContext] = {}
+        self._stream_slots: dict[tuple[str, int], asyncio.Semaphore] = {}
+        self._latencies: TtlCache[str, deque[float]] = TtlCache(HEDGE_HISTORY_TTL, HEDGE_HISTORY_MAX_PROBES)
+        self._ssl_context = _create_ssl_context()
+        self._cert_cache: TtlCache[str, CertInfo] = TtlCache(cfg.cert_cache_ttl, cfg.cert_cache_max_entries)
+
+        metrics = metrics or MetricsRegistry()
+        self._requests_metric = metrics.counter(
+            "http_requests_total", "Probe requests by status class, or error when no response came back", ["result"])
+        self._request_duration_metric = metrics.histogram(
+            "http_request_duration_seconds", "Probe request time until the body was read").labels()
+        cert_checks = metrics.counter("cert_checks_total", "Certificate lookups by where they were answered",
+                                      ["source"])
+        self._cert_from_cache, self._cert_from_network = cert_checks.labels("cache"), cert_checks.labels("network")
+        assertions = metrics.counter("http_body_assertions_total", "Responses checked against body assertions",
+                                     ["result"])
+        self._assertions_passed, self._assertions_failed = assertions.labels("passed"), assertions.labels("failed")
+        self._truncated_metric = metrics.counter(
+            "http_body_truncated_total", "Responses whose body ran past the byte limit").labels()
+        self._versions_metric = metrics.counter(
+            "http_responses_by_version_total", "Responses by the negotiated HTTP version", ["version"])
+        attempts = metrics.counter("http_attempts_total", "Probe requests by why they were sent", ["kind"])
+        self._first_attempts, self._retries, self._hedges = (
+            attempts.labels("first"), attempts.labels("retry"), attempts.labels("hedge"))
+        self._hedges_won_metric = metrics.counter(
+            "http_hedges_won_total", "Hedged requests that answered before the request they backed up").labels()
+        metrics.gauge("dns_cache_entries", "Hosts in the DNS cache").set_function(lambda: len(self._resolver))
+        metrics.gauge("cert_cache_entries", "Certificates in the cache").set_function(lambda: len(self._cert_cache))
+
+    def _create_client(self, cfg: HttpRequestorConfig, http2: bool = False,
+                       ssl_context: ssl.SSLContext | None = None) -> httpx.AsyncClient:
+        # No httpx timeouts: each attempt as a whole is bounded by the probe's timeout instead.
+        return httpx.AsyncClient(timeout=None, transport=PoolTransport(
+            httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive_connections,
+                keepalive_expiry=cfg.keepalive_expiry,
+            ),
+            self._network_backend,
+            http2=http2,
+            ssl_context=ssl_context,
+        ))
+
+    async def get_cert_info(self, url: str, timeout: float | None = None) -> Result[CertInfo, str]:
+        hostname, port = _host_and_port(url)
+        timeout = timeout or self._cfg.timeout
 
-    def get_cert_info(self, url: str, timeout: float = 10.0) -> Result[CertInfo, str]:
+        cached = self._cert_cache.get(f"{hostname}:{port}")
+        if cached is not None:
+            self._cert_from_cache.inc()
+            return Ok(cached)
+
+        self._cert_from_network.inc()
         try:
-            parsed = urlparse(url)
-            hostname = parsed.hostname or url
-            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+            async with asyncio.timeout(timeout):
+                writer = await self._open_tls_connection(hostname, port)
+                try:
+                    ssl_object = writer.get_extra_info("ssl_object")
+                    cert_raw = ssl_object.getpeercert() if ssl_object else None
+                finally:
+                    writer.close()
+                    with contextlib.suppress(OSError):
+                        await writer.wait_closed()
+        except TimeoutError:
+            return Err(f"Timed out after {timeout}s fetching certificate from {hostname}:{port}")
+        except (OSError, ssl.SSLError) as e:
+            return Err(f"Network/SSL error: {e}")
+
+        cert_info = _cert_to_cert_info(cert_raw)
+        if isinstance(cert_info, Ok):
+            self._cert_cache.put(f"{hostname}:{port}", cert_info.value)
+        return cert_info
 
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = True
-            ctx.verify_mode = ssl.CERT_REQUIRED
+    async def _open_tls_connection(self, hostname: str, port: int) -> asyncio.StreamWriter:
+        last_error: OSError = OSError(f"No addresses for {hostname}")
+        for address in await self._resolver.resolve(hostname):
+            try:
+                _, writer = await asyncio.open_connection(
+                    address, port, ssl=self._ssl_context, server_hostname=hostname)
+                return writer
+            except ssl.SSLError:
+                raise
+            except OSError as e:
+                last_error = e
+        raise last_error
 
-            with socket.create_connection((hostname, port), timeout=timeout) as sock:
-                with ctx.wrap_socket(sock, server_hostname=hostname) as ssock:
-                    cert_raw = ssock.getpeercert()
+    async def get_response(self, probe: Probe) -> Result[HttpResult, str]:
+        """Requests ``probe.url`` until a response comes back, retries run out or the deadline passes.
 
-            if not cert_raw:
-                return Err("Peer did not provide a certificate")
+        Only a missing response (connection error or timeout) is retried; any status code is
+        an answer. With a hedge policy each attempt is backed up by a second request once it
+        runs past the probe's latency percentile, and whichever responds first wins.
+        """
+        http2 = probe.http2 if probe.http2 is not None else _host_and_port(probe.url)[0] in self._cfg.http2_hosts
+        timeout = probe.timeout or self._cfg.timeout
+        started = time.perf_counter()
+        deadline = started + probe.deadline if probe.deadline is not None else math.inf
+        attempts: list[Attempt] = []
+        result: Result[HttpResult, str] = Err("Deadline passed before the first attempt")
 
-            cert: Mapping[str, Any] = cast(Mapping[str, Any], cert_raw)
+        for retry in range(probe.retries + 1):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            (self._retries if retry else self._first_attempts).inc()
+            result = await self._hedged_attempt(probe, http2, timeout, started, deadline, attempts)
+            if isinstance(result, Ok):
+                break
 
-            subject = _name_to_dict(cert.get("subject", ()))
-            issuer = _name_to_dict(cert.get("issuer", ()))
+        attempts.sort(key=lambda a: a.started_ms)
+        if len(attempts) > 1:
+            match result:
+                case Ok(response):
+                    return Ok(replace(response, attempts=tuple(attempts)))
+                case Err(error):
+                    return Err(f"{error} (attempts: {_describe_attempts(attempts)})")
+        return result
+
+    async def _hedged_attempt(self, probe: Probe, http2: bool, timeout: float, started: float, deadline: float,
+                              attempts: list[Attempt]) -> Result[HttpResult, str]:
+        hedge_after = self._hedge_delay(probe)
+        if hedge_after is None or hedge_after >= min(timeout, deadline - time.perf_counter()):
+            return await self._attempt(probe, http2, timeout, started, deadline, attempts)
+
+        primary = asyncio.create_task(self._attempt(probe, http2, timeout, started, deadline, attempts))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return primary.result()
 
-            not_before_raw = cert.get("notBefore")
-            not_after_raw = cert.get("notAfter")
+            self._hedges.inc()
+            # Ends with the attempt it backs up, so a hedge never stretches the run.
+            tasks.add(asyncio.create_task(
+                self._attempt(probe, http2, timeout - hedge_after, started, deadline, attempts, hedge=True)))
+            pending = set(tasks)
+            result: Result[HttpResult, str] = Err("No attempt completed")
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if isinstance(result, Ok):
+                        if task is not primary:
+                            self._hedges_won_metric.inc()
+                        return result
+            return result
+        finally:
+            # The loser is cancelled and awaited so its connection is released before returning.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            if not isinstance(not_before_raw, str) or not isinstance(not_after_raw, str):
-                return Err("Certificate missing notBefore/notAfter")
+    async def _attempt(self, probe: Probe, http2: bool, timeout: float, started: float, deadline: float,
+                       attempts: list[Attempt], hedge: bool = False) -> Result[HttpResult, str]:
+        if not http2 or probe.fresh_connection:
+            return await self._timed_attempt(probe, http2, timeout, started, deadline, attempts, hedge)
 
-            return Ok(CertInfo(
-                subject_cn=subject.get("commonName"),
-                issuer_cn=issuer.get("commonName"),
-                not_before=_parse_cert_datetime(not_before_raw),
-                not_after=_parse_cert_datetime(not_after_raw),
+        # Waiting for a stream slot is bounded by the deadline, but it is not request latency.
+        slot = self._stream_slot(probe.url)
+        try:
+            async with asyncio.timeout(deadline - time.perf_counter() if deadline < math.inf else None):
+                await slot.acquire()
+        except TimeoutError:
+            return Err("Deadline passed waiting for an HTTP/2 stream slot")
+        try:
+            return await self._timed_attempt(probe, http2, timeout, started, deadline, attempts, hedge)
+        finally:
+            slot.release()
+
+    async def _timed_attempt(self, probe: Probe, http2: bool, timeout: float, started: float, deadline: float,
+                             attempts: list[Attempt], hedge: bool) -> Result[HttpResult, str]:
+        began = time.perf_counter()
+        timeout = min(timeout, deadline - began)
+        outcome = "cancelled"
+        try:
+            async with asyncio.timeout(timeout):
+                result = await self._get_response(probe, http2)
+            outcome = "response" if isinstance(result, Ok) else "error"
+        except TimeoutError:
+            self._requests_metric.labels("error").inc()
+            outcome = "timeout"
+            result = Err(f"Timed out after {max(timeout, 0.0):.1f}s")
+        finally:
+            attempts.append(Attempt(
+                started_ms=(began - started) * 1000,
+                elapsed_ms=(time.perf_counter() - began) * 1000,
+                outcome=outcome,
+                hedge=hedge,
             ))
-        except (socket.error, ssl.SSLError) as e:
-            return Err(f"Network/SSL error: {e}")
 
-    async def get_response(self, url: str) -> Result[HttpResult, str]:
+        if isinstance(result, Ok) and probe.hedge is not None:
+            samples = self._latencies.get(probe.name)
+            if samples is None:
+                samples = deque(maxlen=HEDGE_SAMPLES)
+            samples.append(result.value.timings.total_ms if result.value.timings else result.value.elapsed_ms)
+            # Put back on every response, so the history of a probe that stops running expires.
+            self._latencies.put(probe.name, samples)
+        return result
+
+    def _hedge_delay(self, probe: Probe) -> float | None:
+        """Seconds after which an attempt is backed up, or ``None`` while there is too little history."""
+        samples = self._latencies.get(probe.name)
+        if probe.hedge is None or samples is None or len(samples) < probe.hedge.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[round(probe.hedge.percentile / 100 * (len(ordered) - 1))] / 1000
+
+    def _stream_slot(self, url: str) -> asyncio.Semaphore:
+        origin = _host_and_port(url)
+        slot = self._stream_slots.get(origin)
+        if slot is None:
+            slot = self._stream_slots[origin] = asyncio.Semaphore(self._cfg.max_concurrent_streams)
+        return slot
+
+    async def _get_response(self, probe: Probe, http2: bool) -> Result[HttpResult, str]:
+        # The client is settled before the trace starts, so building one is not request latency.
+        if probe.fresh_connection:
+            # Cold-start measurement: a throwaway client so TCP and TLS are never reused, and
+            # the trace resolves past the DNS cache. Its TLS context is reused, since loading
+            # the CA bundle costs more than many a handshake.
+            ssl_context = self._fresh_ssl_contexts.get(http2)
+            if ssl_context is None:
+                ssl_context = self._fresh_ssl_contexts[http2] = httpx.create_ssl_context(verify=True)
+            client = self._create_client(HttpRequestorConfig(max_keepalive_connections=0), http2, ssl_context)
+        elif http2:
+            if self._http2_client is None:
+                self._http2_client = self._create_client(self._cfg, http2=True)
+            client = self._http2_client
+        else:
+            client = self._client
+
+        trace = RequestTrace(capture_peer_cert=probe.checkCert, fresh_dns=probe.fresh_connection)
+        trace.activate()
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient(http2=False, verify=True) as client:
-                response = await client.get(url)
-                return Ok(_response_to_http_result(response))
+            result = await self._fetch(client, probe, trace)
         except httpx.HTTPError as e:
+            self._requests_metric.labels("error").inc()
             return Err(f"HTTP error: {e}")
+        finally:
+            self._request_duration_metric.observe(time.perf_counter() - started)
+            if probe.fresh_connection:
+                await client.aclose()
+
+        self._requests_metric.labels(f"{result.status_code // 100}xx").inc()
+        self._versions_metric.labels(result.http_version or "unknown").inc()
+        if result.body_truncated:
+            self._truncated_metric.inc()
+        if result.assertions_ok is not None:
+            (self._assertions_passed if result.assertions_ok else self._assertions_failed).inc()
+        return Ok(result)
+
+    async def _fetch(self, client: httpx.AsyncClient, probe: Probe, trace: RequestTrace) -> HttpResult:
+        async with client.stream(probe.method, probe.url, extensions={"trace": trace}) as response:
+            if probe.checkCert:
+                self._remember_peer_cert(probe.url, trace, response)
+            if probe.method == "HEAD":
+                return _response_to_http_result(response, trace)
+
+            matcher = BodyMatcher(probe.assertions) if probe.assertions else None
+            body_bytes, truncated = await _read_body(
+                response, probe.max_body_bytes or self._cfg.max_body_bytes, matcher)
+            error = matcher.finish(truncated) if matcher else None
+            return _response_to_http_result(
+                response, trace,
+                body_bytes=body_bytes,
+                body_truncated=truncated,
+                assertions_ok=error is None if matcher else None,
+                assertion_error=error,
+            )
+
+    def _remember_peer_cert(self, url: str, trace: RequestTrace, response: httpx.Response) -> None:
+        # Certificates rarely change, so a pooled connection is only re-inspected once the
+        # cached entry expires; a freshly negotiated connection always refreshes it.
+        hostname, port = _host_and_port(url)
+        key = f"{hostname}:{port}"
+
+        if trace.handshake_completed:
+            cert_raw = trace.peer_cert
+        elif self._cert_cache.get(key) is None:
+            cert_raw = peer_cert(response.extensions.get("network_stream"))
+        else:
+            return
+
+        if cert_raw:
+            match _cert_to_cert_info(cert_raw):
+                case Ok(cert_info):
+                    self._cert_cache.put(key, cert_info)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        if self._http2_client is not None:
+            await self._http2_client.aclose()
+
+
+def _describe_attempts(attempts: Sequence[Attempt]) -> str:
+    return ", ".join(f"{'hedge ' if a.hedge else ''}{a.outcome} after {a.elapsed_ms:.0f} ms" for a in attempts)
+
+
+def _host_and_port(url: str) -> tuple[str, int]:
+    parsed = urlparse(url)
+    hostname = parsed.hostname or url
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return hostname, port
+
+
+def _create_ssl_context() -> ssl.SSLContext:
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = True
+    ctx.verify_mode = ssl.CERT_REQUIRED
+    return ctx
+
+
+def _cert_to_cert_info(cert_raw: object) -> Result[CertInfo, str]:
+    if not cert_raw:
+        return Err("Peer did not provide a certificate")
+
+    cert: Mapping[str, Any] = cast(Mapping[str, Any], cert_raw)
+
+    subject = _name_to_dict(cert.get("subject", ()))
+    issuer = _name_to_dict(cert.get("issuer", ()))
+
+    not_before_raw = cert.get("notBefore")
+    not_after_raw = cert.get("notAfter")
+
+    if not isinstance(not_before_raw, str) or not isinstance(not_after_raw, str):
+        return Err("Certificate missing notBefore/notAfter")
+
+    return Ok(CertInfo(
+        subject_cn=subject.get("commonName"),
+        issuer_cn=issuer.get("commonName"),
+        not_before=_parse_cert_datetime(not_before_raw),
+        not_after=_parse_cert_datetime(not_after_raw),
+    ))
 
 
 def _parse_cert_datetime(value: str) -> datetime:
@@ -87,10 +418,51 @@ def _name_to_dict(
         return {}
 
 
+async def _read_body(response: httpx.Response, limit: int, matcher: BodyMatcher | None) -> tuple[int, bool]:
+    """Streams the body through ``matcher`` until it ends, the matcher is decided or ``limit`` is hit.
+
+    Nothing is kept beyond what the matcher holds on to. Returns the bytes read and whether
+    the body went on past ``limit``.
+    """
+    read = 0
+    chunks = response.aiter_bytes()
+    async for chunk in chunks:
+        if read + len(chunk) > limit:
+            if matcher:
+                matcher.feed(chunk[:limit - read])
+            return limit, True
+        read += len(chunk)
+        if matcher:
+            matcher.feed(chunk)
+            if matcher.decided:
+                if _remaining_bytes(response) <= DRAIN_LIMIT_BYTES:
+                    async for _ in chunks:
+                        pass
+                return read, False
+    return read, False
+
+
+def _remaining_bytes(response: httpx.Response) -> float:
+    declared = response.headers.get("content-length", "")
+    return int(declared) - response.num_bytes_downloaded if declared.isdigit() else math.inf
+
+
 def _response_to_http_result(
         response: httpx.Response,
+        trace: RequestTrace,
+        body_bytes: int | None = None,
+        body_truncated: bool = False,
+        assertions_ok: bool | None = None,
+        assertion_error: str | None = None,
 ) -> HttpResult:
+    timings = trace.timings()
     return HttpResult(
         status_code=response.status_code,
-        elapsed_ms=int(response.elapsed.microseconds / 1000),
+        elapsed_ms=round(timings.total_ms),
+        timings=timings,
+        http_version=response.http_version,
+        body_bytes=body_bytes,
+        body_truncated=body_truncated,
+        assertions_ok=assertions_ok,
+        assertion_error=assertion_error,
     )
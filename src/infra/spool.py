@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Final, Iterator, Protocol, Sequence, TypeVar
+
+from src.common.logging import Logger
+from src.common.result import Result, Err, Ok
+from src.domain import CertInfo, HttpResult, LatencySummary, ProbeOutcome
+from src.infra.outcome_codec import JsonSerializer, decode_summary, encode_summary
+from src.infra.publisher_protocol import Publisher
+from src.latency_aggregator import SummaryPublisher
+
+SEGMENT_SUFFIX: Final[str] = ".seg"
+CURSOR_FILE: Final[str] = "cursor"
+
+# Spooled records stay JSON whatever the Kafka format, so a format change never strands them.
+_RECORD_FORMAT: Final[JsonSerializer] = JsonSerializer()
+# Spooled summaries are their JSON behind this marker; an outcome record always starts with "{".
+_SUMMARY_MARKER: Final[bytes] = b"S"
+
+# Record framing: payload length, CRC32 of the payload. A zero length marks the end of a segment.
+_HEADER: Final[struct.Struct] = struct.Struct("<II")
+# Read position: segment sequence number, byte offset within it.
+_CURSOR: Final[struct.Struct] = struct.Struct("<QQ")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class SpoolConfig:
+    directory: str
+    max_bytes: int = 256 * 1024 * 1024
+    segment_bytes: int = 16 * 1024 * 1024
+    replay_batch_size: int = 500
+    replay_interval: float = 5.0
+    publish_timeout: float = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class SpoolStats:
+    depth: int
+    depth_bytes: int
+    segments: int
+    spooled: int
+    evicted: int
+    replayed: int
+    replay_rate: float
+
+
+class _Segment:
+    """One preallocated, memory-mapped segment file."""
+
+    def __init__(self, path: Path, seq: int, size: int) -> None:
+        self.path = path
+        self.seq = seq
+        with open(path, "a+b") as f:
+            if os.fstat(f.fileno()).st_size < size:
+                f.truncate(size)
+            self.mm = mmap.mmap(f.fileno(), 0)
+        self.write_pos = self._recover()
+
+    def _recover(self) -> int:
+        # Stops at the first empty or torn record and clears the rest, so a crash mid-append
+        # loses at most that one record.
+        end = 0
+        for end, _, _ in self.records(0):
+            pass
+        if any(self.mm[end:end + _HEADER.size]):
+            self.mm[end:] = bytes(len(self.mm) - end)
+        return end
+
+    def records(self, offset: int) -> Iterator[tuple[int, int, bytes]]:
+        """Yields (offset after the record, its framed size, payload) from ``offset`` on."""
+        size = len(self.mm)
+        while offset + _HEADER.size <= size:
+            length, crc = _HEADER.unpack_from(self.mm, offset)
+            start = offset + _HEADER.size
+            if length == 0 or start + length > size:
+                return
+            payload = self.mm[start:start + length]
+            if zlib.crc32(payload) != crc:
+                return
+            offset = start + length
+            yield offset, _HEADER.size + length, payload
+
+    def append(self, payload: bytes) -> None:
+        _HEADER.pack_into(self.mm, self.write_pos, len(payload), zlib.crc32(payload))
+        start = self.write_pos + _HEADER.size
+        self.mm[start:start + len(payload)] = payload
+        self.write_pos = start + len(payload)
+
+    def free(self) -> int:
+        return len(self.mm) - self.write_pos
+
+    def close(self) -> None:
+        self.mm.flush()
+        self.mm.close()
+
+
+class SegmentSpool:
+    """Append-only on-disk queue of encoded records, split into fixed-size mmap segments.
+
+    Records are read in append order from a cursor that is persisted on every commit, so
+    a restart resumes replay where it stopped. Once the segments would exceed ``max_bytes``
+    the oldest segment is dropped, unread records included.
+    """
+
+    def __init__(self, cfg: SpoolConfig) -> None:
+        self._dir = Path(cfg.directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segment_bytes = cfg.segment_bytes
+        self._max_segments = max(2, cfg.max_bytes // cfg.segment_bytes)
+        self._segments: deque[_Segment] = deque()
+        self._read_offset = 0
+        self._depth = 0
+        self._depth_bytes = 0
+        # Records committed or evicted since open; see ``position``.
+        self._position = 0
+        self.evicted = 0
+        self._open()
+
+    def _open(self) -> None:
+        cursor_seq, cursor_offset = self._read_cursor()
+        for path in sorted(self._dir.glob(f"*{SEGMENT_SUFFIX}")):
+            seq = int(path.stem)
+            if seq < cursor_seq:
+                path.unlink()
+            else:
+                self._segments.append(_Segment(path, seq, self._segment_bytes))
+
+        if self._segments and self._segments[0].seq == cursor_seq:
+            self._read_offset = min(cursor_offset, self._segments[0].write_pos)
+        for _, size, _ in self._unread():
+            self._depth += 1
+            self._depth_bytes += size
+
+    def _read_cursor(self) -> tuple[int, int]:
+        try:
+            seq, offset = _CURSOR.unpack((self._dir / CURSOR_FILE).read_bytes())
+        except (OSError, struct.error):
+            return 0, 0
+        return seq, offset
+
+    def _write_cursor(self) -> None:
+        seq = self._segments[0].seq if self._segments else 0
+        tmp = self._dir / f"{CURSOR_FILE}.tmp"
+        tmp.write_bytes(_CURSOR.pack(seq, self._read_offset))
+        os.replace(tmp, self._dir / CURSOR_FILE)
+
+    def _unread(self) -> Iterator[tuple[int, int, bytes]]:
+        offset = self._read_offset
+        for segment in self._segments:
+            yield from segment.records(offset)
+            offset = 0
+
+    def append(self, payload: bytes) -> Result[None, str]:
+        framed = _HEADER.size + len(payload)
+        if framed > self._segment_bytes:
+            return Err(f"Record of {len(payload)} bytes does not fit a {self._segment_bytes} byte segment")
+
+        if not self._segments or self._segments[-1].free() < framed:
+            self._add_segment()
+        self._segments[-1].append(payload)
+        self._depth += 1
+        self._depth_bytes += framed
+        return Ok(None)
+
+    def _add_segment(self) -> None:
+        if self._segments:
+            self._segments[-1].mm.flush()
+        seq = self._segments[-1].seq + 1 if self._segments else 1
+        self._segments.append(_Segment(self._dir / f"{seq:020d}{SEGMENT_SUFFIX}", seq, self._segment_bytes))
+
+        while len(self._segments) > self._max_segments:
+            oldest = self._segments[0]
+            for _, size, _ in oldest.records(self._read_offset):
+                self._depth -= 1
+                self._depth_bytes -= size
+                self._position += 1
+                self.evicted += 1
+            self._drop_head()
+        self._write_cursor()
+
+    def _drop_head(self) -> None:
+        segment = self._segments.popleft()
+        segment.close()
+        segment.path.unlink(missing_ok=True)
+        self._read_offset = 0
+
+    def peek(self, max_records: int) -> list[bytes]:
+        batch: list[bytes] = []
+        for _, _, payload in self._unread():
+            if len(batch) == max_records:
+                break
+            batch.append(payload)
+        return batch
+
+    def position(self) -> int:
+        """The read position: how many records were committed or evicted since open."""
+        return self._position
+
+    def commit(self, count: int, position: int | None = None) -> None:
+        """Marks the first ``count`` unread records as delivered.
+
+        ``position`` is the read position the records were peeked at. Appends since then may
+        have evicted some of them; those are no longer unread, so only the rest is committed.
+        """
+        if position is not None:
+            count = max(0, count - (self._position - position))
+        while count and self._segments:
+            head = self._segments[0]
+            for end, size, _ in head.records(self._read_offset):
+                self._read_offset = end
+                self._position += 1
+                self._depth -= 1
+                self._depth_bytes -= size
+                count -= 1
+                if not count:
+                    break
+            if self._read_offset >= head.write_pos and len(self._segments) > 1:
+                self._drop_head()
+            elif count:
+                break
+        self._write_cursor()
+
+    def depth(self) -> int:
+        return self._depth
+
+    def depth_bytes(self) -> int:
+        return self._depth_bytes
+
+    def segments(self) -> int:
+        return len(self._segments)
+
+    def close(self) -> None:
+        self._write_cursor()
+        while self._segments:
+            self._segments.popleft().close()
+
+
+class _Sink(Publisher, SummaryPublisher, Protocol):
+    pass
+
+
+class SpoolingPublisher:
+    """Publishes through ``inner`` and spools outcomes and latency summaries it cannot deliver in time.
+
+    While anything is spooled new outcomes are appended behind it, and a background task
+    replays the spool in order, one batch at a time, whenever the inner publisher accepts
+    again. Delivery is at-least-once: an outcome that timed out may still reach the broker
+    and then be replayed as well.
+
+    Spool calls run on a single thread of their own: segment rolls msync and create files and
+    commits rewrite the cursor, none of which belongs on the event loop, and one thread keeps
+    them in order without locking the spool.
+    """
+
+    def __init__(
+            self,
+            inner: _Sink,
+            spool: SegmentSpool,
+            logger: Logger,
+            cfg: SpoolConfig,
+            clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._inner = inner
+        self._spool = spool
+        self._logger = logger
+        self._cfg = cfg
+        self._clock = clock
+        self._replay_task: asyncio.Task[None] | None = None
+        self._spooled = 0
+        self._replayed = 0
+        self._replay_rate = 0.0
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spool")
+
+    def start(self) -> None:
+        if self._replay_task is None:
+            self._replay_task = asyncio.create_task(self._replay_forever())
+
+    async def aclose(self) -> None:
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            await asyncio.gather(self._replay_task, return_exceptions=True)
+            self._replay_task = None
+        await self._run(self._spool.close)
+        self._io.shutdown()
+
+    def stats(self) -> SpoolStats:
+        return SpoolStats(
+            depth=self._spool.depth(),
+            depth_bytes=self._spool.depth_bytes(),
+            segments=self._spool.segments(),
+            spooled=self._spooled,
+            evicted=self._spool.evicted,
+            replayed=self._replayed,
+            replay_rate=self._replay_rate,
+        )
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    def _append_all(self, payloads: Sequence[bytes]) -> list[Result[None, str]]:
+        return [self._spool.append(payload) for payload in payloads]
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        self.start()
+        published: list[Result[None, str]] = [Err("Queued behind spooled outcomes")] * len(outcomes)
+        if not self._spool.depth():
+            published = await self._publish_inner(outcomes)
+
+        failed_outcomes = [o for o, r in zip(outcomes, published) if isinstance(r, Err)]
+        appended = iter(await self._run(self._append_all, [_RECORD_FORMAT.encode(o) for o in failed_outcomes])
+                        if failed_outcomes else [])
+        results: list[Result[None, str]] = []
+        for result in published:
+            if isinstance(result, Err):
+                result = next(appended)
+                if isinstance(result, Ok):
+                    self._spooled += 1
+            results.append(result)
+
+        failed = [r.error for r in published if isinstance(r, Err)]
+        if failed:
+            self._logger.warning("Spooled probe outcomes", count=len(failed), error=failed[0])
+        return results
+
+    async def publish_summaries(self, summaries: Sequence[LatencySummary]) -> Result[None, str]:
+        self.start()
+        published: Result[None, str] = Err("Queued behind spooled outcomes")
+        if not self._spool.depth():
+            published = await self._publish_summaries_inner(summaries)
+        if isinstance(published, Ok):
+            return published
+
+        appended = await self._run(self._append_all, [_SUMMARY_MARKER + encode_summary(s) for s in summaries])
+        self._spooled += sum(isinstance(a, Ok) for a in appended)
+        failed = next((a for a in appended if isinstance(a, Err)), None)
+        if failed is not None:
+            return failed
+        self._logger.warning("Spooled latency summaries", count=len(summaries), error=published.error)
+        return Ok(None)
+
+    async def _publish_summaries_inner(self, summaries: Sequence[LatencySummary]) -> Result[None, str]:
+        try:
+            async with asyncio.timeout(self._cfg.publish_timeout):
+                return await self._inner.publish_summaries(summaries)
+        except TimeoutError:
+            return Err(f"Publishing timed out after {self._cfg.publish_timeout}s")
+
+    async def _publish_inner(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        try:
+            async with asyncio.timeout(self._cfg.publish_timeout):
+                return await self._inner.publish_many(outcomes)
+        except TimeoutError:
+            return [Err(f"Publishing timed out after {self._cfg.publish_timeout}s")] * len(outcomes)
+
+    async def _replay_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._cfg.replay_interval)
+            while self._spool.depth() and await self.replay_batch():
+                pass
+
+    def _peek(self) -> tuple[int, list[bytes]]:
+        return self._spool.position(), self._spool.peek(self._cfg.replay_batch_size)
+
+    async def replay_batch(self) -> bool:
+        """Replays the oldest spooled batch; returns whether all of it was delivered."""
+        position, batch = await self._run(self._peek)
+        if not batch:
+            return True
+
+        started = self._clock()
+        delivered_flags = [True] * len(batch)
+        readable: list[int] = []
+        outcomes: list[ProbeOutcome] = []
+        summary_slots: list[int] = []
+        summaries: list[LatencySummary] = []
+        for i, payload in enumerate(batch):
+            if payload.startswith(_SUMMARY_MARKER):
+                summary = decode_summary(payload[len(_SUMMARY_MARKER):])
+                if isinstance(summary, Err):
+                    self._logger.error("Dropping unreadable spooled latency summary", error=summary.error)
+                    continue
+                summary_slots.append(i)
+                summaries.append(summary.value)
+                continue
+            decoded = _RECORD_FORMAT.decode(payload)
+            if isinstance(decoded, Err):
+                # An undecodable record can never be delivered; dropping it keeps replay moving.
+                self._logger.error("Dropping unreadable spooled probe outcome", error=decoded.error)
+                continue
+            readable.append(i)
+            outcomes.append(decoded.value)
+
+        for i, result in zip(readable, await self._publish_inner(outcomes) if outcomes else []):
+            delivered_flags[i] = isinstance(result, Ok)
+        if summaries:
+            summaries_delivered = isinstance(await self._publish_summaries_inner(summaries), Ok)
+            for i in summary_slots:
+                delivered_flags[i] = summaries_delivered
+
+        # Only the delivered prefix is committed, so the spool order is never broken.
+        delivered = next((i for i, ok in enumerate(delivered_flags) if not ok), len(batch))
+        await self._run(self._spool.commit, delivered, position)
+        self._replayed += delivered
+
+        elapsed = self._clock() - started
+        if delivered and elapsed > 0:
+            self._replay_rate = delivered / elapsed
+        self._logger.info("Replayed spooled probe outcomes", count=delivered, remaining=self._spool.depth(),
+                          rate=round(self._replay_rate, 1))
+        return delivered == len(batch)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Protocol, Sequence
+
+from src.common.logging import Logger
+from src.common.result import Result, Err
+from src.common.sketch import LatencySketch
+from src.domain import HttpResult, LatencySummary
+
+
+@dataclass(frozen=True, slots=True)
+class AggregationConfig:
+    interval: float = 60.0
+    relative_accuracy: float = 0.01
+    max_buckets: int = 64
+    raw_events: bool = True
+
+
+class SummaryPublisher(Protocol):
+    async def publish_summaries(self, summaries: Sequence[LatencySummary]) -> Result[None, str]: ...
+
+
+class _Window:
+    __slots__ = ("sketch", "runs", "successes")
+
+    def __init__(self, cfg: AggregationConfig) -> None:
+        self.sketch = LatencySketch(cfg.relative_accuracy, cfg.max_buckets)
+        self.runs = 0
+        self.successes = 0
+
+
+class LatencyAggregator:
+    """Per-probe latency sketches and availability counters, published as windowed summaries.
+
+    A run counts as successful when a response arrived with a status below 400 and passed
+    its body assertions, if any. Every
+    ``interval`` seconds each probe that ran gets one summary and its window is reset;
+    probes that did not run are forgotten, so memory follows the active probe set.
+    """
+
+    def __init__(
+            self,
+            publisher: SummaryPublisher,
+            logger: Logger,
+            cfg: AggregationConfig = AggregationConfig(),
+            clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._publisher = publisher
+        self._logger = logger
+        self._cfg = cfg
+        self._clock = clock
+        self._windows: dict[str, _Window] = {}
+        self._window_start = clock()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_forever())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def record(self, probe_name: str, result: HttpResult | None) -> None:
+        window = self._windows.get(probe_name)
+        if window is None:
+            window = self._windows[probe_name] = _Window(self._cfg)
+        window.runs += 1
+        if result is not None:
+            window.sketch.add(result.timings.total_ms if result.timings else result.elapsed_ms)
+            if result.status_code < 400 and result.assertions_ok is not False:
+                window.successes += 1
+
+    def summaries(self) -> list[LatencySummary]:
+        """Closes the current window and returns its summaries."""
+        now = self._clock()
+        summaries = [
+            LatencySummary(
+                probe_name=name,
+                window_start=self._window_start,
+                window_end=now,
+                runs=w.runs,
+                successes=w.successes,
+                p50_ms=w.sketch.quantile(0.50),
+                p95_ms=w.sketch.quantile(0.95),
+                p99_ms=w.sketch.quantile(0.99),
+                min_ms=w.sketch.min if w.sketch.count else 0.0,
+                max_ms=w.sketch.max if w.sketch.count else 0.0,
+                mean_ms=w.sketch.mean(),
+                sketch=w.sketch.to_dict(),
+            )
+            for name, w in self._windows.items() if w.runs
+        ]
+
+        for name in [name for name, w in self._windows.items() if not w.runs]:
+            del self._windows[name]
+        for window in self._windows.values():
+            window.sketch.clear()
+            window.runs = window.successes = 0
+        self._window_start = now
+        return summaries
+
+    async def flush(self) -> None:
+        summaries = self.summaries()
+        if not summaries:
+            return
+        published = await self._publisher.publish_summaries(summaries)
+        if isinstance(published, Err):
+            self._logger.error("Failed to publish latency summaries", count=len(summaries), error=published.error)
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._cfg.interval)
+            await self.flush()
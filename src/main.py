@@ -1,17 +1,32 @@
 from __future__ import annotations
 import asyncio
+import multiprocessing
+import multiprocessing.connection
+import os
 import signal
-from datetime import datetime
-
-from croniter import croniter
-
-from src.common.logging import Logger, init_logging, get_logger
-from src.infra.config_loader import get_config
-from src.domain import Probe
-from src.common.result import Err, Ok
-from src.infra.kafka_publisher import KafkaPublisher, KafkaPublisherConfig
+from dataclasses import replace
+from pathlib import Path
+from types import FrameType
+from typing import Final
+
+from src.adaptive_cadence import AdaptiveCadence
+from src.common.logging import Logger, configure_sampling, init_logging, get_logger
+from src.common.metrics import MetricsRegistry
+from src.common.sharding import ShardConfig, apply_env, select_shard
+from src.infra.config_loader import AppConfig, get_config
+from src.common.result import Err, Ok, map_result
+from src.infra.batching_publisher import BatchingPublisher
+from src.infra.config_watcher import ConfigWatcher
+from src.infra.delta_publisher import DeltaPublisher
+from src.infra.kafka_publisher import KafkaPublisher
+from src.infra.metrics_server import MetricsServer
 from src.infra.requestor import HttpRequestor
+from src.latency_aggregator import LatencyAggregator
+from src.infra.spool import SegmentSpool, SpoolingPublisher
 from src.probe_execution_service import ProbeExecutionService
+from src.scheduler import Scheduler
+
+CONFIG_FILE: Final[str] = "config.yml"
 
 
 def init_stop_event() -> asyncio.Event:
@@ -23,72 +38,173 @@ def init_stop_event() -> asyncio.Event:
     return stop
 
 
-def _get_timeout_seconds(schedule: str) -> float:
-    now = datetime.now()
-    next_run = croniter(schedule, now).get_next(datetime)
-    return (next_run - now).total_seconds()
+def for_shard(cfg: AppConfig, shard: ShardConfig) -> AppConfig:
+    """The config one shard runs: its slice of the probes, and spool and delta state of its own."""
+    if shard.count == 1:
+        return replace(cfg, sharding=shard)
+
+    suffix = f"shard-{shard.index}"
+    state_file = Path(cfg.delta.state_file) if cfg.delta else None
+    return replace(
+        cfg,
+        probes=select_shard(cfg.probes, shard),
+        sharding=shard,
+        spool=replace(cfg.spool, directory=str(Path(cfg.spool.directory) / suffix)) if cfg.spool else None,
+        delta=replace(cfg.delta, state_file=str(state_file.with_name(f"{state_file.stem}.{suffix}{state_file.suffix}")))
+        if cfg.delta and state_file else None,
+    )
 
 
-async def _job(probe: Probe, service: ProbeExecutionService, stop: asyncio.Event) -> None:
-    first_run = True
+async def serve(cfg: AppConfig, shard: ShardConfig, worker: int = 0) -> int:
     log: Logger = get_logger()
-    while not stop.is_set():
+    cfg = for_shard(cfg, shard)
+    configure_sampling(cfg.logging)
+
+    log.info("Configuration loaded successfully {probes}", probes=len(cfg.probes),
+             shard=shard.index, shards=shard.count)
+
+    stop = init_stop_event()
+    metrics = MetricsRegistry()
+    # Local workers each serve their own registry, on consecutive ports; port 0 picks a free one for each.
+    metrics_server = MetricsServer(metrics, replace(cfg.metrics, port=cfg.metrics.port and cfg.metrics.port + worker),
+                                   get_logger()) if cfg.metrics else None
+    if metrics_server:
+        await metrics_server.start()
+    requestor = HttpRequestor(cfg.http, metrics)
+    kafka = KafkaPublisher(get_logger(), cfg.kafka, metrics)
+    kafka.start()
+    spooling = SpoolingPublisher(kafka, SegmentSpool(cfg.spool), get_logger(), cfg.spool) \
+        if cfg.spool else None
+    if spooling:
+        metrics.gauge("spool_depth", "Outcomes waiting in the spool for Kafka") \
+            .set_function(lambda: spooling.stats().depth)
+        metrics.counter("spool_replayed_total", "Spooled outcomes and summaries delivered on replay") \
+            .set_function(lambda: spooling.stats().replayed)
+        metrics.gauge("spool_replay_rate", "Records per second delivered by the last replayed batch") \
+            .set_function(lambda: spooling.stats().replay_rate)
+    batching = BatchingPublisher(spooling or kafka, cfg.batching)
+    delta = DeltaPublisher(batching, get_logger(), cfg.delta) if cfg.delta else None
+    # Summaries go through the spool too, so a Kafka outage does not lose them.
+    aggregator = LatencyAggregator(spooling or kafka, get_logger(), cfg.aggregation) if cfg.aggregation else None
+    if aggregator:
+        aggregator.start()
+    # The rate budget is for the whole inventory, so each shard gets its share.
+    budget = cfg.scheduler.adaptive_rate_budget
+    cadence = AdaptiveCadence(budget / shard.count if budget else None, metrics=metrics)
+    try:
+        service = ProbeExecutionService(delta or batching, requestor, get_logger(), aggregator,
+                                        publish_raw=cfg.aggregation.raw_events if cfg.aggregation else True,
+                                        metrics=metrics, cadence=cadence)
+        scheduler = Scheduler(service.execute, get_logger(), cfg.scheduler, metrics=metrics, cadence=cadence)
+        for probe in cfg.probes:
+            scheduler.add(probe)
+
+        watcher = ConfigWatcher(CONFIG_FILE, cfg, scheduler,
+                                lambda: map_result(lambda c: for_shard(c, shard), get_config(CONFIG_FILE)),
+                                get_logger())
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, watcher.trigger)
+        watch_task = asyncio.create_task(watcher.run(stop))
+        watch_task.add_done_callback(_report_watcher_exit)
         try:
-            if not first_run:
-                log.info("Executing periodic job {probe}", probe=probe.name)
-                await service.execute(probe)
-            else:
-                first_run = False
-
-            async with asyncio.timeout(_get_timeout_seconds(probe.schedule)):
-                await stop.wait()
-        except TimeoutError:
-            pass
-
-
-def create_probe_execution_service(kafka_cfg: dict[str, str], topic: str) -> ProbeExecutionService:
-    return ProbeExecutionService(
-        KafkaPublisher(
-            get_logger(),
-            KafkaPublisherConfig(
-                kafka_cfg,
-                topic
-            )),
-        HttpRequestor(),
-        get_logger()
-    )
+            await scheduler.run(stop)
+        finally:
+            watch_task.cancel()
+    finally:
+        await requestor.aclose()
+        if aggregator:
+            await aggregator.aclose()
+        if delta:
+            await delta.aclose()
+        await batching.aclose()
+        if spooling:
+            await spooling.aclose()
+        await kafka.aclose()
+        if metrics_server:
+            await metrics_server.aclose()
+
+    return 0
 
 
-async def start_probe_jobs(kafka_cfg, topic, probes: list[Probe],
-                           stop: asyncio.Event) -> None:
-    async with asyncio.TaskGroup() as tg:
-        _ = [tg.create_task(_job(probe, create_probe_execution_service(kafka_cfg, topic), stop)) for probe in probes]
+def _report_watcher_exit(task: asyncio.Task[None]) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        get_logger().error("Config watcher stopped, hot reload is disabled until restart",
+                           error=repr(task.exception()))
 
 
-async def main() -> int:
+def _worker(shard: ShardConfig, worker: int) -> None:
     init_logging()
     log: Logger = get_logger()
 
-    log.info("Starting application")
+    match get_config(CONFIG_FILE):
+        case Err(e):
+            log.error("Failed to load configuration", errors=e, shard=shard.index)
+            raise SystemExit(1)
+        case Ok(cfg):
+            raise SystemExit(asyncio.run(serve(cfg, shard, worker)))
+
+
+def run_workers(shard: ShardConfig, log: Logger) -> int:
+    """Runs each of ``shard.workers`` slices in its own process, with its own loop and sinks.
+
+    Signals are forwarded to the workers. A worker that exits on its own stops the rest,
+    leaving restarts to whatever supervises this process.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_worker, args=(shard.for_worker(i), i), name=f"ping_monkey-worker-{i}")
+               for i in range(shard.workers)]
+    stopping = False
+
+    def forward(sig: int, _frame: FrameType | None) -> None:
+        nonlocal stopping
+        stopping = stopping or sig != signal.SIGHUP
+        for worker in workers:
+            if worker.pid is not None and worker.is_alive():
+                os.kill(worker.pid, sig)
+
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(sig, forward)
+    for worker in workers:
+        worker.start()
+    log.info("Started workers", workers=len(workers), shard=shard.index, shards=shard.count)
+
+    while running := [w for w in workers if w.is_alive()]:
+        multiprocessing.connection.wait([w.sentinel for w in running])
+        if not stopping:
+            exited = [w for w in workers if not w.is_alive()]
+            log.error("Worker exited, stopping the others", workers=[w.name for w in exited],
+                      exit_codes=[w.exitcode for w in exited])
+            forward(signal.SIGTERM, None)
+
+    return next((w.exitcode for w in workers if w.exitcode), 0)
+
+
+def main() -> int:
+    init_logging()
+    log: Logger = get_logger()
 
-    config_result = get_config("config.yml")
+    log.info("Starting application")
 
-    match config_result:
+    match get_config(CONFIG_FILE):
         case Err(e):
             log.error("Failed to load configuration", errors=e)
             return 1
-        case Ok((kafka_cfg, topic, probes)):
-
-            log.info("Configuration loaded successfully {probes}", probes=len(probes))
-
-            stop = init_stop_event()
-            await start_probe_jobs(kafka_cfg, topic, probes, stop)
-            await stop.wait()
+        case Ok(cfg):
+            match apply_env(cfg.sharding, os.environ):
+                case Err(error):
+                    log.error("Failed to load configuration", errors=[error])
+                    return 1
+                case Ok(shard):
+                    if shard.workers > 1:
+                        # Each worker loads and slices the config itself.
+                        del cfg
+                        code = run_workers(shard, log)
+                    else:
+                        code = asyncio.run(serve(cfg, shard))
 
     log.info("Application exited")
 
-    return 0
+    return code
 
 
 if __name__ == "__main__":
-    raise SystemExit(asyncio.run(main()))
+    raise SystemExit(main())
@@ -1,30 +1,80 @@
+import time
+from typing import Final
+
+from src.adaptive_cadence import AdaptiveCadence
 from src.common.logging import Logger
-from src.common.result import Err
+from src.common.metrics import MetricsRegistry
+from src.common.result import Err, Ok
 from src.domain import Probe
 from src.infra.publisher_protocol import Publisher
 from src.infra.requestor import Requestor
+from src.latency_aggregator import LatencyAggregator
+
+_OUTCOMES: Final[tuple[str, ...]] = ("published", "aggregated", "request_error", "cert_error", "publish_error")
 
 
 class ProbeExecutionService:
-    def __init__(self, publisher: Publisher, requestor: Requestor, logger: Logger) -> None:
+    def __init__(
+            self,
+            publisher: Publisher,
+            requestor: Requestor,
+            logger: Logger,
+            aggregator: LatencyAggregator | None = None,
+            publish_raw: bool = True,
+            metrics: MetricsRegistry | None = None,
+            cadence: AdaptiveCadence | None = None,
+    ) -> None:
         self._logger = logger
         self._publisher = publisher
         self._requestor = requestor
+        self._aggregator = aggregator
+        self._publish_raw = publish_raw
+        self._cadence = cadence
+
+        metrics = metrics or MetricsRegistry()
+        runs = metrics.counter("probe_runs_total", "Probe runs by how far they got", ["outcome"])
+        self._runs = {outcome: runs.labels(outcome) for outcome in _OUTCOMES}
+        self._duration_metric = metrics.histogram(
+            "probe_run_duration_seconds", "Wall time of a probe run, request to publish").labels()
 
     async def execute(self, probe: Probe) -> None:
+        started = time.perf_counter()
+        outcome = await self._execute(probe)
+        self._duration_metric.observe(time.perf_counter() - started)
+        self._runs[outcome].inc()
+
+    async def _execute(self, probe: Probe) -> str:
         self._logger.info("Executing probe {probe}", probe=probe.name)
-        response = await self._requestor.get_response(probe.url)
+
+        response = await self._requestor.get_response(probe)
+        if self._aggregator is not None:
+            self._aggregator.record(probe.name, response.value if isinstance(response, Ok) else None)
+        if self._cadence is not None:
+            self._cadence.record(probe, response.value if isinstance(response, Ok) else None)
+
         if isinstance(response, Err):
             self._logger.error(
                 "Error getting response for probe {probe}: {error}",
                 probe=probe.name,
                 error=response.error,
+                **self._interval_fields(probe),
             )
-            return
+            return "request_error"
 
         self._logger.info("Fetched response for probe {probe}", probe=probe.name)
+        if response.value.assertions_ok is False:
+            self._logger.warning(
+                "Body assertion failed for probe {probe}: {error}",
+                probe=probe.name,
+                error=response.value.assertion_error,
+            )
+
+        if not self._publish_raw:
+            return "aggregated"
 
-        cert_info = self._requestor.get_cert_info(probe.url) if probe.checkCert else None
+        # Requested after the response so the requestor can answer from the TLS session
+        # it just negotiated instead of opening a second handshake to the same host.
+        cert_info = await self._requestor.get_cert_info(probe.url, probe.timeout) if probe.checkCert else None
 
         if isinstance(cert_info, Err):
             self._logger.error(
@@ -32,10 +82,23 @@ class ProbeExecutionService:
                 probe=probe.name,
                 error=cert_info.error,
             )
-            return
+            return "cert_error"
 
         self._logger.info("Fetched cert info for probe {probe}", probe=probe.name)
 
-        await self._publisher.publish(probe.name, response.value, cert_info.value if cert_info else None)
+        published = await self._publisher.publish(probe.name, response.value, cert_info.value if cert_info else None)
+        if isinstance(published, Err):
+            self._logger.error(
+                "Error publishing outcomes for probe {probe}: {error}",
+                probe=probe.name,
+                error=published.error,
+            )
+            return "publish_error"
 
         self._logger.info("Published outcomes for probe {probe}", probe=probe.name)
+        return "published"
+
+    def _interval_fields(self, probe: Probe) -> dict[str, float]:
+        # The adapted interval, for probes whose runs are spaced by AdaptiveCadence.
+        interval = self._cadence.current_interval(probe.name) if self._cadence is not None else None
+        return {"interval": interval} if interval is not None else {}
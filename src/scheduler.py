@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Final
+from urllib.parse import urlparse
+
+from croniter import croniter
+
+from src.adaptive_cadence import AdaptiveCadence
+from src.common.cron import compile_cron
+from src.common.logging import Logger
+from src.common.metrics import MetricsRegistry
+from src.common.result import Err, Ok
+from src.domain import Probe
+
+LAG_SAMPLE_SIZE: Final[int] = 1024
+RATE_WINDOW_SECONDS: Final[int] = 60
+
+
+@dataclass(frozen=True, slots=True)
+class SchedulerConfig:
+    max_workers: int = 100
+    max_per_host: int | None = None
+    spread: bool = False
+    max_spread: float = 300.0
+    adaptive_rate_budget: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SchedulerStats:
+    scheduled: int
+    queued: int
+    waiting_on_host: int
+    in_flight: int
+    dispatched: int
+    skipped: int
+    lag_p50_ms: float
+    lag_p99_ms: float
+    lag_max_ms: float
+    queue_wait_p50_ms: float
+    queue_wait_p99_ms: float
+    dispatch_rate_mean: float
+    dispatch_rate_peak: int
+
+
+class _Entry:
+    __slots__ = ("probe", "host", "offset", "removed", "pending")
+
+    def __init__(self, probe: Probe, offset: float) -> None:
+        self.probe = probe
+        self.host = urlparse(probe.url).hostname or probe.url
+        self.offset = offset
+        self.removed = False
+        self.pending = False
+
+
+class _Job:
+    __slots__ = ("entry", "due", "enqueued_at")
+
+    def __init__(self, entry: _Entry, due: float, enqueued_at: float) -> None:
+        self.entry = entry
+        self.due = due
+        self.enqueued_at = enqueued_at
+
+
+class _DispatchQueue:
+    """Priority queue of due jobs that hands out a job only while its host is under the cap.
+
+    Higher ``Probe.priority`` goes first, then the most overdue. A job whose host is
+    saturated is parked per host and re-queued as soon as one of that host's runs finishes.
+    """
+
+    def __init__(self, max_per_host: int | None) -> None:
+        self._max_per_host = max_per_host
+        self._ready: list[tuple[int, float, int, _Job]] = []
+        self._parked: dict[str, deque[tuple[int, float, int, _Job]]] = {}
+        self._active: dict[str, int] = {}
+        self._seq = itertools.count()
+        self._available = asyncio.Event()
+        self._closed = False
+
+    def put(self, job: _Job) -> None:
+        heapq.heappush(self._ready, (-job.entry.probe.priority, job.due, next(self._seq), job))
+        self._available.set()
+
+    def get_nowait(self) -> _Job | None:
+        while self._ready:
+            item = heapq.heappop(self._ready)
+            host = item[3].entry.host
+            active = self._active.get(host, 0)
+            if self._max_per_host is not None and active >= self._max_per_host:
+                self._parked.setdefault(host, deque()).append(item)
+                continue
+            self._active[host] = active + 1
+            return item[3]
+        return None
+
+    async def get(self) -> _Job | None:
+        while not self._closed:
+            job = self.get_nowait()
+            if job is not None:
+                return job
+            self._available.clear()
+            await self._available.wait()
+        return None
+
+    def release(self, host: str) -> None:
+        active = self._active[host] - 1
+        if active:
+            self._active[host] = active
+        else:
+            del self._active[host]
+
+        parked = self._parked.get(host)
+        if parked:
+            heapq.heappush(self._ready, parked.popleft())
+            if not parked:
+                del self._parked[host]
+            self._available.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.clear()
+        self._parked.clear()
+        self._available.set()
+
+    def ready(self) -> int:
+        return len(self._ready)
+
+    def parked(self) -> int:
+        return sum(len(p) for p in self._parked.values())
+
+
+def cron_next_fire(probe: Probe, after: float) -> float:
+    match compile_cron(probe.schedule):
+        case Ok(schedule):
+            return schedule.next_fire(after)
+        case Err(_):
+            # Extensions the compiled form does not cover (seconds field, L, W, #) stay on croniter.
+            return croniter(probe.schedule, datetime.fromtimestamp(after)).get_next(datetime).timestamp()
+
+
+class Scheduler:
+    def __init__(
+            self,
+            execute: Callable[[Probe], Awaitable[None]],
+            logger: Logger,
+            cfg: SchedulerConfig = SchedulerConfig(),
+            next_fire: Callable[[Probe, float], float] = cron_next_fire,
+            clock: Callable[[], float] = time.time,
+            metrics: MetricsRegistry | None = None,
+            cadence: AdaptiveCadence | None = None,
+    ) -> None:
+        self._execute = execute
+        self._logger = logger
+        self._cfg = cfg
+        self._next_fire = next_fire
+        self._clock = clock
+        self._cadence = cadence
+
+        # Min-heap of (fire time, tie-breaker, entry); removed entries are dropped lazily when popped.
+        self._heap: list[tuple[float, int, _Entry]] = []
+        self._seq = itertools.count()
+        self._entries: dict[str, _Entry] = {}
+        self._queue = _DispatchQueue(cfg.max_per_host)
+        self._wakeup = asyncio.Event()
+
+        self._in_flight = 0
+        self._dispatched = 0
+        self._skipped = 0
+        self._lags_ms: deque[float] = deque(maxlen=LAG_SAMPLE_SIZE)
+        self._queue_waits_ms: deque[float] = deque(maxlen=LAG_SAMPLE_SIZE)
+        # Dispatches per wall-clock second over a sliding window, indexed by second % window.
+        self._rate_counts = [0] * RATE_WINDOW_SECONDS
+        self._rate_seconds = [-1] * RATE_WINDOW_SECONDS
+
+        metrics = metrics or MetricsRegistry()
+        self._lag_metric = metrics.histogram(
+            "scheduler_lag_seconds", "Delay from a probe's scheduled fire time to the start of its run").labels()
+        self._queue_wait_metric = metrics.histogram(
+            "scheduler_queue_wait_seconds", "Time a due run waited for a worker or a host slot").labels()
+        self._dispatched_metric = metrics.counter(
+            "scheduler_dispatched_total", "Runs handed to the dispatch queue").labels()
+        self._skipped_metric = metrics.counter(
+            "scheduler_skipped_total", "Runs skipped because the previous run was still pending").labels()
+        metrics.gauge("scheduler_probes", "Probes scheduled").set_function(lambda: len(self._entries))
+        metrics.gauge("scheduler_in_flight", "Runs executing now").set_function(lambda: self._in_flight)
+        metrics.gauge("scheduler_queue_depth", "Due runs waiting for a worker").set_function(self._queue.ready)
+        metrics.gauge("scheduler_waiting_on_host", "Due runs parked behind the per-host cap") \
+            .set_function(self._queue.parked)
+
+    def add(self, probe: Probe) -> None:
+        now = self._clock()
+        entry = _Entry(probe, self._spread_offset(probe, now))
+        # The first fire is the next one after now, so a probe never runs at startup. It is
+        # computed before anything changes, so a schedule that cannot be evaluated leaves
+        # the scheduler as it was.
+        first_fire = self._next_entry_fire(entry, now)
+        self.remove(probe.name)
+        self._entries[probe.name] = entry
+        self._push(entry, first_fire)
+        self._wakeup.set()
+
+    def remove(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            entry.removed = True
+        if self._cadence is not None:
+            self._cadence.forget(name)
+
+    def stats(self) -> SchedulerStats:
+        lags = sorted(self._lags_ms)
+        waits = sorted(self._queue_waits_ms)
+        now = int(self._clock())
+        recent = [count for count, second in zip(self._rate_counts, self._rate_seconds)
+                  if now - RATE_WINDOW_SECONDS < second <= now]
+        return SchedulerStats(
+            scheduled=len(self._entries),
+            queued=self._queue.ready(),
+            waiting_on_host=self._queue.parked(),
+            in_flight=self._in_flight,
+            dispatched=self._dispatched,
+            skipped=self._skipped,
+            lag_p50_ms=_percentile(lags, 0.50),
+            lag_p99_ms=_percentile(lags, 0.99),
+            lag_max_ms=lags[-1] if lags else 0.0,
+            queue_wait_p50_ms=_percentile(waits, 0.50),
+            queue_wait_p99_ms=_percentile(waits, 0.99),
+            dispatch_rate_mean=sum(recent) / RATE_WINDOW_SECONDS,
+            dispatch_rate_peak=max(recent, default=0),
+        )
+
+    async def run(self, stop: asyncio.Event) -> None:
+        workers = [asyncio.create_task(self._work()) for _ in range(self._cfg.max_workers)]
+        stop_watch = asyncio.create_task(stop.wait())
+        stop_watch.add_done_callback(lambda _: self._wakeup.set())
+
+        try:
+            while not stop.is_set():
+                self._wakeup.clear()
+                self._dispatch_due()
+
+                try:
+                    async with asyncio.timeout(self._heap[0][0] - self._clock() if self._heap else None):
+                        await self._wakeup.wait()
+                except TimeoutError:
+                    pass
+        finally:
+            stop_watch.cancel()
+            # Runs that have not started are abandoned; in-flight ones are allowed to finish.
+            self._queue.close()
+            await asyncio.gather(*workers)
+
+    def _push(self, entry: _Entry, due: float) -> None:
+        heapq.heappush(self._heap, (due, next(self._seq), entry))
+
+    def _next_entry_fire(self, entry: _Entry, after: float) -> float:
+        # Shifting the cron grid by a constant offset keeps the probe's period intact.
+        return self._next_fire(entry.probe, after - entry.offset) + entry.offset
+
+    def _spread_offset(self, probe: Probe, now: float) -> float:
+        if probe.jitter is not None:
+            limit = probe.jitter
+        elif self._cfg.spread:
+            limit = self._cfg.max_spread
+        else:
+            return 0.0
+
+        first = self._next_fire(probe, now)
+        period = self._next_fire(probe, first) - first
+        return _stable_fraction(probe.name) * min(limit, period)
+
+    def _count_dispatch(self, now: float) -> None:
+        second = int(now)
+        slot = second % RATE_WINDOW_SECONDS
+        if self._rate_seconds[slot] != second:
+            self._rate_seconds[slot] = second
+            self._rate_counts[slot] = 0
+        self._rate_counts[slot] += 1
+
+    def _dispatch_due(self) -> None:
+        now = self._clock()
+        while self._heap and self._heap[0][0] <= now:
+            due, _, entry = heapq.heappop(self._heap)
+            if entry.removed:
+                continue
+
+            if entry.pending:
+                self._skipped += 1
+                self._skipped_metric.inc()
+                self._logger.warning("Skipping probe {probe}, previous run still pending", probe=entry.probe.name)
+            else:
+                entry.pending = True
+                self._dispatched += 1
+                self._dispatched_metric.inc()
+                self._count_dispatch(now)
+                self._queue.put(_Job(entry, due, now))
+                if self._adapts(entry):
+                    # Rescheduled once the run completes and its outcome is known.
+                    continue
+
+            self._push(entry, self._next_entry_fire(entry, max(due, now)))
+
+    async def _work(self) -> None:
+        while (job := await self._queue.get()) is not None:
+            entry = job.entry
+            started = self._clock()
+            lag, queue_wait = max(0.0, started - job.due), max(0.0, started - job.enqueued_at)
+            self._lags_ms.append(lag * 1000)
+            self._queue_waits_ms.append(queue_wait * 1000)
+            self._lag_metric.observe(lag)
+            self._queue_wait_metric.observe(queue_wait)
+            self._in_flight += 1
+            try:
+                self._logger.info("Executing periodic job {probe}", probe=entry.probe.name)
+                await self._execute(entry.probe)
+            except Exception as e:
+                self._logger.error("Periodic job {probe} failed", probe=entry.probe.name, error=str(e))
+            finally:
+                self._in_flight -= 1
+                entry.pending = False
+                self._queue.release(entry.host)
+                if self._adapts(entry) and not entry.removed:
+                    self._push(entry, self._reschedule_adaptive(entry, max(job.due, self._clock())))
+                    self._wakeup.set()
+
+    def _adapts(self, entry: _Entry) -> bool:
+        return self._cadence is not None and entry.probe.adaptive is not None
+
+    def _reschedule_adaptive(self, entry: _Entry, after: float) -> float:
+        # The entry is off the heap while it runs; falling back to its regular schedule keeps it
+        # from being lost, and the worker alive, should adapting fail.
+        try:
+            return self._next_adaptive_fire(entry, after)
+        except Exception as e:
+            self._logger.error("Adapting the interval of probe {probe} failed", probe=entry.probe.name, error=str(e))
+            return self._next_entry_fire(entry, after)
+
+    def _next_adaptive_fire(self, entry: _Entry, after: float) -> float:
+        assert self._cadence is not None
+        regular = self._next_entry_fire(entry, after)
+        period = self._next_entry_fire(entry, regular) - regular
+        previous = self._cadence.current_interval(entry.probe.name) or period
+        interval = self._cadence.interval(entry.probe, period)
+        if interval != previous:
+            self._logger.info("Adjusted interval for probe {probe}", probe=entry.probe.name, interval=interval,
+                              period=period)
+        if interval > period:
+            # Backing off: the latest slot on the probe's own grid that is at most one interval away.
+            return self._next_entry_fire(entry, after + interval - period)
+        return min(regular, after + interval)
+
+
+def _stable_fraction(name: str) -> float:
+    # Process-independent (unlike hash()), so a probe keeps its slot across restarts and replicas.
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest) / 2 ** 64
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
@@ -0,0 +1,101 @@
+from src.adaptive_cadence import AdaptiveCadence
+from src.common.metrics import MetricsRegistry
+from src.domain import AdaptivePolicy, HttpResult, Probe
+
+PERIOD = 60.0
+
+
+def _probe(policy: AdaptivePolicy | None = AdaptivePolicy(), name: str = "a") -> Probe:
+    return Probe(name=name, url="https://a.example", schedule="* * * * *", adaptive=policy)
+
+
+def _ok(status: int = 200) -> HttpResult:
+    return HttpResult(status_code=status, elapsed_ms=10)
+
+
+def test_consecutive_errors_back_off_geometrically_up_to_the_ceiling():
+    cadence = AdaptiveCadence()
+    probe = _probe(AdaptivePolicy(backoff_after=2, backoff_factor=2.0, max_interval=300.0, escalate_runs=0))
+    cadence.record(probe, _ok())
+
+    intervals = []
+    for _ in range(6):
+        cadence.record(probe, None)
+        intervals.append(cadence.interval(probe, PERIOD))
+
+    assert intervals == [60.0, 120.0, 240.0, 300.0, 300.0, 300.0]
+    assert cadence.current_interval("a") == 300.0
+
+
+def test_backoff_stays_at_the_ceiling_through_a_long_outage():
+    cadence = AdaptiveCadence()
+    probe = _probe(AdaptivePolicy(backoff_after=1, backoff_factor=10.0, max_interval=3600.0, escalate_runs=0))
+
+    for _ in range(5000):
+        cadence.record(probe, None)
+
+    assert cadence.interval(probe, PERIOD) == 3600.0
+
+
+def test_a_response_ends_the_backoff():
+    cadence = AdaptiveCadence()
+    probe = _probe(AdaptivePolicy(backoff_after=1, escalate_runs=0))
+    for _ in range(3):
+        cadence.record(probe, None)
+    assert cadence.interval(probe, PERIOD) > PERIOD
+
+    cadence.record(probe, _ok(500))
+
+    assert cadence.interval(probe, PERIOD) == PERIOD
+
+
+def test_status_transition_escalates_for_a_number_of_runs():
+    cadence = AdaptiveCadence()
+    probe = _probe(AdaptivePolicy(escalate_interval=5.0, escalate_runs=3))
+    cadence.record(probe, _ok())
+    assert cadence.interval(probe, PERIOD) == PERIOD
+
+    intervals = []
+    for status in (503, 503, 503, 503, 503):
+        cadence.record(probe, _ok(status))
+        intervals.append(cadence.interval(probe, PERIOD))
+
+    assert intervals == [5.0, 5.0, 5.0, PERIOD, PERIOD]
+
+
+def test_backoff_takes_over_from_escalation_once_the_target_is_down():
+    cadence = AdaptiveCadence()
+    probe = _probe(AdaptivePolicy(backoff_after=2, escalate_interval=5.0, escalate_runs=6))
+    cadence.record(probe, _ok())
+
+    cadence.record(probe, None)
+    assert cadence.interval(probe, PERIOD) == 5.0
+
+    cadence.record(probe, None)
+    assert cadence.interval(probe, PERIOD) == 2 * PERIOD
+
+
+def test_escalation_is_limited_by_the_shared_rate_budget():
+    now = 0.0
+    registry = MetricsRegistry()
+    cadence = AdaptiveCadence(rate_budget=1.0, clock=lambda: now, metrics=registry)
+    probes = [_probe(AdaptivePolicy(escalate_interval=5.0), name=f"p{i}") for i in range(3)]
+    for probe in probes:
+        cadence.record(probe, _ok())
+        cadence.record(probe, _ok(500))
+
+    assert [cadence.interval(p, PERIOD) for p in probes] == [5.0, PERIOD, PERIOD]
+    assert "ping_monkey_adaptive_budget_denied_total 2" in registry.render()
+
+    now = 1.0
+    assert cadence.interval(probes[1], PERIOD) == 5.0
+
+
+def test_probes_without_a_policy_keep_their_period():
+    cadence = AdaptiveCadence()
+    probe = _probe(None)
+    for _ in range(5):
+        cadence.record(probe, None)
+
+    assert cadence.interval(probe, PERIOD) == PERIOD
+    assert cadence.current_interval("a") is None
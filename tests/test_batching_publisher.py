@@ -0,0 +1,76 @@
+import asyncio
+from typing import Sequence
+
+from src.common.result import Err, Ok, Result
+from src.domain import CertInfo, HttpResult, ProbeOutcome
+from src.infra.batching_publisher import BatchConfig, BatchingPublisher
+
+
+class _RecordingPublisher:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.rejected: set[str] = set()
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        self.batches.append([o.probe_name for o in outcomes])
+        return [Err("rejected") if o.probe_name in self.rejected else Ok(None) for o in outcomes]
+
+
+def test_concurrent_publishes_are_sent_as_one_batch():
+    inner = _RecordingPublisher()
+    inner.rejected = {"p1"}
+    publisher = BatchingPublisher(inner, BatchConfig(max_size=100, max_delay=0.01))
+
+    async def run() -> list[Result[None, str]]:
+        return list(await asyncio.gather(*(publisher.publish(f"p{i}", HttpResult(200, 1), None) for i in range(5))))
+
+    results = asyncio.run(run())
+
+    assert inner.batches == [["p0", "p1", "p2", "p3", "p4"]]
+    assert results == [Ok(None), Err("rejected"), Ok(None), Ok(None), Ok(None)]
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    inner = _RecordingPublisher()
+    publisher = BatchingPublisher(inner, BatchConfig(max_size=2, max_delay=60.0))
+
+    async def run() -> None:
+        async with asyncio.timeout(1):
+            await asyncio.gather(*(publisher.publish(f"p{i}", HttpResult(200, 1), None) for i in range(4)))
+
+    asyncio.run(run())
+
+    assert inner.batches == [["p0", "p1"], ["p2", "p3"]]
+
+
+def test_inner_failure_is_reported_to_every_caller():
+    class _Broken(_RecordingPublisher):
+        async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+            raise RuntimeError("boom")
+
+    publisher = BatchingPublisher(_Broken())
+
+    async def run() -> list[Result[None, str]]:
+        return await publisher.publish_many([ProbeOutcome("a", HttpResult(200, 1), None),
+                                             ProbeOutcome("b", HttpResult(200, 1), None)])
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, Err) and "boom" in r.error for r in results)
+
+
+def test_aclose_sends_what_is_pending():
+    inner = _RecordingPublisher()
+    publisher = BatchingPublisher(inner, BatchConfig(max_size=100, max_delay=60.0))
+
+    async def run() -> Result[None, str]:
+        pending = asyncio.create_task(publisher.publish("late", HttpResult(200, 1), None))
+        await asyncio.sleep(0)
+        await publisher.aclose()
+        return await pending
+
+    assert asyncio.run(run()) == Ok(None)
+    assert inner.batches == [["late"]]
@@ -0,0 +1,62 @@
+from src.domain import BodyAssertion
+from src.infra.body_matcher import BodyMatcher
+
+
+def _feed(matcher: BodyMatcher, *chunks: bytes) -> BodyMatcher:
+    for chunk in chunks:
+        matcher.feed(chunk)
+    return matcher
+
+
+def test_substring_split_across_chunks_is_found():
+    matcher = _feed(BodyMatcher([BodyAssertion("contains", "healthy")]), b"status: hea", b"lthy", b" and more")
+
+    assert matcher.decided
+    assert matcher.finish(truncated=False) is None
+
+
+def test_substring_only_keeps_the_tail_it_needs():
+    matcher = BodyMatcher([BodyAssertion("contains", "needle")])
+    for _ in range(100):
+        matcher.feed(b"x" * 1000)
+
+    assert len(matcher._buffer) == len("needle") - 1
+    assert not matcher.decided
+
+    matcher.feed(b"dle")
+    matcher.feed(b"nee")
+    assert not matcher.decided
+    matcher.feed(b"dle")
+    assert matcher.decided
+
+
+def test_missing_substring_and_regex_fail_at_the_end_in_declaration_order():
+    matcher = _feed(BodyMatcher([BodyAssertion("regex", r"v\d+\.\d+"), BodyAssertion("contains", "ok")]),
+                    b"version v1", b"x")
+
+    assert not matcher.decided
+    assert matcher.finish(truncated=False) == r"body does not match /v\d+\.\d+/"
+
+
+def test_regex_matching_across_chunks_decides():
+    matcher = _feed(BodyMatcher([BodyAssertion("regex", r"v\d+\.\d+")]), b"version v1", b".2")
+
+    assert matcher.decided
+
+
+def test_json_keys_need_the_whole_document():
+    matcher = _feed(BodyMatcher([BodyAssertion("json_key", "checks.0.name")]),
+                    b'{"checks": [{"na', b'me": "db"}]}')
+
+    assert not matcher.decided
+    assert matcher.finish(truncated=False) is None
+    assert matcher.finish(truncated=True) == (
+        "body exceeded the byte limit before it could be parsed as JSON, cannot check key 'checks.0.name'")
+
+
+def test_json_key_failures():
+    missing = _feed(BodyMatcher([BodyAssertion("json_key", "status")]), b'{"state": "up"}')
+    invalid = _feed(BodyMatcher([BodyAssertion("json_key", "status")]), b"<html>")
+
+    assert missing.finish(truncated=False) == "JSON key 'status' not found"
+    assert invalid.finish(truncated=False) == "body is not valid JSON, cannot check key 'status'"
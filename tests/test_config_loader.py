@@ -1,8 +1,21 @@
 import pytest
 
-from src.infra.config_loader import _parse_probe, _parse_config
+from src.infra.config_loader import (_parse_probe, _parse_config, _parse_http_config, _parse_kafka_config,
+                                     _parse_scheduler_config, _parse_app_config, _parse_spool_config,
+                                     _parse_batch_config, _parse_delta_config, _parse_aggregation_config,
+                                     _parse_shard_config, _parse_logging_config)
+from src.common.logging import LoggingConfig
+from src.common.sharding import ShardConfig
+from src.infra.batching_publisher import BatchConfig
+from src.infra.delta_publisher import DeltaConfig
+from src.infra.kafka_publisher import KafkaPublisherConfig
+from src.infra.dns_resolver import DnsCacheConfig
+from src.infra.requestor import HttpRequestorConfig
+from src.infra.spool import SpoolConfig
+from src.latency_aggregator import AggregationConfig
+from src.scheduler import SchedulerConfig
 
-from src.domain import Probe
+from src.domain import AdaptivePolicy, BodyAssertion, HedgePolicy, Probe
 from src.common.result import Err, Ok
 
 
@@ -101,6 +114,20 @@ def test_parse_probe_missing_schedule():
             pytest.fail("Expected Failure when probe schedule is missing")
 
 
+@pytest.mark.parametrize("schedule", ["not a cron", "61 * * * *", "* * *"])
+def test_parse_probe_invalid_schedule(schedule):
+    res = _parse_probe({"name": "p", "url": "https://p.example", "schedule": schedule})
+    match res:
+        case Err(errs):
+            assert errs == [f"Probe schedule {schedule!r} is not a valid cron expression"]
+        case Ok(_):
+            pytest.fail("Expected Failure for an invalid schedule")
+
+
+def test_parse_probe_accepts_croniter_extensions():
+    assert isinstance(_parse_probe({"name": "p", "url": "https://p.example", "schedule": "0 0 L * *"}), Ok)
+
+
 def test_parse_config_with_sink_success():
     config = {
         "sink": {
@@ -148,3 +175,523 @@ def test_parse_config_without_sink_defaults():
             assert probes == [Probe(name="example2", url="https://example.org", schedule="0 * * * *", checkCert=True)]
         case Err(e):
             pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_probe_fresh_connection():
+    probe_dict = {
+        "name": "cold",
+        "url": "https://cold.example",
+        "schedule": "0 0 * * *",
+        "freshConnection": True,
+    }
+
+    res = _parse_probe(probe_dict)
+    match res:
+        case Ok(p):
+            assert p.fresh_connection is True
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_http_config_defaults():
+    res = _parse_http_config({})
+    match res:
+        case Ok(http):
+            assert http == HttpRequestorConfig()
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_http_config_pool_limits():
+    config = {
+        "http": {
+            "maxConnections": 500,
+            "maxKeepaliveConnections": 200,
+            "keepaliveExpiry": 90,
+            "certCacheTtl": 300,
+            "certCacheMaxEntries": 50,
+            "dnsCacheTtl": 120,
+            "dnsNegativeTtl": 2,
+            "dnsCacheMaxEntries": 500,
+        }
+    }
+
+    res = _parse_http_config(config)
+    match res:
+        case Ok(http):
+            assert http == HttpRequestorConfig(max_connections=500, max_keepalive_connections=200,
+                                               keepalive_expiry=90.0, cert_cache_ttl=300.0,
+                                               cert_cache_max_entries=50,
+                                               dns=DnsCacheConfig(ttl=120.0, negative_ttl=2.0, max_entries=500))
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_http_config_invalid_limits():
+    res = _parse_http_config({"http": {"maxConnections": 0, "keepaliveExpiry": -1}})
+    match res:
+        case Err(errs):
+            assert any("maxConnections" in e for e in errs)
+            assert any("keepaliveExpiry" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for invalid pool limits")
+
+
+def test_parse_app_config_collects_errors_from_all_sections():
+    config = {
+        "http": {"maxConnections": -5},
+        "probes": [{"name": "broken"}],
+    }
+
+    res = _parse_app_config(config)
+    match res:
+        case Err(errs):
+            assert any("maxConnections" in e for e in errs)
+            assert any("Probe url is required" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure when sections are invalid")
+
+
+def test_parse_kafka_config_batching_settings():
+    config = {
+        "sink": {
+            "kafka": {
+                "cfg": {"bootstrap.servers": "localhost:9092"},
+                "topic": "ping-results",
+                "lingerMs": 100,
+                "batchSize": 65536,
+                "compression": "zstd",
+                "deliveryTimeout": 15,
+            }
+        }
+    }
+
+    res = _parse_kafka_config(config)
+    match res:
+        case Ok(kafka):
+            assert kafka == KafkaPublisherConfig({"bootstrap.servers": "localhost:9092"}, "ping-results",
+                                                 linger_ms=100, batch_size=65536, compression="zstd",
+                                                 delivery_timeout=15.0)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_kafka_config_invalid_compression():
+    res = _parse_kafka_config({"sink": {"kafka": {"compression": "brotli"}}})
+    match res:
+        case Err(errs):
+            assert any("compression" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for unknown compression codec")
+
+
+def test_parse_kafka_config_invalid_delivery_timeout():
+    assert isinstance(_parse_kafka_config({"sink": {"kafka": {"deliveryTimeout": 0}}}), Err)
+
+
+def test_parse_scheduler_config():
+    res = _parse_scheduler_config({"scheduler": {"maxWorkers": 8}})
+    match res:
+        case Ok(scheduler):
+            assert scheduler == SchedulerConfig(max_workers=8)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_scheduler_config_invalid_workers():
+    res = _parse_scheduler_config({"scheduler": {"maxWorkers": 0}})
+    match res:
+        case Err(errs):
+            assert any("maxWorkers" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for non-positive maxWorkers")
+
+
+def test_parse_probe_jitter():
+    res = _parse_probe({"name": "j", "url": "https://j.example", "schedule": "* * * * *", "jitter": 15})
+    match res:
+        case Ok(p):
+            assert p.jitter == 15.0
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_probe_negative_jitter():
+    res = _parse_probe({"name": "j", "url": "https://j.example", "schedule": "* * * * *", "jitter": -1})
+    match res:
+        case Err(errs):
+            assert any("jitter" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for negative jitter")
+
+
+def test_parse_scheduler_config_spread():
+    res = _parse_scheduler_config({"scheduler": {"spread": True, "maxSpread": 45}})
+    match res:
+        case Ok(scheduler):
+            assert scheduler == SchedulerConfig(spread=True, max_spread=45.0)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_probe_priority():
+    res = _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *", "priority": 5})
+    match res:
+        case Ok(p):
+            assert p.priority == 5
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_scheduler_config_per_host_cap():
+    res = _parse_scheduler_config({"scheduler": {"maxWorkers": 50, "maxPerHost": 4}})
+    match res:
+        case Ok(scheduler):
+            assert scheduler == SchedulerConfig(max_workers=50, max_per_host=4)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_spool_config_absent():
+    assert _parse_spool_config({}) == Ok(None)
+
+
+def test_parse_spool_config():
+    res = _parse_spool_config({"spool": {"directory": "/var/spool/pm", "maxBytes": 1024, "segmentBytes": 256,
+                                         "replayBatchSize": 10, "replayInterval": 1, "publishTimeout": 2}})
+    match res:
+        case Ok(spool):
+            assert spool == SpoolConfig(directory="/var/spool/pm", max_bytes=1024, segment_bytes=256,
+                                        replay_batch_size=10, replay_interval=1.0, publish_timeout=2.0)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_spool_config_invalid():
+    res = _parse_spool_config({"spool": {"maxBytes": 10, "segmentBytes": 256}})
+    match res:
+        case Err(errs):
+            assert any("directory" in e for e in errs)
+            assert any("maxBytes" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for invalid spool settings")
+
+
+def test_parse_batch_config():
+    res = _parse_batch_config({"publishing": {"maxBatch": 100, "batchWindowMs": 50}})
+    match res:
+        case Ok(batching):
+            assert batching == BatchConfig(max_size=100, max_delay=0.05)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_batch_config_invalid():
+    res = _parse_batch_config({"publishing": {"maxBatch": 0}})
+    match res:
+        case Err(errs):
+            assert any("maxBatch" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for invalid batch settings")
+
+
+def test_parse_kafka_config_format():
+    res = _parse_kafka_config({"sink": {"kafka": {"topic": "t", "format": "binary"}}})
+    match res:
+        case Ok(kafka):
+            assert kafka.serializer == "binary"
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_kafka_config_unknown_format():
+    res = _parse_kafka_config({"sink": {"kafka": {"topic": "t", "format": "avro"}}})
+    match res:
+        case Err(errs):
+            assert any("format" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for an unknown format")
+
+
+def test_parse_delta_config():
+    res = _parse_delta_config({"publishing": {"delta": {"stateFile": "/tmp/s.json", "heartbeatInterval": 60,
+                                                        "latencyBucketsMs": [50, 500]}}})
+    match res:
+        case Ok(delta):
+            assert delta == DeltaConfig(state_file="/tmp/s.json", heartbeat_interval=60.0,
+                                        latency_buckets_ms=(50, 500))
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_delta_config_invalid_buckets():
+    res = _parse_delta_config({"publishing": {"delta": {"stateFile": "/tmp/s.json",
+                                                        "latencyBucketsMs": [500, 50]}}})
+    match res:
+        case Err(errs):
+            assert any("latencyBucketsMs" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for unordered buckets")
+
+
+def test_parse_aggregation_config():
+    res = _parse_aggregation_config({"aggregation": {"interval": 30, "relativeAccuracy": 0.02, "rawEvents": False}})
+    match res:
+        case Ok(aggregation):
+            assert aggregation == AggregationConfig(interval=30.0, relative_accuracy=0.02, raw_events=False)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_parse_aggregation_config_invalid():
+    res = _parse_aggregation_config({"aggregation": {"interval": 0, "relativeAccuracy": 2.0}})
+    match res:
+        case Err(errs):
+            assert any("interval" in e for e in errs)
+            assert any("relativeAccuracy" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for invalid aggregation settings")
+
+
+def test_parse_config_rejects_duplicate_probe_names():
+    probe = {"name": "dup", "url": "https://dup.example", "schedule": "* * * * *"}
+    res = _parse_config({"probes": [probe, probe]})
+    match res:
+        case Err(errs):
+            assert any("dup" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for duplicate probe names")
+
+
+def test_probe_files_are_merged_with_inline_probes(tmp_path):
+    (tmp_path / "probes.d").mkdir()
+    (tmp_path / "probes.d" / "a.ndjson").write_text(
+        '{"name": "a1", "url": "https://a1.example", "schedule": "* * * * *"}\n'
+        '\n'
+        '{"name": "a2", "url": "https://a2.example", "schedule": "* * * * *", "checkCert": false}\n')
+    (tmp_path / "probes.d" / "b.yml").write_text(
+        "- name: b1\n  url: https://b1.example\n  schedule: '*/5 * * * *'\n")
+    config = {
+        "probeFiles": ["probes.d/*"],
+        "probes": [{"name": "inline", "url": "https://inline.example", "schedule": "* * * * *"}],
+    }
+
+    res = _parse_app_config(config, tmp_path)
+    match res:
+        case Ok(app):
+            assert [p.name for p in app.probes] == ["inline", "a1", "a2", "b1"]
+            assert app.probes[2].checkCert is False
+            assert app.probe_files == (str(tmp_path / "probes.d" / "a.ndjson"), str(tmp_path / "probes.d" / "b.yml"))
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_probe_file_errors_name_the_line(tmp_path):
+    (tmp_path / "probes.ndjson").write_text(
+        '{"name": "ok", "url": "https://ok.example", "schedule": "* * * * *"}\n'
+        '{"name": "no-url", "schedule": "* * * * *"}\n'
+        '{not json\n')
+
+    res = _parse_app_config({"probeFiles": ["probes.ndjson"]}, tmp_path)
+    match res:
+        case Err(errs):
+            assert f"{tmp_path / 'probes.ndjson'}:2: Probe url is required" in errs
+            assert any(e.startswith(f"{tmp_path / 'probes.ndjson'}:3: invalid JSON") for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for invalid probe file entries")
+
+
+def test_missing_probe_file_is_an_error(tmp_path):
+    res = _parse_app_config({"probeFiles": ["missing.ndjson"]}, tmp_path)
+    match res:
+        case Err(errs):
+            assert any("Probe file not found" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for a missing probe file")
+
+
+def test_duplicate_names_across_probe_files(tmp_path):
+    line = '{"name": "dup", "url": "https://dup.example", "schedule": "* * * * *"}\n'
+    (tmp_path / "one.jsonl").write_text(line)
+    (tmp_path / "two.jsonl").write_text(line)
+
+    res = _parse_app_config({"probeFiles": ["one.jsonl", "two.jsonl"]}, tmp_path)
+    match res:
+        case Err(errs):
+            assert errs == ["Probe name 'dup' is used more than once"]
+        case Ok(_):
+            pytest.fail("Expected Failure for duplicate probe names")
+
+
+def test_parse_shard_config():
+    match _parse_shard_config({"sharding": {"index": 1, "count": 3, "workers": 4}}):
+        case Ok(cfg):
+            assert cfg == ShardConfig(index=1, count=3, workers=4)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+    assert _parse_shard_config({}) == Ok(ShardConfig())
+
+
+@pytest.mark.parametrize("sharding", [{"index": 3, "count": 3}, {"count": 0}, {"workers": 0}, "all"])
+def test_parse_shard_config_invalid(sharding):
+    assert isinstance(_parse_shard_config({"sharding": sharding}), Err)
+
+
+def test_parse_app_config_rejects_metrics_ports_past_the_last_worker():
+    res = _parse_app_config({"metrics": {"port": 65534}, "sharding": {"workers": 3}})
+    match res:
+        case Err(errs):
+            assert any("metrics port" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure when the last worker's metrics port is out of range")
+
+    assert isinstance(_parse_app_config({"metrics": {"port": 65533}, "sharding": {"workers": 3}}), Ok)
+    assert isinstance(_parse_app_config({"metrics": {"port": 0}, "sharding": {"workers": 3}}), Ok)
+
+
+def test_parse_logging_config_overrides_listed_rates():
+    match _parse_logging_config({"logging": {"sampling": {"Executing probe {probe}": 1, "Custom event": 0.5}}}):
+        case Ok(cfg):
+            rates = dict(cfg.sample_rates)
+            assert rates["Executing probe {probe}"] == 1.0
+            assert rates["Custom event"] == 0.5
+            assert rates["Published outcomes for probe {probe}"] == dict(LoggingConfig().sample_rates)[
+                "Published outcomes for probe {probe}"]
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+    assert _parse_logging_config({}) == Ok(LoggingConfig())
+
+
+@pytest.mark.parametrize("section", [{"sampling": {"Executing probe {probe}": 2}},
+                                     {"sampling": {"Executing probe {probe}": "all"}},
+                                     {"sampling": ["Executing probe {probe}"]}, "quiet"])
+def test_parse_logging_config_invalid(section):
+    assert isinstance(_parse_logging_config({"logging": section}), Err)
+
+
+def test_parse_probe_adaptive():
+    base = {"name": "p", "url": "https://p.example", "schedule": "* * * * *"}
+
+    assert _parse_probe({**base, "adaptive": True}) == Ok(Probe(
+        name="p", url="https://p.example", schedule="* * * * *", checkCert=True, adaptive=AdaptivePolicy()))
+
+    match _parse_probe({**base, "adaptive": {"backoffAfter": 5, "maxInterval": 900, "escalateRuns": 2}}):
+        case Ok(p):
+            assert p.adaptive == AdaptivePolicy(backoff_after=5, max_interval=900.0, escalate_runs=2)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+@pytest.mark.parametrize("adaptive", [{"backoffAfter": 0}, {"backoffFactor": 0.5}, {"escalateInterval": -1},
+                                      {"maxInterval": "1h"}, "yes"])
+def test_parse_probe_adaptive_invalid(adaptive):
+    res = _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *", "adaptive": adaptive})
+    match res:
+        case Err(errs):
+            assert all("adaptive" in e for e in errs)
+        case Ok(_):
+            pytest.fail("Expected Failure for an invalid adaptive policy")
+
+
+def test_parse_scheduler_config_adaptive_rate_budget():
+    assert _parse_scheduler_config({"scheduler": {"adaptiveRateBudget": 20}}) == Ok(
+        SchedulerConfig(adaptive_rate_budget=20.0))
+    assert isinstance(_parse_scheduler_config({"scheduler": {"adaptiveRateBudget": 0}}), Err)
+
+
+def test_parse_probe_method_and_body_assertions():
+    res = _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *", "method": "get",
+                        "maxBodyBytes": 4096,
+                        "expect": [{"contains": "ok"}, {"regex": r"v\d+"}, {"jsonKey": "status.db"}]})
+    match res:
+        case Ok(p):
+            assert p.method == "GET"
+            assert p.max_body_bytes == 4096
+            assert p.assertions == (BodyAssertion("contains", "ok"), BodyAssertion("regex", r"v\d+"),
+                                    BodyAssertion("json_key", "status.db"))
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+@pytest.mark.parametrize("fields", [
+    {"method": "POST"},
+    {"maxBodyBytes": 0},
+    {"expect": {"contains": "ok"}},
+    {"expect": [{"contains": "ok", "regex": "ok"}]},
+    {"expect": [{"xpath": "/a"}]},
+    {"expect": [{"regex": "("}]},
+    {"method": "HEAD", "expect": [{"contains": "ok"}]},
+])
+def test_parse_probe_invalid_method_or_body_assertions(fields):
+    res = _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *", **fields})
+    assert isinstance(res, Err)
+
+
+def test_parse_http_config_max_body_bytes():
+    match _parse_http_config({"http": {"maxBodyBytes": 1024}}):
+        case Ok(http):
+            assert http.max_body_bytes == 1024
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+    assert isinstance(_parse_http_config({"http": {"maxBodyBytes": -1}}), Err)
+
+
+def test_parse_http2_settings():
+    match _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *", "http2": True}):
+        case Ok(p):
+            assert p.http2 is True
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+    match _parse_http_config({"http": {"http2Hosts": ["API.example"], "maxConcurrentStreams": 20}}):
+        case Ok(http):
+            assert http.http2_hosts == frozenset({"api.example"})
+            assert http.max_concurrent_streams == 20
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+    assert isinstance(_parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *",
+                                    "http2": "yes"}), Err)
+    assert isinstance(_parse_http_config({"http": {"http2Hosts": "api.example"}}), Err)
+    assert isinstance(_parse_http_config({"http": {"maxConcurrentStreams": 0}}), Err)
+
+
+def test_parse_probe_timeouts_retries_and_hedge():
+    res = _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *",
+                        "timeout": 2, "retries": 2, "deadline": 5, "hedge": {"percentile": 90}})
+    match res:
+        case Ok(p):
+            assert (p.timeout, p.retries, p.deadline) == (2.0, 2, 5.0)
+            assert p.hedge == HedgePolicy(percentile=90.0)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+    match _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *", "hedge": True}):
+        case Ok(p):
+            assert p.hedge == HedgePolicy()
+            assert (p.timeout, p.retries, p.deadline) == (None, 0, None)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+    match _parse_http_config({"http": {"timeout": 3}}):
+        case Ok(http):
+            assert http.timeout == 3.0
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+@pytest.mark.parametrize("fields", [
+    {"timeout": 0},
+    {"retries": -1},
+    {"retries": 11},
+    {"deadline": "5s"},
+    {"hedge": "p95"},
+    {"hedge": {"percentile": 100}},
+    {"hedge": {"minSamples": 0}},
+])
+def test_parse_probe_invalid_timeouts_retries_or_hedge(fields):
+    res = _parse_probe({"name": "p", "url": "https://p.example", "schedule": "* * * * *", **fields})
+    assert isinstance(res, Err)
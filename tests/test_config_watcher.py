@@ -0,0 +1,196 @@
+import asyncio
+import os
+from pathlib import Path
+from unittest.mock import Mock
+
+from src.common.result import Err, Ok, Result
+from src.domain import Probe
+from src.infra.config_loader import AppConfig, get_config
+from src.infra.config_watcher import ConfigWatcher, ReloadConfig, diff_probes
+from src.infra.kafka_publisher import KafkaPublisherConfig
+from src.infra.requestor import HttpRequestorConfig
+from src.scheduler import SchedulerConfig
+
+
+def _probe(name: str, url: str = "https://example.com", schedule: str = "* * * * *") -> Probe:
+    return Probe(name=name, url=url, schedule=schedule)
+
+
+def _app(*probes: Probe, topic: str = "t") -> AppConfig:
+    return AppConfig(KafkaPublisherConfig({}, topic), HttpRequestorConfig(), SchedulerConfig(), list(probes),
+                     reload=ReloadConfig(poll_interval=0.01))
+
+
+class _Target:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.rejected: set[str] = set()
+
+    def add(self, probe: Probe) -> None:
+        if probe.name in self.rejected:
+            raise ValueError(f"cannot schedule {probe.name}")
+        self.calls.append(("add", probe.name))
+
+    def remove(self, name: str) -> None:
+        self.calls.append(("remove", name))
+
+
+def test_diff_probes_by_name():
+    diff = diff_probes([_probe("same"), _probe("edited"), _probe("gone")],
+                       [_probe("same"), _probe("edited", schedule="*/5 * * * *"), _probe("new")])
+
+    assert [p.name for p in diff.added] == ["new"]
+    assert diff.removed == ["gone"]
+    assert [p.name for p in diff.changed] == ["edited"]
+    assert not diff_probes([_probe("a")], [_probe("a")])
+
+
+def test_reload_reschedules_only_changed_probes():
+    target = _Target()
+    loaded: list[Result[AppConfig, list[str]]] = [
+        Ok(_app(_probe("same"), _probe("edited", url="https://other.example"), _probe("new")))]
+    watcher = ConfigWatcher("missing.yml", _app(_probe("same"), _probe("edited"), _probe("gone")), target,
+                            lambda: loaded[0], Mock())
+
+    assert asyncio.run(watcher.reload())
+
+    assert target.calls == [("remove", "gone"), ("add", "new"), ("add", "edited")]
+    assert [p.name for p in watcher.current.probes] == ["same", "edited", "new"]
+
+
+def test_probe_that_cannot_be_scheduled_keeps_its_running_definition():
+    target = _Target()
+    target.rejected = {"edited", "new"}
+    logger = Mock()
+    running = _probe("edited")
+    loaded: list[Result[AppConfig, list[str]]] = [
+        Ok(_app(_probe("same"), _probe("edited", schedule="bad"), _probe("new"), _probe("other")))]
+    watcher = ConfigWatcher("missing.yml", _app(_probe("same"), running), target, lambda: loaded[0], logger)
+
+    assert asyncio.run(watcher.reload())
+
+    assert target.calls == [("add", "other")]
+    assert sorted(p.name for p in watcher.current.probes) == ["edited", "other", "same"]
+    assert running in watcher.current.probes
+    assert logger.error.call_count == 2
+
+
+def test_failed_reload_does_not_stop_the_watcher():
+    target = _Target()
+    logger = Mock()
+    loads = 0
+
+    def load() -> Result[AppConfig, list[str]]:
+        nonlocal loads
+        loads += 1
+        raise OSError("disk gone")
+
+    watcher = ConfigWatcher("missing.yml", _app(), target, load, logger)
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        task = asyncio.create_task(watcher.run(stop))
+        for _ in range(2):
+            watcher.trigger()
+            await asyncio.sleep(0.05)
+        stop.set()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+    assert loads == 2
+    assert logger.error.call_count == 2
+
+
+def test_invalid_config_keeps_the_running_one():
+    target = _Target()
+    logger = Mock()
+    current = _app(_probe("a"))
+    watcher = ConfigWatcher("missing.yml", current, target, lambda: Err(["Probe url is required"]), logger)
+
+    assert not asyncio.run(watcher.reload())
+
+    assert target.calls == []
+    assert watcher.current is current
+    logger.error.assert_called_once()
+
+
+def test_restart_only_sections_are_reported():
+    logger = Mock()
+    watcher = ConfigWatcher("missing.yml", _app(_probe("a")), _Target(), lambda: Ok(_app(_probe("a"), topic="x")),
+                            logger)
+
+    asyncio.run(watcher.reload())
+
+    assert logger.warning.call_args.kwargs["sections"] == ["kafka"]
+
+
+def _write_config(path: Path, *names: str) -> None:
+    probes = "".join(f"  - name: {n}\n    url: https://{n}.example\n    schedule: '* * * * *'\n" for n in names)
+    path.write_text(f"sink:\n  kafka:\n    topic: t\nreload:\n  pollInterval: 0.01\nprobes:\n{probes}")
+
+
+def test_file_change_is_picked_up_by_polling(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_config(tmp_path / "config.yml", "a")
+    initial = get_config("config.yml")
+    assert isinstance(initial, Ok)
+    target = _Target()
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        watcher = ConfigWatcher("config.yml", initial.value, target, lambda: get_config("config.yml"), Mock())
+        task = asyncio.create_task(watcher.run(stop))
+        await asyncio.sleep(0.05)
+        _write_config(tmp_path / "config.yml", "a", "b")
+        os.utime(tmp_path / "config.yml", ns=(0, 1))  # make sure the mtime moves on coarse filesystems
+        await asyncio.sleep(0.2)
+        stop.set()
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert target.calls == [("add", "b")]
+
+
+def test_trigger_forces_a_reload():
+    target = _Target()
+    loaded = Ok(_app(_probe("a"), _probe("b")))
+    current = _app(_probe("a"))
+    current = AppConfig(current.kafka, current.http, current.scheduler, current.probes, reload=ReloadConfig(0))
+
+    async def run() -> None:
+        watcher = ConfigWatcher("missing.yml", current, target, lambda: loaded, Mock())
+        task = asyncio.create_task(watcher.run(asyncio.Event()))
+        await asyncio.sleep(0.01)
+        watcher.trigger()
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert target.calls == [("add", "b")]
+
+
+def test_probe_file_change_is_picked_up_by_polling(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.yml").write_text(
+        "sink:\n  kafka:\n    topic: t\nreload:\n  pollInterval: 0.01\nprobeFiles: [probes.ndjson]\n")
+    inventory = tmp_path / "probes.ndjson"
+    inventory.write_text('{"name": "a", "url": "https://a.example", "schedule": "* * * * *"}\n')
+    initial = get_config("config.yml")
+    assert isinstance(initial, Ok)
+    target = _Target()
+
+    async def run() -> None:
+        watcher = ConfigWatcher("config.yml", initial.value, target, lambda: get_config("config.yml"), Mock())
+        task = asyncio.create_task(watcher.run(asyncio.Event()))
+        await asyncio.sleep(0.05)
+        with inventory.open("a") as f:
+            f.write('{"name": "b", "url": "https://b.example", "schedule": "* * * * *"}\n')
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert target.calls == [("add", "b")]
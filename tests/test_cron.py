@@ -0,0 +1,106 @@
+import random
+import time
+from datetime import datetime
+from typing import Callable, Iterator
+
+import pytest
+from croniter import croniter
+
+from src.common.cron import compile_cron
+from src.common.result import Err, Ok
+
+EXPRESSIONS = [
+    "* * * * *",
+    "*/1 * * * *",
+    "*/5 * * * *",
+    "5 4 * * *",
+    "0 0 * * *",
+    "0 * * * *",
+    "15,45 9-17 * * mon-fri",
+    "30 2 1 * *",
+    "0 12 * jan,jul *",
+    "0 0 13 * 5",
+    "*/7 */3 */2 * *",
+    "10-50/20 1-5 * * 0,7",
+    "0 0 29 2 *",
+    "59 23 31 * *",
+    "@hourly",
+    "@weekly",
+]
+
+
+@pytest.fixture
+def local_tz(monkeypatch: pytest.MonkeyPatch) -> Iterator[Callable[[str], None]]:
+    def use(tz: str) -> None:
+        monkeypatch.setenv("TZ", tz)
+        time.tzset()
+
+    yield use
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _croniter_next(expression: str, after: float) -> float:
+    return croniter(expression, datetime.fromtimestamp(after)).get_next(datetime).timestamp()
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_next_fire_matches_croniter(expression: str, local_tz: Callable[[str], None]):
+    local_tz("UTC")
+    rnd = random.Random(expression)
+    match compile_cron(expression):
+        case Ok(schedule):
+            for _ in range(200):
+                after = datetime(2024, 1, 1).timestamp() + rnd.uniform(0, 3 * 365 * 86400)
+                assert schedule.next_fire(after) == _croniter_next(expression, after), after
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_next_fire_is_strictly_after_minute_boundary():
+    match compile_cron("*/1 * * * *"):
+        case Ok(schedule):
+            boundary = datetime(2025, 3, 10, 12, 0).timestamp()
+            assert schedule.next_fire(boundary) == boundary + 60
+            assert schedule.next_fire(boundary + 59.9) == boundary + 60
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_identical_expressions_share_compiled_schedule():
+    match (compile_cron("*/5 * * * *"), compile_cron("*/5 * * * *")):
+        case (Ok(first), Ok(second)):
+            assert first is second
+        case _:
+            pytest.fail("Expected both expressions to compile")
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* * * * * *",
+    "0 0 L * *",
+    "*/0 * * * *",
+    "0 0 30 2 *",
+])
+def test_unsupported_or_invalid_expressions_are_rejected(expression: str):
+    match compile_cron(expression):
+        case Err(_):
+            pass
+        case Ok(_):
+            pytest.fail(f"Expected Failure for '{expression}'")
+
+
+def test_next_fire_moves_forward_across_dst_transitions(local_tz: Callable[[str], None]):
+    local_tz("America/New_York")
+    match compile_cron("*/15 * * * *"):
+        case Ok(schedule):
+            # 2025-03-09 02:00-02:59 never happens and 2025-11-02 01:00-01:59 happens twice in New York
+            for start in (datetime(2025, 3, 9, 1, 20), datetime(2025, 11, 2, 0, 50)):
+                fire = start.timestamp()
+                for _ in range(12):
+                    after, fire = fire, schedule.next_fire(fire)
+                    assert fire > after
+                    assert datetime.fromtimestamp(fire).minute % 15 == 0
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Sequence
+from unittest.mock import Mock
+
+from src.common.result import Err, Ok, Result
+from src.domain import CertInfo, HttpResult, ProbeOutcome
+from src.infra.delta_publisher import DeltaConfig, DeltaPublisher
+
+
+class _RecordingPublisher:
+    def __init__(self) -> None:
+        self.sent: list[ProbeOutcome] = []
+        self.failing = False
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        if self.failing:
+            return [Err("broker down")] * len(outcomes)
+        self.sent.extend(outcomes)
+        return [Ok(None)] * len(outcomes)
+
+
+def _cert(not_after_year: int = 2026) -> CertInfo:
+    return CertInfo("example.com", "CA", datetime(2025, 1, 1, tzinfo=timezone.utc),
+                    datetime(not_after_year, 1, 1, tzinfo=timezone.utc))
+
+
+def _publisher(tmp_path: Path, inner: _RecordingPublisher, now: list[float]) -> DeltaPublisher:
+    cfg = DeltaConfig(state_file=str(tmp_path / "state.json"), heartbeat_interval=60.0)
+    return DeltaPublisher(inner, Mock(), cfg, clock=lambda: now[0])
+
+
+def _run_all(publisher: DeltaPublisher, now: list[float], runs: list[tuple[float, HttpResult, CertInfo | None]]) -> None:
+    async def run() -> None:
+        for at, result, cert in runs:
+            now[0] = at
+            await publisher.publish("p", result, cert)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+
+def test_only_transitions_are_published_in_full(tmp_path: Path):
+    inner, now = _RecordingPublisher(), [0.0]
+    publisher = _publisher(tmp_path, inner, now)
+
+    _run_all(publisher, now, [
+        (0, HttpResult(200, 50), _cert()),      # first sight
+        (10, HttpResult(204, 60), _cert()),     # same class and bucket
+        (20, HttpResult(503, 60), _cert()),     # status class change
+        (30, HttpResult(503, 500), _cert()),    # latency bucket change
+        (40, HttpResult(503, 550), _cert(2027)),  # certificate rotated
+        (50, HttpResult(503, 520), _cert(2027)),
+    ])
+
+    assert [(o.result.status_code, o.heartbeat) for o in inner.sent] == [
+        (200, False), (503, False), (503, False), (503, False)]
+    assert publisher.stats().suppressed == 2
+
+
+def test_unchanged_probe_sends_heartbeats_at_the_interval(tmp_path: Path):
+    inner, now = _RecordingPublisher(), [0.0]
+    publisher = _publisher(tmp_path, inner, now)
+
+    _run_all(publisher, now, [(t, HttpResult(200, 50), None) for t in range(0, 200, 10)])
+
+    heartbeats = [o for o in inner.sent if o.heartbeat]
+    assert len(inner.sent) == 4
+    assert len(heartbeats) == 3
+    assert all(o.cert_info is None and o.result.timings is None for o in heartbeats)
+
+
+def test_failed_transition_is_retried_on_the_next_run(tmp_path: Path):
+    inner, now = _RecordingPublisher(), [0.0]
+    publisher = _publisher(tmp_path, inner, now)
+
+    async def run() -> None:
+        inner.failing = True
+        assert isinstance(await publisher.publish("p", HttpResult(500, 10), None), Err)
+        inner.failing = False
+        await publisher.publish("p", HttpResult(500, 10), None)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    assert [o.heartbeat for o in inner.sent] == [False]
+
+
+def test_state_survives_a_restart(tmp_path: Path):
+    inner, now = _RecordingPublisher(), [0.0]
+    _run_all(_publisher(tmp_path, inner, now), now, [(0, HttpResult(200, 50), _cert())])
+
+    restarted = _RecordingPublisher()
+    _run_all(_publisher(tmp_path, restarted, now), now, [(5, HttpResult(200, 40), _cert())])
+
+    assert restarted.sent == []
+
+
+def test_unreadable_state_file_starts_fresh(tmp_path: Path):
+    (tmp_path / "state.json").write_text("{not json")
+    inner, now = _RecordingPublisher(), [0.0]
+
+    _run_all(_publisher(tmp_path, inner, now), now, [(0, HttpResult(200, 50), None)])
+
+    assert len(inner.sent) == 1
+
+
+def test_body_assertion_outcome_is_part_of_the_state(tmp_path: Path):
+    inner, now = _RecordingPublisher(), [0.0]
+    publisher = _publisher(tmp_path, inner, now)
+
+    _run_all(publisher, now, [
+        (0, HttpResult(200, 50, body_bytes=10, assertions_ok=True), None),
+        (10, HttpResult(200, 50, body_bytes=10, assertions_ok=False, assertion_error="no"), None),
+        (20, HttpResult(200, 50, body_bytes=10, assertions_ok=False, assertion_error="no"), None),
+    ])
+
+    assert [o.result.assertions_ok for o in inner.sent] == [True, False]
+
+
+def test_state_written_before_body_assertions_is_still_read(tmp_path: Path):
+    (tmp_path / "state.json").write_text('{"p": [2, null, 0, 0.0]}')
+    inner, now = _RecordingPublisher(), [5.0]
+
+    _run_all(_publisher(tmp_path, inner, now), now, [(5, HttpResult(200, 50), None)])
+
+    assert inner.sent == []
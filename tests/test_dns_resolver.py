@@ -0,0 +1,122 @@
+import asyncio
+import socket
+from typing import Any
+
+import pytest
+
+from src.infra.dns_resolver import CachingResolver, DnsCacheConfig
+
+
+class _FakeDns:
+    def __init__(self, answers: dict[str, list[str]], delay: float = 0.0) -> None:
+        self.answers = answers
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def getaddrinfo(self, host: str, port: Any, **_: Any) -> list[tuple[Any, ...]]:
+        self.calls.append(host)
+        await asyncio.sleep(self.delay)
+        if host not in self.answers:
+            raise socket.gaierror(f"Name or service not known: {host}")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (a, 0)) for a in self.answers[host]]
+
+
+def _run_with(dns: _FakeDns, coro_factory: Any) -> Any:
+    async def run() -> Any:
+        asyncio.get_running_loop().getaddrinfo = dns.getaddrinfo  # type: ignore[method-assign]
+        return await coro_factory()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_lookups_for_one_host_are_coalesced():
+    dns = _FakeDns({"example.com": ["10.0.0.1", "10.0.0.1", "10.0.0.2"]}, delay=0.01)
+    resolver = CachingResolver()
+
+    results = _run_with(dns, lambda: asyncio.gather(*(resolver.resolve("example.com") for _ in range(50))))
+
+    assert dns.calls == ["example.com"]
+    assert all(r == ["10.0.0.1", "10.0.0.2"] for r in results)
+
+
+def test_answers_are_cached_until_the_ttl_expires():
+    now = [0.0]
+    dns = _FakeDns({"example.com": ["10.0.0.1"]})
+    resolver = CachingResolver(DnsCacheConfig(ttl=60.0), clock=lambda: now[0])
+
+    async def run() -> None:
+        await resolver.resolve("example.com")
+        now[0] = 59.0
+        await resolver.resolve("example.com")
+        now[0] = 61.0
+        await resolver.resolve("example.com")
+
+    _run_with(dns, run)
+
+    assert dns.calls == ["example.com", "example.com"]
+
+
+def test_failures_are_cached_for_the_negative_ttl():
+    now = [0.0]
+    dns = _FakeDns({})
+    resolver = CachingResolver(DnsCacheConfig(ttl=60.0, negative_ttl=5.0), clock=lambda: now[0])
+
+    async def run() -> None:
+        for at in (0.0, 4.0, 6.0):
+            now[0] = at
+            with pytest.raises(socket.gaierror):
+                await resolver.resolve("missing.invalid")
+
+    _run_with(dns, run)
+
+    assert dns.calls == ["missing.invalid", "missing.invalid"]
+
+
+def test_fresh_lookup_bypasses_and_refreshes_the_cache():
+    dns = _FakeDns({"example.com": ["10.0.0.1"]})
+    resolver = CachingResolver()
+
+    async def run() -> list[str]:
+        await resolver.resolve("example.com")
+        dns.answers["example.com"] = ["10.0.0.9"]
+        await resolver.resolve("example.com", fresh=True)
+        return await resolver.resolve("example.com")
+
+    assert _run_with(dns, run) == ["10.0.0.9"]
+    assert len(dns.calls) == 2
+
+
+def test_cache_size_is_bounded():
+    dns = _FakeDns({f"h{i}.example": ["10.0.0.1"] for i in range(10)})
+    resolver = CachingResolver(DnsCacheConfig(max_entries=3))
+
+    async def run() -> None:
+        for i in range(10):
+            await resolver.resolve(f"h{i}.example")
+
+    _run_with(dns, run)
+
+    assert len(resolver) == 3
+
+
+def test_cancelled_caller_does_not_abort_a_shared_lookup():
+    dns = _FakeDns({"example.com": ["10.0.0.1"]}, delay=0.05)
+    resolver = CachingResolver()
+
+    async def run() -> list[str]:
+        impatient = asyncio.create_task(resolver.resolve("example.com"))
+        patient = asyncio.create_task(resolver.resolve("example.com"))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+
+    assert _run_with(dns, run) == ["10.0.0.1"]
+    assert dns.calls == ["example.com"]
+
+
+def test_ip_literals_are_not_resolved():
+    dns = _FakeDns({})
+    resolver = CachingResolver()
+
+    assert _run_with(dns, lambda: resolver.resolve("127.0.0.1")) == ["127.0.0.1"]
+    assert dns.calls == []
@@ -0,0 +1,235 @@
+import asyncio
+import json
+from typing import Any, Callable
+from unittest.mock import Mock
+
+import pytest
+
+import src.infra.kafka_publisher as kafka_publisher
+from src.infra.kafka_publisher import KafkaPublisher, KafkaPublisherConfig
+from src.infra.outcome_codec import BinarySerializer
+from src.common.metrics import MetricsRegistry
+from src.common.result import Err, Ok
+from src.common.sketch import LatencySketch
+from src.domain import HttpResult, HttpTimings, LatencySummary, ProbeOutcome
+
+
+class _FakeProducer:
+    def __init__(self, cfg: dict[str, Any]) -> None:
+        self.cfg = cfg
+        self.produced: list[bytes] = []
+        self.pending: list[Callable[[Any, Any], None]] = []
+        self.flushed = False
+        self.fail_with: Exception | None = None
+        self.delivery_error: Any = None
+
+    def produce(self, topic: str, value: bytes, on_delivery: Callable[[Any, Any], None],
+                headers: list[tuple[str, bytes]] | None = None) -> None:
+        if self.fail_with:
+            raise self.fail_with
+        self.produced.append(value)
+        self.headers = headers
+        self.pending.append(on_delivery)
+
+    def poll(self, timeout: float) -> int:
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback(self.delivery_error, None)
+        return len(pending)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def flush(self, timeout: float) -> int:
+        self.flushed = True
+        self.poll(0)
+        return 0
+
+
+@pytest.fixture
+def producers(monkeypatch: pytest.MonkeyPatch) -> list[_FakeProducer]:
+    created: list[_FakeProducer] = []
+
+    def factory(cfg: dict[str, Any]) -> _FakeProducer:
+        created.append(_FakeProducer(cfg))
+        return created[-1]
+
+    monkeypatch.setattr(kafka_publisher, "Producer", factory)
+    return created
+
+
+def test_batching_settings_are_applied_and_explicit_cfg_wins(producers: list[_FakeProducer]):
+    KafkaPublisher(Mock(), KafkaPublisherConfig({"bootstrap.servers": "k:9092", "linger.ms": "5"}, "t",
+                                                compression="zstd"))
+
+    assert producers[0].cfg == {
+        "message.timeout.ms": 30_000,
+        "bootstrap.servers": "k:9092",
+        "linger.ms": "5",
+        "batch.size": 1_000_000,
+        "compression.type": "zstd",
+    }
+
+
+def test_publish_awaits_delivery_without_flushing(producers: list[_FakeProducer]):
+    logger = Mock()
+
+    async def run() -> None:
+        publisher = KafkaPublisher(logger, KafkaPublisherConfig({}, "outcomes"))
+        await asyncio.gather(*(publisher.publish(f"p{i}", HttpResult(200, 10), None) for i in range(3)))
+        assert not producers[0].flushed
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    assert [json.loads(v)["probeName"] for v in producers[0].produced] == ["p0", "p1", "p2"]
+    assert producers[0].flushed
+    assert logger.info.call_count == 3
+    logger.error.assert_not_called()
+
+
+def test_publish_logs_delivery_failure(producers: list[_FakeProducer]):
+    logger = Mock()
+
+    async def run() -> None:
+        publisher = KafkaPublisher(logger, KafkaPublisherConfig({}, "outcomes"))
+        producers[0].delivery_error = "broker down"
+        assert isinstance(await publisher.publish("p", HttpResult(200, 10), None), Err)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    logger.error.assert_called_once()
+    logger.info.assert_not_called()
+
+
+def test_publish_gives_up_on_an_unacknowledged_delivery(producers: list[_FakeProducer]):
+    logger = Mock()
+
+    async def run() -> object:
+        publisher = KafkaPublisher(logger, KafkaPublisherConfig({}, "outcomes", delivery_timeout=0.05))
+        # A broker that never answers: delivery reports are not served.
+        producers[0].poll = lambda timeout: 0  # type: ignore[method-assign]
+        result = await publisher.publish("p", HttpResult(200, 10), None)
+        await publisher.aclose()
+        return result
+
+    assert asyncio.run(run()) == Err("Kafka delivery timed out after 0.05s")
+    assert producers[0].cfg["message.timeout.ms"] == 50
+    logger.error.assert_called()
+
+
+def test_publish_logs_local_queue_full(producers: list[_FakeProducer]):
+    logger = Mock()
+
+    async def run() -> None:
+        publisher = KafkaPublisher(logger, KafkaPublisherConfig({}, "outcomes"))
+        producers[0].fail_with = BufferError("Local: Queue full")
+        assert isinstance(await publisher.publish("p", HttpResult(200, 10), None), Err)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    logger.error.assert_called_once()
+
+
+def test_publish_includes_phase_timings(producers: list[_FakeProducer]):
+    timings = HttpTimings(dns_ms=1.5, connect_ms=2.0, tls_ms=None, ttfb_ms=40.0, total_ms=41.25)
+
+    async def run() -> None:
+        publisher = KafkaPublisher(Mock(), KafkaPublisherConfig({}, "outcomes"))
+        await publisher.publish("with", HttpResult(200, 41, timings), None)
+        await publisher.publish("without", HttpResult(200, 10), None)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    with_timings, without_timings = (json.loads(v)["httpResult"] for v in producers[0].produced)
+    assert with_timings == {
+        "statusCode": 200,
+        "elapsedMs": 41,
+        "timings": {"dnsMs": 1.5, "connectMs": 2.0, "tlsMs": None, "ttfbMs": 40.0, "totalMs": 41.25},
+    }
+    assert without_timings["timings"] is None
+
+
+def test_publish_many_reports_each_outcome(producers: list[_FakeProducer]):
+    logger = Mock()
+    outcomes = [ProbeOutcome(f"p{i}", HttpResult(200, 10), None) for i in range(3)]
+
+    async def run() -> list[object]:
+        publisher = KafkaPublisher(logger, KafkaPublisherConfig({}, "outcomes"))
+        original = producers[0].produce
+
+        def produce_until_full(topic: str, value: bytes, **kwargs: Any) -> None:
+            if len(producers[0].produced) == 2:
+                raise BufferError("Local: Queue full")
+            original(topic, value, **kwargs)
+
+        producers[0].produce = produce_until_full  # type: ignore[method-assign]
+        results = await publisher.publish_many(outcomes)
+        await publisher.aclose()
+        return list(results)
+
+    results = asyncio.run(run())
+
+    assert results[:2] == [Ok(None), Ok(None)]
+    assert isinstance(results[2], Err)
+    logger.info.assert_called_once()
+    logger.error.assert_called_once()
+
+
+def test_binary_format_is_decodable_and_labelled(producers: list[_FakeProducer]):
+    async def run() -> None:
+        publisher = KafkaPublisher(Mock(), KafkaPublisherConfig({}, "outcomes", serializer="binary"))
+        await publisher.publish("probe-a", HttpResult(503, 120), None)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    assert producers[0].headers == [("content-type", BinarySerializer.content_type.encode())]
+    assert BinarySerializer(["probe-a"]).decode(producers[0].produced[0]) == \
+        Ok(ProbeOutcome("probe-a", HttpResult(503, 120), None))
+
+
+def test_publish_summaries_goes_to_the_summary_topic(producers: list[_FakeProducer]):
+    topics: list[str] = []
+    summary = LatencySummary("p", 0.0, 60.0, 3, 2, 10.0, 20.0, 30.0, 5.0, 30.0, 15.0, LatencySketch().to_dict())
+
+    async def run() -> object:
+        publisher = KafkaPublisher(Mock(), KafkaPublisherConfig({}, "outcomes", summary_topic="summaries"))
+        original = producers[0].produce
+
+        def produce(topic: str, value: bytes, **kwargs: Any) -> None:
+            topics.append(topic)
+            original(topic, value, **kwargs)
+
+        producers[0].produce = produce  # type: ignore[method-assign]
+        result = await publisher.publish_summaries([summary])
+        await publisher.aclose()
+        return result
+
+    assert asyncio.run(run()) == Ok(None)
+    assert topics == ["summaries"]
+    decoded = json.loads(producers[0].produced[0])
+    assert decoded["availability"] == pytest.approx(2 / 3)
+    assert decoded["latencyMs"]["p99"] == 30.0
+
+
+def test_delivery_results_and_queue_depth_are_recorded_in_metrics(producers: list[_FakeProducer]):
+    registry = MetricsRegistry()
+
+    async def run() -> None:
+        publisher = KafkaPublisher(Mock(), KafkaPublisherConfig({}, "outcomes"), registry)
+        await publisher.publish_many([ProbeOutcome("a", HttpResult(200, 10), None)] * 2)
+        producers[0].delivery_error = "broker down"
+        await publisher.publish("b", HttpResult(200, 10), None)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    text = registry.render()
+    assert 'ping_monkey_kafka_messages_total{topic="outcomes",result="delivered"} 2' in text
+    assert 'ping_monkey_kafka_messages_total{topic="outcomes",result="failed"} 1' in text
+    assert "ping_monkey_kafka_batch_delivery_seconds_count 2" in text
+    assert "ping_monkey_kafka_queue_messages 0" in text
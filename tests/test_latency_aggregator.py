@@ -0,0 +1,91 @@
+import asyncio
+from typing import Sequence
+from unittest.mock import Mock
+
+import pytest
+
+from src.common.result import Err, Ok, Result
+from src.common.sketch import LatencySketch
+from src.domain import HttpResult, HttpTimings, LatencySummary
+from src.latency_aggregator import AggregationConfig, LatencyAggregator
+
+
+class _Summaries:
+    def __init__(self, result: Result[None, str] = Ok(None)) -> None:
+        self.result = result
+        self.published: list[LatencySummary] = []
+
+    async def publish_summaries(self, summaries: Sequence[LatencySummary]) -> Result[None, str]:
+        self.published.extend(summaries)
+        return self.result
+
+
+def test_summary_reports_quantiles_and_availability():
+    now = [1000.0]
+    aggregator = LatencyAggregator(_Summaries(), Mock(), clock=lambda: now[0])
+    for ms in range(1, 101):
+        aggregator.record("p", HttpResult(200, ms))
+    aggregator.record("p", HttpResult(503, 5))
+    aggregator.record("p", None)
+
+    now[0] = 1060.0
+    (summary,) = aggregator.summaries()
+
+    assert (summary.window_start, summary.window_end) == (1000.0, 1060.0)
+    assert (summary.runs, summary.successes) == (102, 100)
+    assert summary.p50_ms == pytest.approx(50, rel=0.03)
+    assert summary.p99_ms == pytest.approx(99, rel=0.02)
+    assert (summary.min_ms, summary.max_ms) == (1, 100)
+
+
+def test_total_time_is_preferred_over_elapsed_ms():
+    aggregator = LatencyAggregator(_Summaries(), Mock())
+    aggregator.record("p", HttpResult(200, 0, HttpTimings(None, None, None, 0.2, 0.4)))
+
+    (summary,) = aggregator.summaries()
+
+    assert summary.max_ms == 0.4
+
+
+def test_windows_reset_and_idle_probes_are_forgotten():
+    aggregator = LatencyAggregator(_Summaries(), Mock())
+    aggregator.record("busy", HttpResult(200, 10))
+    aggregator.record("idle", HttpResult(200, 10))
+    aggregator.summaries()
+
+    aggregator.record("busy", HttpResult(200, 30))
+    (summary,) = aggregator.summaries()
+
+    assert summary.probe_name == "busy"
+    assert summary.runs == 1
+    assert summary.min_ms == 30
+    assert aggregator.summaries() == []
+
+
+def test_window_sketches_merge_into_a_longer_window():
+    aggregator = LatencyAggregator(_Summaries(), Mock())
+    windows = [range(1, 11), range(100, 111)]
+    sketches = []
+    for window in windows:
+        for ms in window:
+            aggregator.record("p", HttpResult(200, ms))
+        sketches.append(LatencySketch.from_dict(aggregator.summaries()[0].sketch))
+
+    merged = sketches[0]
+    merged.merge(sketches[1])
+
+    assert merged.count == 21
+    assert (merged.min, merged.max) == (1, 110)
+    assert merged.quantile(0.5) == pytest.approx(100, rel=0.02)
+
+
+def test_flush_publishes_and_logs_failures():
+    logger = Mock()
+    sink = _Summaries(Err("broker down"))
+    aggregator = LatencyAggregator(sink, logger)
+    aggregator.record("p", HttpResult(200, 10))
+
+    asyncio.run(aggregator.flush())
+
+    assert [s.probe_name for s in sink.published] == ["p"]
+    logger.error.assert_called_once()
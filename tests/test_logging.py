@@ -0,0 +1,110 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+import structlog
+
+from src.common.logging import (EventSampler, LoggingConfig, _NonBlockingQueueHandler, configure_sampling,
+                                get_logger, init_logging, shutdown_logging)
+
+
+@pytest.fixture
+def restore_logging(monkeypatch):
+    monkeypatch.setenv("ENV", "production")
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    shutdown_logging()
+    configure_sampling(LoggingConfig())
+    structlog.reset_defaults()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _records(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_sampler_keeps_one_in_n_and_marks_it():
+    sampler = EventSampler()
+    sampler.configure(LoggingConfig(sample_rates=(("Executing probe {probe}", 0.25),)))
+
+    kept = []
+    for i in range(8):
+        try:
+            kept.append(sampler(None, "info", {"event": "Executing probe {probe}", "i": i}))
+        except structlog.DropEvent:
+            pass
+
+    assert [e["i"] for e in kept] == [0, 4]
+    assert all(e["sampled"] == 4 for e in kept)
+
+
+def test_sampler_always_keeps_warnings_errors_and_unlisted_events():
+    sampler = EventSampler()
+    sampler.configure(LoggingConfig(sample_rates=(("Executing probe {probe}", 0.0),)))
+
+    assert sampler(None, "error", {"event": "Executing probe {probe}"}) == {"event": "Executing probe {probe}"}
+    assert sampler(None, "warning", {"event": "Executing probe {probe}"}) == {"event": "Executing probe {probe}"}
+    assert sampler(None, "info", {"event": "Something else"}) == {"event": "Something else"}
+
+
+def test_sampler_rate_zero_drops_the_event():
+    sampler = EventSampler()
+    sampler.configure(LoggingConfig(sample_rates=(("Executing probe {probe}", 0.0),)))
+
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "Executing probe {probe}"})
+
+
+def test_full_queue_drops_without_blocking_and_reports_the_count():
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=2)
+    handler = _NonBlockingQueueHandler(log_queue)
+
+    for i in range(4):
+        handler.emit(logging.makeLogRecord({"msg": f"record {i}"}))
+
+    assert handler.dropped == 2
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+
+    handler.emit(logging.makeLogRecord({"msg": "record 4"}))
+
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == [
+        "Dropped 2 log records, the log queue was full", "record 4"]
+    assert handler.dropped == 0
+
+
+def test_records_are_written_by_the_listener_thread(restore_logging, monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "info")
+    stream = io.StringIO()
+    init_logging(stream=stream)
+    configure_sampling(LoggingConfig(sample_rates=()))
+    log = get_logger()
+
+    log.info("Executing probe {probe}", probe="a")
+    log.debug("Not written")
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        log.error("Failed", exc_info=True)
+    shutdown_logging()
+
+    records = _records(stream)
+    assert [r["event"] for r in records] == ["Executing probe {probe}", "Failed"]
+    assert records[0]["probe"] == "a"
+    assert records[0]["level"] == "info"
+    assert "ZeroDivisionError" in records[1]["exception"]
+
+
+def test_synchronous_mode_writes_immediately(restore_logging, monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "warning")
+    stream = io.StringIO()
+    init_logging(queue_size=0, stream=stream)
+    log = get_logger()
+
+    log.info("Filtered")
+    log.warning("Kept {n}", n=1)
+
+    assert [r["event"] for r in _records(stream)] == ["Kept {n}"]
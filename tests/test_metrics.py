@@ -0,0 +1,53 @@
+import pytest
+
+from src.common.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render_with_labels():
+    registry = MetricsRegistry()
+    runs = registry.counter("runs_total", "Runs", ["outcome"])
+    runs.labels("ok").inc()
+    runs.labels("ok").inc(2)
+    runs.labels('bad "one"').inc()
+    registry.gauge("in_flight", "In flight").labels().set(3)
+
+    text = registry.render()
+
+    assert "# TYPE ping_monkey_runs_total counter" in text
+    assert 'ping_monkey_runs_total{outcome="ok"} 3' in text
+    assert 'ping_monkey_runs_total{outcome="bad \\"one\\""} 1' in text
+    assert "ping_monkey_in_flight 3" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(namespace="")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1.0]).labels()
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 2.65" in lines
+    assert "latency_seconds_count 4" in lines
+
+
+def test_gauge_function_is_read_at_render_time():
+    registry = MetricsRegistry()
+    depth = [1]
+    registry.gauge("depth", "Depth").set_function(lambda: depth[0])
+    depth[0] = 7
+
+    assert "ping_monkey_depth 7" in registry.render()
+
+
+def test_label_count_and_duplicate_names_are_checked():
+    registry = MetricsRegistry()
+    runs = registry.counter("runs_total", "Runs", ["outcome"])
+
+    with pytest.raises(ValueError):
+        runs.labels()
+    with pytest.raises(ValueError):
+        registry.gauge("runs_total", "Again")
@@ -0,0 +1,34 @@
+import asyncio
+from unittest.mock import Mock
+
+from src.common.metrics import MetricsRegistry
+from src.infra.metrics_server import MetricsServer, MetricsServerConfig
+
+
+async def _get(port: int, path: str) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_serves_registry_in_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("runs_total", "Runs").labels().inc()
+
+    async def run() -> tuple[bytes, bytes]:
+        server = MetricsServer(registry, MetricsServerConfig(port=0), Mock())
+        await server.start()
+        assert server.port
+        try:
+            return await _get(server.port, "/metrics"), await _get(server.port, "/other")
+        finally:
+            await server.aclose()
+
+    metrics, other = asyncio.run(run())
+
+    assert metrics.startswith(b"HTTP/1.1 200 OK")
+    assert b"text/plain; version=0.0.4" in metrics
+    assert metrics.endswith(b"ping_monkey_runs_total 1\n")
+    assert other.startswith(b"HTTP/1.1 404")
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.common.result import Err, Ok
+from src.domain import Attempt, CertInfo, HttpResult, HttpTimings, LatencySummary, ProbeOutcome
+from src.infra.outcome_codec import (BINARY_SCHEMA_VERSION, BinarySerializer, JsonSerializer, OutcomeSerializer,
+                                     decode_summary, encode_summary, probe_id)
+
+
+def _outcome(name: str = "checkout") -> ProbeOutcome:
+    return ProbeOutcome(
+        probe_name=name,
+        result=HttpResult(200, 43, HttpTimings(dns_ms=1.5, connect_ms=None, tls_ms=12.25, ttfb_ms=40.0,
+                                               total_ms=42.75)),
+        cert_info=CertInfo(
+            subject_cn="example.com",
+            issuer_cn=None,
+            not_before=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            not_after=datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc),
+        ),
+    )
+
+
+@pytest.mark.parametrize("serializer", [JsonSerializer(), BinarySerializer(["checkout"])])
+def test_round_trip(serializer: OutcomeSerializer):
+    outcome = _outcome()
+    assert serializer.decode(serializer.encode(outcome)) == Ok(outcome)
+
+
+@pytest.mark.parametrize("serializer", [JsonSerializer(), BinarySerializer(["bare"])])
+def test_round_trip_without_optional_parts(serializer: OutcomeSerializer):
+    outcome = ProbeOutcome("bare", HttpResult(404, 7), None)
+    assert serializer.decode(serializer.encode(outcome)) == Ok(outcome)
+
+
+@pytest.mark.parametrize("serializer", [JsonSerializer(), BinarySerializer(["bare"])])
+@pytest.mark.parametrize("result", [
+    HttpResult(200, 7, body_bytes=512),
+    HttpResult(200, 7, body_bytes=65_536, body_truncated=True, assertions_ok=True),
+    HttpResult(200, 7, body_bytes=80, assertions_ok=False, assertion_error="JSON key 'status' not found"),
+    HttpResult(200, 7, http_version="HTTP/2"),
+    HttpResult(200, 7, body_bytes=2, http_version="HTTP/1.1"),
+    HttpResult(200, 7, attempts=(Attempt(0.0, 1000.5, "timeout"), Attempt(1000.5, 40.25, "cancelled"),
+                                 Attempt(1012.0, 7.0, "response", hedge=True))),
+])
+def test_round_trip_with_body_checks(serializer: OutcomeSerializer, result: HttpResult):
+    outcome = ProbeOutcome("bare", result, None)
+    assert serializer.decode(serializer.encode(outcome)) == Ok(outcome)
+
+
+def test_binary_is_much_smaller_than_json():
+    outcome = _outcome()
+    assert len(BinarySerializer().encode(outcome)) * 3 < len(JsonSerializer().encode(outcome))
+
+
+def test_binary_unknown_probe_id_decodes_to_hex():
+    data = BinarySerializer().encode(_outcome("not-configured"))
+
+    match BinarySerializer().decode(data):
+        case Ok(outcome):
+            assert outcome.probe_name == f"{probe_id('not-configured'):016x}"
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_binary_rejects_other_schema_versions():
+    data = bytearray(BinarySerializer().encode(_outcome()))
+    data[0] = BINARY_SCHEMA_VERSION + 1
+
+    match BinarySerializer().decode(bytes(data)):
+        case Err(e):
+            assert "version" in e
+        case Ok(_):
+            pytest.fail("Expected Failure for an unknown schema version")
+
+
+def test_binary_rejects_truncated_messages():
+    data = BinarySerializer().encode(_outcome())
+    assert isinstance(BinarySerializer().decode(data[:-3]), Err)
+
+
+@pytest.mark.parametrize("serializer", [JsonSerializer(), BinarySerializer(["beat"])])
+def test_heartbeat_round_trip(serializer: OutcomeSerializer):
+    heartbeat = ProbeOutcome("beat", HttpResult(200, 31), None, heartbeat=True)
+    data = serializer.encode(heartbeat)
+
+    assert serializer.decode(data) == Ok(heartbeat)
+    assert len(data) < len(serializer.encode(_outcome("beat")))
+
+
+def test_summary_round_trip():
+    summary = LatencySummary("checkout", 0.0, 60.0, 10, 9, 40.0, 80.0, 95.5, 30.0, 99.0, 45.25, {"count": 10})
+    assert decode_summary(encode_summary(summary)) == Ok(summary)
+    assert isinstance(decode_summary(b'{"probeName": "x"}'), Err)
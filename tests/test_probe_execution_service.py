@@ -2,11 +2,14 @@ import asyncio
 from typing import cast
 from unittest.mock import AsyncMock, Mock
 
+from src.adaptive_cadence import AdaptiveCadence
 from src.common.logging import Logger
+from src.common.metrics import MetricsRegistry
 from src.infra.publisher_protocol import Publisher
 from src.infra.requestor import Requestor
 from src.probe_execution_service import ProbeExecutionService
 from src.domain import (
+    AdaptivePolicy,
     Probe,
     HttpResult,
     CertInfo,
@@ -35,7 +38,7 @@ def test_execute_happy_path_with_ssl_check():
     logger = cast(Logger, Mock())
 
     requestor.get_response = AsyncMock(return_value=Ok(_make_http_result(200)))
-    requestor.get_cert_info = Mock(return_value=Ok(_make_cert_info()))
+    requestor.get_cert_info = AsyncMock(return_value=Ok(_make_cert_info()))
 
     svc = ProbeExecutionService(publisher, requestor, logger)
 
@@ -43,8 +46,8 @@ def test_execute_happy_path_with_ssl_check():
     asyncio.run(svc.execute(probe))
 
     # Assert
-    requestor.get_response.assert_awaited_once_with(probe.url)
-    requestor.get_cert_info.assert_called_once_with(probe.url)
+    requestor.get_response.assert_awaited_once_with(probe)
+    requestor.get_cert_info.assert_awaited_once_with(probe.url, None)
 
     assert cast(AsyncMock, publisher.publish).await_count == 1
 
@@ -63,7 +66,7 @@ def test_execute_no_ssl_check():
     logger = cast(Logger, Mock())
 
     requestor.get_response = AsyncMock(return_value=Ok(_make_http_result(200)))
-    requestor.get_cert_info = Mock()
+    requestor.get_cert_info = AsyncMock()
 
     svc = ProbeExecutionService(publisher, requestor, logger)
 
@@ -71,8 +74,8 @@ def test_execute_no_ssl_check():
     asyncio.run(svc.execute(probe))
 
     # Assert
-    requestor.get_response.assert_awaited_once_with(probe.url)
-    requestor.get_cert_info.assert_not_called()
+    requestor.get_response.assert_awaited_once_with(probe)
+    requestor.get_cert_info.assert_not_awaited()
     assert cast(AsyncMock, publisher.publish).await_count == 1
 
 
@@ -85,7 +88,7 @@ def test_execute_response_err_stops_processing():
     logger = cast(Logger, Mock())
 
     requestor.get_response = AsyncMock(return_value=Err("network error"))
-    requestor.get_cert_info = Mock()
+    requestor.get_cert_info = AsyncMock()
 
     svc = ProbeExecutionService(publisher, requestor, logger)
 
@@ -93,8 +96,8 @@ def test_execute_response_err_stops_processing():
     asyncio.run(svc.execute(probe))
 
     # Assert: cert_info should not be called and publish should not be awaited
-    requestor.get_response.assert_awaited_once_with(probe.url)
-    requestor.get_cert_info.assert_not_called()
+    requestor.get_response.assert_awaited_once_with(probe)
+    requestor.get_cert_info.assert_not_awaited()
     assert cast(AsyncMock, publisher.publish).await_count == 0
 
 
@@ -107,7 +110,7 @@ def test_execute_cert_err_stops_processing():
     logger = cast(Logger, Mock())
 
     requestor.get_response = AsyncMock(return_value=Ok(_make_http_result(200)))
-    requestor.get_cert_info = Mock(return_value=Err("cert error"))
+    requestor.get_cert_info = AsyncMock(return_value=Err("cert error"))
 
     svc = ProbeExecutionService(publisher, requestor, logger)
 
@@ -115,6 +118,123 @@ def test_execute_cert_err_stops_processing():
     asyncio.run(svc.execute(probe))
 
     # Assert
-    requestor.get_response.assert_awaited_once_with(probe.url)
-    requestor.get_cert_info.assert_called_once_with(probe.url)
+    requestor.get_response.assert_awaited_once_with(probe)
+    requestor.get_cert_info.assert_awaited_once_with(probe.url, None)
     assert cast(AsyncMock, publisher.publish).await_count == 0
+
+
+def test_execute_fetches_cert_after_response():
+    # Arrange: cert info must be requested once the response's TLS session exists
+    probe = Probe(name="p5", url="https://reuse.example", schedule="0 0 * * *", checkCert=True)
+
+    publisher = cast(Publisher, AsyncMock())
+    requestor = cast(Requestor, Mock())
+    logger = cast(Logger, Mock())
+
+    calls: list[str] = []
+
+    async def get_response(_: Probe):
+        calls.append("response")
+        return Ok(_make_http_result(200))
+
+    async def get_cert_info(_: str, __: float | None):
+        calls.append("cert")
+        return Ok(_make_cert_info())
+
+    requestor.get_response = AsyncMock(side_effect=get_response)
+    requestor.get_cert_info = AsyncMock(side_effect=get_cert_info)
+
+    # Act
+    asyncio.run(ProbeExecutionService(publisher, requestor, logger).execute(probe))
+
+    # Assert
+    assert calls == ["response", "cert"]
+    assert cast(AsyncMock, publisher.publish).await_count == 1
+
+
+def test_execute_logs_publish_failure():
+    probe = Probe(name="p6", url="https://example.com", schedule="0 0 * * *", checkCert=False)
+
+    publisher = cast(Publisher, AsyncMock())
+    requestor = cast(Requestor, Mock())
+    logger = cast(Logger, Mock())
+
+    requestor.get_response = AsyncMock(return_value=Ok(_make_http_result(200)))
+    cast(AsyncMock, publisher.publish).return_value = Err("broker down")
+
+    svc = ProbeExecutionService(publisher, requestor, logger)
+
+    asyncio.run(svc.execute(probe))
+
+    cast(Mock, logger.error).assert_called_once()
+    assert cast(Mock, logger.error).call_args.kwargs["error"] == "broker down"
+
+
+def test_execute_feeds_aggregator_and_can_skip_raw_events():
+    probe = Probe(name="p7", url="https://example.com", schedule="0 0 * * *", checkCert=False)
+
+    publisher = cast(Publisher, AsyncMock())
+    requestor = cast(Requestor, Mock())
+    aggregator = Mock()
+
+    requestor.get_response = AsyncMock(side_effect=[Ok(_make_http_result(200)), Err("refused")])
+
+    svc = ProbeExecutionService(publisher, requestor, cast(Logger, Mock()), aggregator, publish_raw=False)
+
+    asyncio.run(svc.execute(probe))
+    asyncio.run(svc.execute(probe))
+
+    assert [c.args for c in aggregator.record.call_args_list] == [("p7", _make_http_result(200)), ("p7", None)]
+    assert cast(AsyncMock, publisher.publish).await_count == 0
+
+
+def test_run_outcomes_are_counted():
+    registry = MetricsRegistry()
+    requestor = cast(Requestor, Mock())
+    requestor.get_response = AsyncMock(side_effect=[Ok(_make_http_result(200)), Err("timeout")])
+    publisher = cast(Publisher, AsyncMock())
+    publisher.publish = AsyncMock(return_value=Ok(None))
+    svc = ProbeExecutionService(publisher, requestor, cast(Logger, Mock()), metrics=registry)
+    probe = Probe(name="p", url="https://example.com", schedule="0 0 * * *", checkCert=False)
+
+    asyncio.run(svc.execute(probe))
+    asyncio.run(svc.execute(probe))
+
+    text = registry.render()
+    assert 'ping_monkey_probe_runs_total{outcome="published"} 1' in text
+    assert 'ping_monkey_probe_runs_total{outcome="request_error"} 1' in text
+    assert "ping_monkey_probe_run_duration_seconds_count 2" in text
+
+
+def test_execute_records_outcomes_for_adaptive_probes():
+    probe = Probe(name="p1", url="https://example.com", schedule="* * * * *", adaptive=AdaptivePolicy(backoff_after=1))
+    requestor = cast(Requestor, Mock())
+    requestor.get_response = AsyncMock(return_value=Err("connection refused"))
+    logger = cast(Logger, Mock())
+    cadence = AdaptiveCadence()
+    svc = ProbeExecutionService(cast(Publisher, AsyncMock()), requestor, logger, cadence=cadence)
+
+    asyncio.run(svc.execute(probe))
+    assert cadence.interval(probe, 60.0) == 120.0
+
+    asyncio.run(svc.execute(probe))
+
+    # The error log carries the interval the scheduler settled on after the previous run.
+    assert cast(Mock, logger.error).call_args.kwargs["interval"] == 120.0
+
+
+def test_execute_publishes_and_warns_when_body_assertions_fail():
+    probe = Probe(name="p1", url="https://example.com", schedule="* * * * *")
+    result = HttpResult(status_code=200, elapsed_ms=5, body_bytes=12, assertions_ok=False,
+                        assertion_error="body does not contain 'ok'")
+    publisher = cast(Publisher, AsyncMock())
+    publisher.publish = AsyncMock(return_value=Ok(None))
+    requestor = cast(Requestor, Mock())
+    requestor.get_response = AsyncMock(return_value=Ok(result))
+    logger = cast(Logger, Mock())
+
+    asyncio.run(ProbeExecutionService(publisher, requestor, logger).execute(probe))
+
+    cast(AsyncMock, publisher.publish).assert_awaited_once_with("p1", result, None)
+    cast(Mock, logger.warning).assert_called_once_with(
+        "Body assertion failed for probe {probe}: {error}", probe="p1", error="body does not contain 'ok'")
@@ -0,0 +1,609 @@
+import asyncio
+import datetime
+import ssl
+import time
+from dataclasses import replace
+
+import httpx
+import pytest
+
+from src.infra.http_transport import RequestTrace
+from src.infra.requestor import HEDGE_SAMPLES, HttpRequestor, HttpRequestorConfig
+from src.common.result import Ok, Err
+from src.domain import BodyAssertion, HedgePolicy, Probe
+
+
+async def _black_hole_server() -> asyncio.Server:
+    # Accepts TCP connections but never answers the TLS ClientHello
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.read()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_get_cert_info_times_out_without_blocking_loop():
+    async def run() -> tuple[object, int]:
+        server = await _black_hole_server()
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            result = await requestor.get_cert_info(f"https://127.0.0.1:{port}", timeout=0.3)
+        finally:
+            ticker_task.cancel()
+            server.close()
+            await requestor.aclose()
+        return result, ticks
+
+    started = time.monotonic()
+    result, ticks = asyncio.run(run())
+
+    match result:
+        case Err(e):
+            assert "Timed out" in e
+        case Ok(_):
+            pytest.fail("Expected a timeout error")
+    assert time.monotonic() - started < 2
+    # The loop kept scheduling other coroutines while the handshake was pending
+    assert ticks >= 10
+
+
+def test_get_cert_info_connection_refused():
+    async def run() -> object:
+        server = await _black_hole_server()
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        requestor = HttpRequestor()
+        try:
+            return await requestor.get_cert_info(f"https://127.0.0.1:{port}", timeout=1)
+        finally:
+            await requestor.aclose()
+
+    match asyncio.run(run()):
+        case Err(e):
+            assert "Network/SSL error" in e
+        case Ok(_):
+            pytest.fail("Expected a connection error")
+
+
+_PEER_CERT = {
+    "subject": ((("commonName", "example.com"),),),
+    "issuer": ((("commonName", "Example CA"),),),
+    "notBefore": "Jan  1 00:00:00 2025 GMT",
+    "notAfter": "Jan  1 00:00:00 2026 GMT",
+}
+
+
+class _FakeSslObject:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def getpeercert(self) -> dict:
+        self.calls += 1
+        return _PEER_CERT
+
+
+class _FakeStream:
+    def __init__(self, ssl_object: _FakeSslObject) -> None:
+        self._ssl_object = ssl_object
+
+    def get_extra_info(self, info: str) -> object:
+        return self._ssl_object if info == "ssl_object" else None
+
+
+def test_peer_cert_of_negotiated_connection_is_reused_for_cert_info():
+    async def run() -> object:
+        requestor = HttpRequestor()
+        ssl_object = _FakeSslObject()
+        response = httpx.Response(200, extensions={"network_stream": _FakeStream(ssl_object)})
+        try:
+            requestor._remember_peer_cert("https://127.0.0.1:1/health", RequestTrace(capture_peer_cert=True), response)
+            # A second response on the same pooled connection does not re-read the certificate
+            requestor._remember_peer_cert("https://127.0.0.1:1/other", RequestTrace(capture_peer_cert=True), response)
+            assert ssl_object.calls == 1
+            # Port 1 refuses connections, so only the cache can answer
+            return await requestor.get_cert_info("https://127.0.0.1:1", timeout=1)
+        finally:
+            await requestor.aclose()
+
+    match asyncio.run(run()):
+        case Ok(cert_info):
+            assert cert_info.subject_cn == "example.com"
+            assert cert_info.issuer_cn == "Example CA"
+        case Err(e):
+            pytest.fail(f"Expected cached certificate but got Failure: {e}")
+
+
+def test_new_handshake_refreshes_cached_cert():
+    async def run() -> _FakeSslObject:
+        requestor = HttpRequestor()
+        pooled = _FakeSslObject()
+        response = httpx.Response(200, extensions={"network_stream": _FakeStream(pooled)})
+        fresh = _FakeSslObject()
+        try:
+            requestor._remember_peer_cert("https://127.0.0.1:1", RequestTrace(capture_peer_cert=True), response)
+
+            trace = RequestTrace(capture_peer_cert=True)
+            await trace("connection.start_tls.complete", {"return_value": _FakeStream(fresh)})
+            requestor._remember_peer_cert("https://127.0.0.1:1", trace, response)
+        finally:
+            await requestor.aclose()
+        return fresh
+
+    assert asyncio.run(run()).calls == 1
+
+
+async def _http_server(delay: float = 0.0) -> asyncio.Server:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while await reader.readuntil(b"\r\n\r\n"):
+            await asyncio.sleep(delay)
+            writer.write(b"HTTP/1.1 204 No Content\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _plain_probe(port: int, **kwargs: object) -> Probe:
+    return Probe(name="local", url=f"http://localhost:{port}/", schedule="* * * * *", checkCert=False,
+                 **kwargs)  # type: ignore[arg-type]
+
+
+def test_get_response_reports_phase_timings_and_reuses_connection():
+    async def run() -> list[object]:
+        server = await _http_server()
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        try:
+            return [await requestor.get_response(_plain_probe(port)) for _ in range(2)]
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    first, second = asyncio.run(run())
+
+    match (first, second):
+        case (Ok(cold), Ok(warm)):
+            assert cold.status_code == 204
+            assert cold.timings.dns_ms is not None
+            assert cold.timings.connect_ms is not None
+            assert cold.timings.tls_ms is None
+            assert 0 < cold.timings.ttfb_ms <= cold.timings.total_ms
+            # The pooled connection is reused, so no connection phases are reported
+            assert warm.timings.dns_ms is None
+            assert warm.timings.connect_ms is None
+        case _:
+            pytest.fail(f"Expected two responses but got {first}, {second}")
+
+
+def test_elapsed_ms_keeps_whole_seconds():
+    async def run() -> object:
+        server = await _http_server(delay=1.05)
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        try:
+            return await requestor.get_response(_plain_probe(port))
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    match asyncio.run(run()):
+        case Ok(result):
+            assert result.elapsed_ms >= 1050
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+def test_fresh_connection_always_reports_connect_phase():
+    async def run() -> list[object]:
+        server = await _http_server()
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        try:
+            return [await requestor.get_response(_plain_probe(port, fresh_connection=True)) for _ in range(2)]
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    for result in asyncio.run(run()):
+        match result:
+            case Ok(r):
+                assert r.timings.connect_ms is not None
+            case Err(e):
+                pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+
+def test_fresh_connection_timings_exclude_client_construction(monkeypatch):
+    create_client = HttpRequestor._create_client
+
+    def slow_create_client(self, *args, **kwargs):
+        time.sleep(0.2)
+        return create_client(self, *args, **kwargs)
+
+    monkeypatch.setattr(HttpRequestor, "_create_client", slow_create_client)
+
+    async def run() -> object:
+        server = await _http_server()
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        try:
+            return await requestor.get_response(_plain_probe(port, fresh_connection=True))
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    match asyncio.run(run()):
+        case Ok(result):
+            assert result.elapsed_ms < 150
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+async def _body_server(body: bytes, methods: list[str], chunk_delay: float = 0.0) -> asyncio.Server:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while request := await reader.readuntil(b"\r\n\r\n"):
+                method = request.split(b" ", 1)[0].decode()
+                methods.append(method)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body))
+                if method != "HEAD":
+                    for i in range(0, len(body), 4096):
+                        writer.write(body[i:i + 4096])
+                        await writer.drain()
+                        await asyncio.sleep(chunk_delay)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _get(body: bytes, **kwargs: object) -> tuple[object, list[str]]:
+    methods: list[str] = []
+
+    async def run() -> object:
+        server = await _body_server(body, methods)
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        try:
+            return await requestor.get_response(_plain_probe(port, **kwargs))
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    return asyncio.run(run()), methods
+
+
+def test_head_probe_reads_no_body():
+    match _get(b"x" * 10_000, method="HEAD"):
+        case (Ok(result), methods):
+            assert methods == ["HEAD"]
+            assert result.status_code == 200
+            assert result.body_bytes is None
+        case other:
+            pytest.fail(f"Expected Success but got {other}")
+
+
+def test_body_read_stops_at_the_byte_limit():
+    match _get(b"x" * 1_000_000, max_body_bytes=10_000):
+        case (Ok(result), _):
+            assert result.body_bytes == 10_000
+            assert result.body_truncated
+            assert result.assertions_ok is None
+        case other:
+            pytest.fail(f"Expected Success but got {other}")
+
+
+def test_passing_assertions_end_the_read_early():
+    body = b"status: healthy " + b"x" * 1_000_000
+    match _get(body, max_body_bytes=2_000_000, assertions=(BodyAssertion("contains", "healthy"),)):
+        case (Ok(result), _):
+            assert result.assertions_ok is True
+            assert result.body_bytes < len(body)
+            assert not result.body_truncated
+        case other:
+            pytest.fail(f"Expected Success but got {other}")
+
+
+def test_failed_assertions_are_reported_in_the_result():
+    body = b'{"status": {"db": "up"}, "version": "1.2.3"}'
+    match _get(body, assertions=(BodyAssertion("json_key", "status.db"), BodyAssertion("regex", r"version.*2\.\d"),
+                                 BodyAssertion("json_key", "status.cache"))):
+        case (Ok(result), _):
+            assert result.assertions_ok is False
+            assert result.assertion_error == "JSON key 'status.cache' not found"
+            assert result.body_bytes == len(body)
+        case other:
+            pytest.fail(f"Expected Success but got {other}")
+
+
+def test_short_rest_of_body_is_drained_so_the_connection_is_reused():
+    methods: list[str] = []
+
+    async def run() -> list[object]:
+        server = await _body_server(b"ok" + b"x" * 12_000, methods, chunk_delay=0.01)
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        probe = _plain_probe(port, assertions=(BodyAssertion("contains", "ok"),))
+        try:
+            return [await requestor.get_response(probe) for _ in range(2)]
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    match asyncio.run(run()):
+        case [Ok(_), Ok(warm)]:
+            assert warm.timings.connect_ms is None
+        case other:
+            pytest.fail(f"Expected two responses but got {other}")
+
+
+def _self_signed_cert(tmp_path) -> tuple[str, str]:
+    pytest.importorskip("cryptography")
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(now + datetime.timedelta(days=1))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+            .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+            .sign(key, hashes.SHA256()))
+    cert_file, key_file = tmp_path / "cert.pem", tmp_path / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                           serialization.NoEncryption()))
+    return str(cert_file), str(key_file)
+
+
+class _H2Server:
+    """Answers every stream with 200 after ``delay``, counting connections and open streams."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+        from h2.events import RequestReceived
+
+        self.connections += 1
+        conn = H2Connection(H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def respond(stream_id: int) -> None:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(self.delay)
+            self.in_flight -= 1
+            conn.send_headers(stream_id, [(":status", "200"), ("content-length", "2")])
+            conn.send_data(stream_id, b"ok", end_stream=True)
+            writer.write(conn.data_to_send())
+
+        tasks = set()
+        while data := await reader.read(65_536):
+            for event in conn.receive_data(data):
+                if isinstance(event, RequestReceived):
+                    task = asyncio.create_task(respond(event.stream_id))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            writer.write(conn.data_to_send())
+        writer.close()
+
+
+def test_http2_probes_share_one_connection_under_the_stream_cap(tmp_path, monkeypatch):
+    pytest.importorskip("h2")
+    cert_file, key_file = _self_signed_cert(tmp_path)
+    monkeypatch.setenv("SSL_CERT_FILE", cert_file)
+    h2_server = _H2Server(delay=0.05)
+
+    async def run() -> list[object]:
+        tls = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        tls.load_cert_chain(cert_file, key_file)
+        tls.set_alpn_protocols(["h2", "http/1.1"])
+        server = await asyncio.start_server(h2_server.handle, "127.0.0.1", 0, ssl=tls)
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor(HttpRequestorConfig(max_concurrent_streams=2))
+        probe = Probe(name="h2", url=f"https://localhost:{port}/", schedule="* * * * *", checkCert=False,
+                      http2=True)
+        try:
+            return list(await asyncio.gather(*(requestor.get_response(probe) for _ in range(6))))
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    results = asyncio.run(run())
+
+    for result in results:
+        match result:
+            case Ok(r):
+                assert r.http_version == "HTTP/2"
+                assert r.body_bytes == 2
+            case Err(e):
+                pytest.fail(f"Expected Success but got Failure: {e}")
+    assert h2_server.connections == 1
+    assert h2_server.max_in_flight == 2
+    # Waiting for a stream slot is not counted as request time.
+    assert all(r.value.elapsed_ms < 150 for r in results if isinstance(r, Ok))
+
+
+def test_plain_http_probes_report_http_1_1():
+    match _get(b"ok"):
+        case (Ok(result), _):
+            assert result.http_version == "HTTP/1.1"
+        case other:
+            pytest.fail(f"Expected Success but got {other}")
+
+
+async def _stalling_server(stalled: set[int], closed: list[int]) -> asyncio.Server:
+    """Answers 204 except to the requests numbered in ``stalled``, whose connections it holds open."""
+    requests = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal requests
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                requests += 1
+                if requests in stalled:
+                    number = requests
+                    await reader.read()
+                    closed.append(number)
+                    return
+                writer.write(b"HTTP/1.1 204 No Content\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _run_probes(stalled: set[int], runs: int, **kwargs: object) -> tuple[list[object], list[int], float]:
+    closed: list[int] = []
+
+    async def run() -> tuple[list[object], float]:
+        server = await _stalling_server(stalled, closed)
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        began = time.perf_counter()
+        try:
+            results = [await requestor.get_response(_plain_probe(port, **kwargs)) for _ in range(runs)]
+            elapsed = time.perf_counter() - began
+            await asyncio.sleep(0.05)
+            return results, elapsed
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    results, elapsed = asyncio.run(run())
+    return results, closed, elapsed
+
+
+def test_attempt_that_times_out_is_retried():
+    match _run_probes({1}, 1, timeout=0.2, retries=1):
+        case ([Ok(result)], _, _):
+            assert result.status_code == 204
+            assert [a.outcome for a in result.attempts] == ["timeout", "response"]
+            assert result.attempts[0].elapsed_ms >= 200
+            assert result.attempts[1].started_ms >= result.attempts[0].elapsed_ms
+        case other:
+            pytest.fail(f"Expected Success but got {other}")
+
+
+def test_single_attempt_lists_no_attempts():
+    match _run_probes(set(), 1, timeout=0.2, retries=1):
+        case ([Ok(result)], _, _):
+            assert result.attempts == ()
+        case other:
+            pytest.fail(f"Expected Success but got {other}")
+
+
+def test_deadline_ends_the_retries():
+    match _run_probes({1, 2, 3, 4, 5, 6}, 1, timeout=0.2, retries=5, deadline=0.5):
+        case ([Err(error)], _, elapsed):
+            assert elapsed < 0.7
+            # Two full attempts, and a third cut short by the deadline.
+            assert error.startswith("Timed out after 0.1s (attempts: timeout after 20")
+            assert error.count("timeout after") == 3
+        case other:
+            pytest.fail(f"Expected Failure but got {other}")
+
+
+def test_hedge_wins_over_a_stalled_request_which_is_cancelled():
+    # The first run teaches the percentile; the second run's request stalls and is hedged.
+    match _run_probes({2}, 2, timeout=2.0, hedge=HedgePolicy(min_samples=1)):
+        case ([Ok(first), Ok(hedged)], closed, elapsed):
+            assert first.attempts == ()
+            assert [(a.outcome, a.hedge) for a in hedged.attempts] == [("cancelled", False), ("response", True)]
+            assert elapsed < 1.0
+            # The stalled request's connection was closed when it lost.
+            assert closed == [2]
+        case other:
+            pytest.fail(f"Expected two responses but got {other}")
+
+
+def test_connection_errors_surface_as_httpx_errors():
+    async def run() -> object:
+        requestor = HttpRequestor()
+        try:
+            return await requestor.get_response(_plain_probe(1))
+        finally:
+            await requestor.aclose()
+
+    match asyncio.run(run()):
+        case Err(error):
+            assert error.startswith("HTTP error: ")
+        case other:
+            pytest.fail(f"Expected Failure but got {other}")
+
+
+def test_deadline_bounds_the_wait_for_an_http2_stream_slot(tmp_path, monkeypatch):
+    pytest.importorskip("h2")
+    cert_file, key_file = _self_signed_cert(tmp_path)
+    monkeypatch.setenv("SSL_CERT_FILE", cert_file)
+    h2_server = _H2Server(delay=0.5)
+
+    async def run() -> tuple[object, float]:
+        tls = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        tls.load_cert_chain(cert_file, key_file)
+        tls.set_alpn_protocols(["h2", "http/1.1"])
+        server = await asyncio.start_server(h2_server.handle, "127.0.0.1", 0, ssl=tls)
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor(HttpRequestorConfig(max_concurrent_streams=1))
+        probe = Probe(name="h2", url=f"https://localhost:{port}/", schedule="* * * * *", checkCert=False,
+                      http2=True)
+        try:
+            holder = asyncio.create_task(requestor.get_response(probe))
+            await asyncio.sleep(0.05)
+            began = time.perf_counter()
+            queued = await requestor.get_response(replace(probe, deadline=0.2))
+            elapsed = time.perf_counter() - began
+            await holder
+            return queued, elapsed
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    match asyncio.run(run()):
+        case (Err(error), elapsed):
+            assert error == "Deadline passed waiting for an HTTP/2 stream slot"
+            assert elapsed < 0.35
+        case other:
+            pytest.fail(f"Expected Failure but got {other}")
+
+
+def test_hedge_history_keeps_only_recent_responses():
+    async def run() -> HttpRequestor:
+        server = await _http_server()
+        port = server.sockets[0].getsockname()[1]
+        requestor = HttpRequestor()
+        probe = _plain_probe(port, hedge=HedgePolicy())
+        try:
+            for _ in range(HEDGE_SAMPLES + 50):
+                await requestor.get_response(probe)
+            return requestor
+        finally:
+            await requestor.aclose()
+            server.close()
+
+    samples = asyncio.run(run())._latencies.get("local")
+    assert samples is not None and len(samples) == HEDGE_SAMPLES
@@ -0,0 +1,384 @@
+import asyncio
+from dataclasses import replace
+from typing import cast
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.adaptive_cadence import AdaptiveCadence
+from src.common.logging import Logger
+from src.common.metrics import MetricsRegistry
+from src.domain import AdaptivePolicy, HttpResult, Probe
+from src.scheduler import Scheduler, SchedulerConfig
+
+PERIOD = 0.05
+
+
+def _probe(name: str) -> Probe:
+    return Probe(name=name, url=f"https://{name}.example", schedule="* * * * *")
+
+
+def _every_period(_: Probe, after: float) -> float:
+    return after + PERIOD
+
+
+def test_probe_is_not_run_at_startup_and_then_runs_every_period():
+    runs: list[str] = []
+
+    async def execute(probe: Probe) -> None:
+        runs.append(probe.name)
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), next_fire=_every_period)
+        scheduler.add(_probe("a"))
+        task = asyncio.create_task(scheduler.run(stop))
+
+        await asyncio.sleep(PERIOD / 2)
+        assert runs == []
+
+        await asyncio.sleep(PERIOD * 4)
+        stop.set()
+        await task
+
+    asyncio.run(run())
+
+    assert 3 <= len(runs) <= 5
+
+
+def test_worker_pool_bounds_concurrent_executions():
+    peak = 0
+    in_flight = 0
+
+    async def execute(_: Probe) -> None:
+        nonlocal peak, in_flight
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(PERIOD * 2)
+        in_flight -= 1
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), SchedulerConfig(max_workers=2),
+                              next_fire=_every_period)
+        for i in range(6):
+            scheduler.add(_probe(f"p{i}"))
+        task = asyncio.create_task(scheduler.run(stop))
+
+        await asyncio.sleep(PERIOD * 1.5)
+        stats = scheduler.stats()
+        assert stats.in_flight == 2
+        assert stats.queued == 4
+
+        stop.set()
+        await task
+
+    asyncio.run(run())
+
+    assert peak == 2
+
+
+def test_overlapping_run_is_skipped_and_in_flight_run_finishes_on_stop():
+    finished: list[str] = []
+
+    async def execute(probe: Probe) -> None:
+        await asyncio.sleep(PERIOD * 3)
+        finished.append(probe.name)
+
+    async def run() -> Scheduler:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), next_fire=_every_period)
+        scheduler.add(_probe("slow"))
+        task = asyncio.create_task(scheduler.run(stop))
+
+        await asyncio.sleep(PERIOD * 2.5)
+        stop.set()
+        await task
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    stats = scheduler.stats()
+
+    assert finished == ["slow"]
+    assert stats.dispatched == 1
+    assert stats.skipped >= 1
+    assert stats.in_flight == 0
+
+
+def test_removed_probe_is_not_dispatched():
+    runs: list[str] = []
+
+    async def execute(probe: Probe) -> None:
+        runs.append(probe.name)
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), next_fire=_every_period)
+        scheduler.add(_probe("kept"))
+        scheduler.add(_probe("removed"))
+        scheduler.remove("removed")
+        task = asyncio.create_task(scheduler.run(stop))
+
+        await asyncio.sleep(PERIOD * 2.5)
+        stop.set()
+        await task
+
+    asyncio.run(run())
+
+    assert runs and set(runs) == {"kept"}
+
+
+def test_failing_execution_does_not_kill_worker():
+    runs = 0
+
+    async def execute(_: Probe) -> None:
+        nonlocal runs
+        runs += 1
+        raise RuntimeError("boom")
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        logger = Mock()
+        scheduler = Scheduler(execute, cast(Logger, logger), SchedulerConfig(max_workers=1),
+                              next_fire=_every_period)
+        scheduler.add(_probe("a"))
+        task = asyncio.create_task(scheduler.run(stop))
+
+        await asyncio.sleep(PERIOD * 3.5)
+        stop.set()
+        await task
+        assert logger.error.call_count == runs
+
+    asyncio.run(run())
+
+    assert runs >= 2
+
+
+def _minute_grid(_: Probe, after: float) -> float:
+    return (after // 60 + 1) * 60
+
+
+def _drain(scheduler: Scheduler) -> None:
+    # Completes every queued run immediately
+    while (job := scheduler._queue.get_nowait()) is not None:
+        job.entry.pending = False
+        scheduler._queue.release(job.entry.host)
+
+
+def _first_fires(scheduler: Scheduler, count: int) -> list[float]:
+    # Drives _dispatch_due by hand with a clock pinned just past each fire
+    fires: list[float] = []
+    for _ in range(count):
+        due = scheduler._heap[0][0]
+        fires.append(due)
+        scheduler._clock = lambda: due
+        scheduler._dispatch_due()
+        _drain(scheduler)
+    return fires
+
+
+def test_spread_offset_is_stable_and_keeps_period():
+    def build() -> Scheduler:
+        scheduler = Scheduler(AsyncMock(), cast(Logger, Mock()), SchedulerConfig(spread=True),
+                              next_fire=_minute_grid, clock=lambda: 1_000_000.0)
+        scheduler.add(_probe("spread-me"))
+        return scheduler
+
+    fires = _first_fires(build(), 3)
+
+    assert fires == _first_fires(build(), 3)
+    assert fires[1] - fires[0] == 60
+    assert fires[2] - fires[1] == 60
+    assert fires[0] % 60 != 0
+
+
+def test_per_probe_jitter_bounds_offset_without_global_spread():
+    scheduler = Scheduler(AsyncMock(), cast(Logger, Mock()), next_fire=_minute_grid, clock=lambda: 1_000_000.0)
+    for i in range(200):
+        scheduler.add(Probe(name=f"j{i}", url="https://j.example", schedule="* * * * *", jitter=5))
+    scheduler.add(_probe("no-jitter"))
+
+    offsets = {e.probe.name: e.offset for e in scheduler._entries.values()}
+
+    assert offsets["no-jitter"] == 0
+    assert all(0 <= o < 5 for name, o in offsets.items() if name != "no-jitter")
+    assert len({round(o, 3) for o in offsets.values()}) > 150
+
+
+def test_spread_flattens_dispatch_rate():
+    def peak_rate(spread: bool) -> int:
+        now = 1_000_000.0
+        scheduler = Scheduler(AsyncMock(), cast(Logger, Mock()), SchedulerConfig(spread=spread),
+                              next_fire=_minute_grid, clock=lambda: now)
+        for i in range(600):
+            scheduler.add(_probe(f"p{i}"))
+
+        # Step through one full period a second at a time
+        for second in range(1, 61):
+            now = 1_000_000.0 + second
+            scheduler._dispatch_due()
+            _drain(scheduler)
+
+        assert scheduler.stats().dispatched == 600
+        return scheduler.stats().dispatch_rate_peak
+
+    assert peak_rate(spread=False) == 600
+    assert peak_rate(spread=True) < 30
+
+
+def test_per_host_cap_limits_concurrency_against_one_host():
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def execute(probe: Probe) -> None:
+        host = probe.url.split("/")[2]
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(PERIOD)
+        active[host] -= 1
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), SchedulerConfig(max_workers=10, max_per_host=2),
+                              next_fire=_every_period)
+        for i in range(6):
+            scheduler.add(Probe(name=f"shared{i}", url=f"https://shared.example/route{i}", schedule="* * * * *"))
+        scheduler.add(Probe(name="other", url="https://other.example/", schedule="* * * * *"))
+        task = asyncio.create_task(scheduler.run(stop))
+
+        await asyncio.sleep(PERIOD * 1.5)
+        assert scheduler.stats().waiting_on_host == 4
+
+        stop.set()
+        await task
+
+    asyncio.run(run())
+
+    assert peak == {"shared.example": 2, "other.example": 1}
+
+
+def test_higher_priority_and_more_overdue_jobs_go_first():
+    order: list[str] = []
+    now = 1_000_000.0
+    scheduler = Scheduler(AsyncMock(), cast(Logger, Mock()), SchedulerConfig(max_workers=1),
+                          next_fire=lambda p, after: after + 1 + p.priority * 0.1, clock=lambda: now)
+    scheduler.add(Probe(name="normal", url="https://a.example", schedule="* * * * *"))
+    scheduler.add(Probe(name="critical", url="https://b.example", schedule="* * * * *", priority=10))
+    scheduler.add(Probe(name="low", url="https://c.example", schedule="* * * * *", priority=-1))
+
+    now += 5
+    scheduler._dispatch_due()
+    while (job := scheduler._queue.get_nowait()) is not None:
+        order.append(job.entry.probe.name)
+        scheduler._queue.release(job.entry.host)
+
+    # "low" fell due first, but priority outranks lateness
+    assert order == ["critical", "normal", "low"]
+
+
+def test_runs_are_recorded_in_metrics():
+    registry = MetricsRegistry()
+
+    async def execute(_: Probe) -> None:
+        pass
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), next_fire=_every_period, metrics=registry)
+        scheduler.add(_probe("a"))
+        task = asyncio.create_task(scheduler.run(stop))
+        await asyncio.sleep(PERIOD * 2.5)
+        stop.set()
+        await task
+
+    asyncio.run(run())
+
+    text = registry.render()
+    assert "ping_monkey_scheduler_dispatched_total 2" in text
+    assert "ping_monkey_scheduler_lag_seconds_count 2" in text
+    assert "ping_monkey_scheduler_probes 1" in text
+
+
+def test_adaptive_probe_is_rescheduled_after_its_run_instead_of_skipped():
+    runs: list[float] = []
+
+    async def execute(_: Probe) -> None:
+        runs.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(PERIOD * 1.5)
+
+    async def run() -> Scheduler:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), next_fire=_every_period, cadence=AdaptiveCadence())
+        scheduler.add(replace(_probe("slow"), adaptive=AdaptivePolicy()))
+        task = asyncio.create_task(scheduler.run(stop))
+        await asyncio.sleep(PERIOD * 6)
+        stop.set()
+        await task
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert scheduler.stats().skipped == 0
+    assert len(runs) >= 2
+    # Each run starts one period after the previous one finished.
+    assert all(b - a >= PERIOD * 2.4 for a, b in zip(runs, runs[1:]))
+
+
+def test_failure_to_adapt_keeps_the_probe_on_its_regular_schedule():
+    runs: list[str] = []
+
+    async def execute(probe: Probe) -> None:
+        runs.append(probe.name)
+
+    cadence = AdaptiveCadence()
+    cadence.interval = Mock(side_effect=OverflowError("boom"))  # type: ignore[method-assign]
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        scheduler = Scheduler(execute, cast(Logger, Mock()), SchedulerConfig(max_workers=1), next_fire=_every_period,
+                              cadence=cadence)
+        scheduler.add(replace(_probe("a"), adaptive=AdaptivePolicy()))
+        scheduler.add(_probe("b"))
+        task = asyncio.create_task(scheduler.run(stop))
+        await asyncio.sleep(PERIOD * 6)
+        stop.set()
+        await task
+
+    asyncio.run(run())
+
+    # The single worker survives, and both probes keep running.
+    assert runs.count("a") >= 3
+    assert runs.count("b") >= 3
+
+
+def test_adaptive_next_fire_follows_the_cadence():
+    now = 1_000_000.0
+    cadence = AdaptiveCadence()
+    scheduler = Scheduler(AsyncMock(), cast(Logger, Mock()), next_fire=_minute_grid, clock=lambda: now,
+                          cadence=cadence)
+    probe = replace(_probe("a"), adaptive=AdaptivePolicy(backoff_after=1, escalate_interval=10.0))
+    scheduler.add(probe)
+    entry = scheduler._entries["a"]
+
+    assert scheduler._next_adaptive_fire(entry, now) == 1_000_020.0
+
+    cadence.record(probe, HttpResult(200, 10))
+    cadence.record(probe, HttpResult(503, 10))
+    assert scheduler._next_adaptive_fire(entry, now) == now + 10
+
+    for _ in range(3):
+        cadence.record(probe, None)
+    # Backed off to 8 periods, landing on the minute grid.
+    assert scheduler._next_adaptive_fire(entry, now) == 1_000_020.0 + 7 * 60
+
+
+def test_unschedulable_probe_leaves_the_running_one_in_place():
+    scheduler = Scheduler(AsyncMock(), cast(Logger, Mock()))
+    running = _probe("a")
+    scheduler.add(running)
+
+    with pytest.raises(Exception):
+        scheduler.add(replace(running, schedule="not a cron"))
+
+    assert scheduler._entries["a"].probe == running
+    assert not scheduler._entries["a"].removed
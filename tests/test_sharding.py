@@ -0,0 +1,55 @@
+import pytest
+
+from src.common.result import Err, Ok
+from src.common.sharding import ShardConfig, apply_env, select_shard, shard_of
+from src.domain import Probe
+
+NAMES = [f"service-{i}-health" for i in range(5_000)]
+
+
+def test_shard_of_is_deterministic_and_in_range():
+    assert [shard_of(n, 7) for n in NAMES[:100]] == [shard_of(n, 7) for n in NAMES[:100]]
+    assert all(0 <= shard_of(n, 7) < 7 for n in NAMES)
+    assert all(shard_of(n, 1) == 0 for n in NAMES[:100])
+
+
+def test_probes_are_spread_evenly():
+    counts = [0] * 4
+    for name in NAMES:
+        counts[shard_of(name, 4)] += 1
+    assert all(abs(c - len(NAMES) / 4) < len(NAMES) * 0.03 for c in counts)
+
+
+def test_adding_a_shard_only_moves_probes_onto_it():
+    moved = [n for n in NAMES if shard_of(n, 4) != shard_of(n, 5)]
+
+    assert all(shard_of(n, 5) == 4 for n in moved)
+    assert len(moved) == pytest.approx(len(NAMES) / 5, rel=0.1)
+
+
+def test_shards_partition_the_probes():
+    probes = [Probe(name=n, url="https://example.com", schedule="* * * * *") for n in NAMES[:500]]
+    slices = [select_shard(probes, ShardConfig(index=i, count=3)) for i in range(3)]
+
+    assert sorted(p.name for s in slices for p in s) == sorted(p.name for p in probes)
+
+
+def test_workers_of_all_instances_partition_the_probes():
+    probes = [Probe(name=n, url="https://example.com", schedule="* * * * *") for n in NAMES[:500]]
+    workers = [ShardConfig(index=i, count=2, workers=3).for_worker(w) for i in range(2) for w in range(3)]
+
+    assert ShardConfig(index=1, count=2, workers=3).for_worker(2) == ShardConfig(index=5, count=6)
+    assert sorted(p.name for shard in workers for p in select_shard(probes, shard)) == sorted(NAMES[:500])
+
+
+def test_apply_env_overrides_the_config():
+    match apply_env(ShardConfig(workers=2), {"SHARD_INDEX": "2", "SHARD_COUNT": "3"}):
+        case Ok(shard):
+            assert shard == ShardConfig(index=2, count=3, workers=2)
+        case Err(e):
+            pytest.fail(f"Expected Success but got Failure: {e}")
+
+
+@pytest.mark.parametrize("environ", [{"SHARD_INDEX": "3", "SHARD_COUNT": "3"}, {"SHARD_COUNT": "x"}])
+def test_apply_env_rejects_invalid_shards(environ):
+    assert isinstance(apply_env(ShardConfig(), environ), Err)
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from src.common.sketch import LatencySketch
+
+
+def _exact(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("q", [0.5, 0.95, 0.99])
+def test_quantiles_are_within_relative_accuracy(q: float):
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 0.8) for _ in range(20_000)]
+    sketch = LatencySketch(relative_accuracy=0.01, max_buckets=2048)
+    for v in values:
+        sketch.add(v)
+
+    assert sketch.quantile(q) == pytest.approx(_exact(values, q), rel=0.011)
+
+
+def test_bucket_count_is_capped_and_tail_stays_accurate():
+    rng = random.Random(3)
+    values = [rng.uniform(0.5, 30_000) for _ in range(50_000)]
+    sketch = LatencySketch(relative_accuracy=0.01, max_buckets=64)
+    for v in values:
+        sketch.add(v)
+
+    assert len(sketch.to_dict()["keys"]) == 64
+    assert sketch.quantile(0.99) == pytest.approx(_exact(values, 0.99), rel=0.011)
+    assert sketch.count == 50_000
+
+
+def test_merge_matches_a_single_sketch():
+    rng = random.Random(11)
+    first, second = [rng.expovariate(0.01) for _ in range(5_000)], [rng.expovariate(0.002) for _ in range(5_000)]
+    merged, combined, other = LatencySketch(), LatencySketch(), LatencySketch()
+    for v in first:
+        merged.add(v)
+        combined.add(v)
+    for v in second:
+        other.add(v)
+        combined.add(v)
+
+    merged.merge(other)
+
+    merged_dict, combined_dict = merged.to_dict(), combined.to_dict()
+    assert merged_dict.pop("sum") == pytest.approx(combined_dict.pop("sum"))
+    assert merged_dict == combined_dict
+
+
+def test_merge_rejects_other_accuracy():
+    with pytest.raises(ValueError):
+        LatencySketch(0.01).merge(LatencySketch(0.02))
+
+
+def test_dict_round_trip():
+    sketch = LatencySketch()
+    for v in (0.01, 3.0, 250.0, 1200.0):
+        sketch.add(v)
+
+    restored = LatencySketch.from_dict(sketch.to_dict())
+
+    assert restored.to_dict() == sketch.to_dict()
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+
+def test_empty_sketch():
+    sketch = LatencySketch()
+
+    assert sketch.quantile(0.99) == 0.0
+    assert sketch.mean() == 0.0
+    assert sketch.to_dict()["min"] is None
@@ -0,0 +1,264 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Sequence
+from unittest.mock import Mock
+
+from src.common.result import Err, Ok, Result
+from src.domain import CertInfo, HttpResult, HttpTimings, LatencySummary, ProbeOutcome
+from src.infra.spool import SegmentSpool, SpoolConfig, SpoolingPublisher
+
+
+class _StubPublisher:
+    def __init__(self) -> None:
+        self.failing = False
+        self.delay = 0.0
+        self.published: list[str] = []
+
+    async def publish(self, probe_name: str, result: HttpResult, cert_info: CertInfo | None) -> Result[None, str]:
+        return (await self.publish_many([ProbeOutcome(probe_name, result, cert_info)]))[0]
+
+    async def publish_many(self, outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            return [Err("broker down")] * len(outcomes)
+        self.published.extend(o.probe_name for o in outcomes)
+        return [Ok(None)] * len(outcomes)
+
+    async def publish_summaries(self, summaries: Sequence[LatencySummary]) -> Result[None, str]:
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            return Err("broker down")
+        self.published.extend(f"summary:{s.probe_name}" for s in summaries)
+        return Ok(None)
+
+
+def _cfg(tmp_path: Path, **kwargs: object) -> SpoolConfig:
+    return SpoolConfig(directory=str(tmp_path / "spool"), **kwargs)  # type: ignore[arg-type]
+
+
+def _result() -> HttpResult:
+    return HttpResult(200, 12, HttpTimings(dns_ms=None, connect_ms=None, tls_ms=None, ttfb_ms=10.0, total_ms=12.0))
+
+
+def test_records_are_read_in_order_and_survive_a_restart(tmp_path: Path):
+    spool = SegmentSpool(_cfg(tmp_path, segment_bytes=64))
+    for i in range(10):
+        spool.append(f"record-{i}".encode())
+
+    assert spool.peek(3) == [b"record-0", b"record-1", b"record-2"]
+    spool.commit(4)
+    assert spool.segments() > 1
+    spool.close()
+
+    reopened = SegmentSpool(_cfg(tmp_path, segment_bytes=64))
+    assert reopened.depth() == 6
+    assert reopened.peek(100) == [f"record-{i}".encode() for i in range(4, 10)]
+
+
+def test_consumed_segments_are_deleted(tmp_path: Path):
+    spool = SegmentSpool(_cfg(tmp_path, segment_bytes=64))
+    for i in range(10):
+        spool.append(f"record-{i}".encode())
+
+    spool.commit(10)
+
+    assert spool.depth() == 0
+    assert spool.depth_bytes() == 0
+    assert len(list((tmp_path / "spool").glob("*.seg"))) == 1
+
+
+def test_oldest_segments_are_evicted_beyond_max_bytes(tmp_path: Path):
+    spool = SegmentSpool(_cfg(tmp_path, segment_bytes=64, max_bytes=128))
+    for i in range(20):
+        spool.append(f"record-{i:02d}".encode())
+
+    assert spool.segments() == 2
+    assert spool.evicted + spool.depth() == 20
+    remaining = spool.peek(100)
+    assert remaining == [f"record-{i:02d}".encode() for i in range(20 - len(remaining), 20)]
+
+
+def test_commit_skips_records_evicted_since_peek(tmp_path: Path):
+    spool = SegmentSpool(_cfg(tmp_path, segment_bytes=64, max_bytes=128))
+    for i in range(4):
+        spool.append(f"record-{i:02d}".encode())
+
+    position = spool.position()
+    assert spool.peek(3) == [b"record-00", b"record-01", b"record-02"]
+    for i in range(4, 12):
+        spool.append(f"record-{i:02d}".encode())
+    evicted = spool.evicted
+    assert evicted
+    spool.commit(3, position)
+
+    assert spool.peek(100) == [f"record-{i:02d}".encode() for i in range(max(3, evicted), 12)]
+
+
+def test_torn_record_is_discarded_on_restart(tmp_path: Path):
+    spool = SegmentSpool(_cfg(tmp_path, segment_bytes=1024))
+    spool.append(b"complete")
+    spool.close()
+
+    segment = next((tmp_path / "spool").glob("*.seg"))
+    data = bytearray(segment.read_bytes())
+    data[16:24] = b"\x20\x00\x00\x00garb"  # header claiming 32 bytes with a bad checksum
+    segment.write_bytes(bytes(data))
+
+    reopened = SegmentSpool(_cfg(tmp_path, segment_bytes=1024))
+    reopened.append(b"next")
+    assert reopened.peek(10) == [b"complete", b"next"]
+
+
+def test_record_larger_than_a_segment_is_rejected(tmp_path: Path):
+    spool = SegmentSpool(_cfg(tmp_path, segment_bytes=64))
+
+    assert isinstance(spool.append(bytes(100)), Err)
+    assert spool.depth() == 0
+
+
+def test_failed_outcomes_are_spooled_and_replayed_in_order(tmp_path: Path):
+    cfg = _cfg(tmp_path, replay_batch_size=2)
+    stub = _StubPublisher()
+    publisher = SpoolingPublisher(stub, SegmentSpool(cfg), Mock(), cfg)
+
+    async def run() -> None:
+        stub.failing = True
+        for name in ("a", "b"):
+            assert isinstance(await publisher.publish(name, _result(), None), Ok)
+
+        stub.failing = False
+        # Queued behind the spooled outcomes instead of overtaking them
+        await publisher.publish("c", _result(), None)
+        assert stub.published == []
+        assert publisher.stats().depth == 3
+
+        assert await publisher.replay_batch()
+        assert await publisher.replay_batch()
+        await publisher.publish("d", _result(), None)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    assert stub.published == ["a", "b", "c", "d"]
+    stats = publisher.stats()
+    assert (stats.depth, stats.spooled, stats.replayed) == (0, 3, 3)
+    assert stats.replay_rate > 0
+
+
+def test_spool_io_runs_off_the_event_loop_thread(tmp_path: Path):
+    cfg = _cfg(tmp_path)
+    stub = _StubPublisher()
+    spool = SegmentSpool(cfg)
+    publisher = SpoolingPublisher(stub, spool, Mock(), cfg)
+    threads: set[str] = set()
+    for name in ("append", "peek", "commit", "close"):
+        method = getattr(spool, name)
+        setattr(spool, name, lambda *args, _method=method: threads.add(threading.current_thread().name) or _method(*args))
+
+    async def run() -> None:
+        stub.failing = True
+        for i in range(5):
+            await publisher.publish(f"p{i}", _result(), None)
+        stub.failing = False
+        assert await publisher.replay_batch()
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    assert stub.published == [f"p{i}" for i in range(5)]
+    assert threads and threading.main_thread().name not in threads
+
+
+def test_replay_stops_at_the_first_failure(tmp_path: Path):
+    cfg = _cfg(tmp_path)
+    stub = _StubPublisher()
+    publisher = SpoolingPublisher(stub, SegmentSpool(cfg), Mock(), cfg)
+
+    async def run() -> bool:
+        stub.failing = True
+        await publisher.publish("a", _result(), None)
+        replayed = await publisher.replay_batch()
+        await publisher.aclose()
+        return replayed
+
+    assert not asyncio.run(run())
+    assert publisher.stats().depth == 1
+
+
+def test_slow_publisher_is_spooled_after_the_timeout(tmp_path: Path):
+    cfg = _cfg(tmp_path, publish_timeout=0.01)
+    stub = _StubPublisher()
+    stub.delay = 1.0
+    publisher = SpoolingPublisher(stub, SegmentSpool(cfg), Mock(), cfg)
+
+    async def run() -> None:
+        assert isinstance(await publisher.publish("slow", _result(), None), Ok)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    assert publisher.stats().spooled == 1
+    assert SegmentSpool(cfg).depth() == 1
+
+
+def _summary(name: str) -> LatencySummary:
+    return LatencySummary(name, 0.0, 60.0, 2, 2, 10.0, 12.0, 12.0, 9.0, 12.0, 10.5, {"count": 2})
+
+
+def test_summaries_are_spooled_and_replayed_in_order_with_outcomes(tmp_path: Path):
+    cfg = _cfg(tmp_path)
+    stub = _StubPublisher()
+    publisher = SpoolingPublisher(stub, SegmentSpool(cfg), Mock(), cfg)
+
+    async def run() -> None:
+        stub.failing = True
+        await publisher.publish("a", _result(), None)
+        assert isinstance(await publisher.publish_summaries([_summary("a"), _summary("b")]), Ok)
+        assert publisher.stats().depth == 3
+
+        stub.failing = False
+        assert await publisher.replay_batch()
+        assert isinstance(await publisher.publish_summaries([_summary("c")]), Ok)
+        await publisher.aclose()
+
+    asyncio.run(run())
+
+    assert stub.published == ["a", "summary:a", "summary:b", "summary:c"]
+    assert publisher.stats().depth == 0
+
+
+def test_replay_does_not_skip_records_evicted_while_publishing(tmp_path: Path):
+    cfg = _cfg(tmp_path, segment_bytes=1024, max_bytes=2048, replay_batch_size=3)
+    inner = _StubPublisher()
+    publisher = SpoolingPublisher(inner, SegmentSpool(cfg), Mock(), cfg)
+
+    async def run() -> None:
+        inner.failing = True
+        n = 0
+        while publisher.stats().segments < 2:
+            await publisher.publish(f"p{n}", _result(), None)
+            n += 1
+        inner.failing = False
+
+        async def publish_many(outcomes: Sequence[ProbeOutcome]) -> list[Result[None, str]]:
+            # Outcomes keep queueing behind the spool until its head segment is evicted.
+            nonlocal n
+            while not publisher.stats().evicted:
+                await publisher.publish(f"p{n}", _result(), None)
+                n += 1
+            inner.published.extend(o.probe_name for o in outcomes)
+            return [Ok(None)] * len(outcomes)
+
+        inner.publish_many = publish_many  # type: ignore[method-assign]
+        await publisher.replay_batch()
+        del inner.publish_many
+        while publisher.stats().depth:
+            await publisher.replay_batch()
+        await publisher.aclose()
+
+        # After the first batch, everything that was not evicted is delivered, in order.
+        assert inner.published[:3] == ["p0", "p1", "p2"]
+        assert inner.published[3:] == [f"p{i}" for i in range(publisher.stats().evicted, n)]
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+from src.common.ttl_cache import TtlCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_value_until_ttl_expires():
+    clock = _Clock()
+    cache: TtlCache[str, int] = TtlCache(ttl=10, max_entries=10, clock=clock)
+
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_put_with_explicit_ttl_overrides_default():
+    clock = _Clock()
+    cache: TtlCache[str, int] = TtlCache(ttl=10, max_entries=10, clock=clock)
+
+    cache.put("a", 1, ttl=1)
+    clock.now = 2
+    assert cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache: TtlCache[str, int] = TtlCache(ttl=10, max_entries=2, clock=_Clock())
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_invalidate_removes_entry():
+    cache: TtlCache[str, int] = TtlCache(ttl=10, max_entries=2, clock=_Clock())
+
+    cache.put("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None